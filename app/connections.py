@@ -0,0 +1,584 @@
+"""WebSocket connection beheer met een begrensde verzendqueue per verbinding.
+
+Elke verbinding krijgt een eigen outbound queue en writer task. Een broadcast
+serialiseert het bericht één keer en zet het alleen in de queues, zodat een
+trage client de rest van de game niet ophoudt.
+
+Berichten worden geserialiseerd via app.serialization (orjson; pydantic
+modellen direct naar bytes) in plaats van per socket via `send_json`.
+
+Broadcasts lopen via een pub/sub backend (zie app.pubsub), zodat ook
+verbindingen op andere workers ze ontvangen. Dat geldt ook voor berichten aan
+één speler of aan de hosts, en voor opdrachten (`on_command`/`send_command`)
+die op de worker met de live state uitgevoerd moeten worden. Met `request`
+bevestigt die worker de opdracht; zonder bevestiging binnen
+COMMAND_ACK_TIMEOUT_MS is er geen worker die hem uitvoert.
+
+Per game houdt een `GameConnections` registry de verbindingen bij, met
+indexen op player_id, spelernaam en rol (host/speler); berichten naar één
+speler, kicken en dubbele tabbladen herkennen zijn daardoor O(1). De
+registry bevat ook de event log (zie app.event_log) waarmee clients na een
+reconnect de gemiste broadcasts terugkrijgen, en de roster (zie app.roster).
+"""
+from fastapi import WebSocket
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from collections import deque
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from app.event_log import EventLog
+from app.metrics import Histogram, broadcast_fanout, registry
+from app.pubsub import BroadcastBackend, create_backend
+from app.roster import Roster
+from app.scheduler import spawn
+from app.serialization import encode_message, loads
+
+logger = logging.getLogger(__name__)
+
+# Maximale tijd per send; tragere clients worden losgekoppeld
+WS_SEND_TIMEOUT = int(os.getenv("WS_SEND_TIMEOUT_MS", "1000")) / 1000
+# Maximaal aantal berichten in de queue van één verbinding
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "64"))
+# Wat te doen bij een volle queue: drop_oldest, coalesce of disconnect
+WS_OVERFLOW_POLICY = os.getenv("WS_OVERFLOW_POLICY", "coalesce")
+# Wachttijd op de bevestiging van een opdracht aan een andere worker
+COMMAND_ACK_TIMEOUT = int(os.getenv("COMMAND_ACK_TIMEOUT_MS", "1000")) / 1000
+
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+ROLE_PLAYER = "player"
+ROLE_HOST = "host"
+
+# Close codes (4000-4999 is vrij voor applicaties)
+CLOSE_REPLACED = 4001  # Zelfde speler verbonden vanuit een ander tabblad
+CLOSE_KICKED = 4003    # Door de host verwijderd
+
+# State berichten waarvan alleen de laatste versie relevant is
+COALESCE_TYPES = frozenset({"answer_progress"})
+# Key voor roster deltas: nooit coalescen, wel toepassen op de lokale roster
+ROSTER_KEY = "roster"
+# Key voor berichten met eigen data per speler (`data` = {player_id: data}):
+# één publish voor de hele game, elke worker splitst uit voor zijn spelers
+EACH_PLAYER_KEY = "each_player"
+
+# handler(game_code, data) voor opdrachten van andere workers
+CommandHandler = Callable[[str, dict], Awaitable[None]]
+# owns(game_code): voert deze worker de opdracht voor die game uit?
+CommandOwner = Callable[[str], bool]
+
+# Interne opdracht waarmee een worker een request bevestigt
+ACK_COMMAND = "ack"
+
+
+class QueueOverflow(Exception):
+    """Queue zit vol en de policy is disconnect."""
+
+
+class ClientConnection:
+    """Eén WebSocket met een eigen begrensde queue en writer task."""
+
+    __slots__ = (
+        "websocket", "game_code", "player_id", "player_name", "role", "manager",
+        "queue", "_ready", "_writer", "closing",
+        "sent", "dropped", "coalesced", "max_depth",
+    )
+
+    def __init__(self, websocket: WebSocket, game_code: str, manager: "ConnectionManager"):
+        self.websocket = websocket
+        self.game_code = game_code
+        self.player_id: Optional[int] = None
+        self.player_name: Optional[str] = None
+        self.role = ROLE_PLAYER
+        self.manager = manager
+        # Reden als de server deze verbinding bewust sluit (replaced/kicked)
+        self.closing: Optional[str] = None
+
+        # (tekst, coalesce key, enqueue tijdstip)
+        self.queue: Deque[Tuple[str, Optional[str], float]] = deque()
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+        # Statistieken
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    @property
+    def is_host(self) -> bool:
+        return self.role == ROLE_HOST
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def stop(self):
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        self._writer = None
+
+    def enqueue(self, text: str, coalesce_key: Optional[str] = None):
+        """Zet een bericht in de queue volgens de overflow policy."""
+        policy = self.manager.overflow_policy
+
+        if policy == "coalesce" and coalesce_key is not None:
+            # Vervang een nog niet verstuurde versie van hetzelfde state bericht
+            for i, (_, key, enqueued_at) in enumerate(self.queue):
+                if key == coalesce_key:
+                    self.queue[i] = (text, key, enqueued_at)
+                    self.coalesced += 1
+                    return
+
+        if len(self.queue) >= self.manager.max_queue_size:
+            if policy == "disconnect":
+                raise QueueOverflow()
+            self.queue.popleft()
+            self.dropped += 1
+
+        self.queue.append((text, coalesce_key, time.perf_counter()))
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self._ready.set()
+
+    async def _write_loop(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self.queue:
+                text, _, enqueued_at = self.queue.popleft()
+                try:
+                    await asyncio.wait_for(self.websocket.send_text(text), self.manager.send_timeout)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    await self.manager.drop(self)
+                    return
+                self.sent += 1
+                self.manager.observe_delivery(self.game_code, (time.perf_counter() - enqueued_at) * 1000)
+
+    def stats(self) -> dict:
+        return {
+            "player_id": self.player_id,
+            "player_name": self.player_name,
+            "role": self.role,
+            "queue_depth": len(self.queue),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+class GameConnections:
+    """Verbindingen van één game, geïndexeerd op socket, speler en rol."""
+
+    __slots__ = ("game_code", "by_socket", "by_player", "by_name", "hosts", "events", "roster")
+
+    def __init__(self, game_code: str):
+        self.game_code = game_code
+        self.events = EventLog()
+        # Wordt bij de eerste connect uit de database geladen
+        self.roster = Roster()
+        self.by_socket: Dict[WebSocket, ClientConnection] = {}
+        self.by_player: Dict[int, ClientConnection] = {}
+        self.by_name: Dict[str, ClientConnection] = {}
+        self.hosts: Dict[WebSocket, ClientConnection] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_socket)
+
+    def __iter__(self) -> Iterator[ClientConnection]:
+        return iter(list(self.by_socket.values()))
+
+    def add(self, connection: ClientConnection):
+        self.by_socket[connection.websocket] = connection
+
+    def set_player(self, connection: ClientConnection, player_id: int,
+                   player_name: Optional[str]) -> Optional[ClientConnection]:
+        """Koppel een speler aan de verbinding; geeft een eerdere verbinding van die speler terug."""
+        connection.role = ROLE_PLAYER
+        connection.player_id = player_id
+        connection.player_name = player_name
+        previous = self.by_player.get(player_id)
+        self.by_player[player_id] = connection
+        if player_name is not None:
+            self.by_name[player_name] = connection
+        return previous if previous is not connection else None
+
+    def set_host(self, connection: ClientConnection):
+        connection.role = ROLE_HOST
+        self.hosts[connection.websocket] = connection
+
+    def remove(self, connection: ClientConnection):
+        self.by_socket.pop(connection.websocket, None)
+        self.hosts.pop(connection.websocket, None)
+        # Alleen de indexen opruimen als ze nog naar deze verbinding wijzen
+        if self.by_player.get(connection.player_id) is connection:
+            del self.by_player[connection.player_id]
+        if self.by_name.get(connection.player_name) is connection:
+            del self.by_name[connection.player_name]
+
+
+def _player_part(message: dict, player_id: int) -> Optional[str]:
+    """Bericht voor één speler uit een EACH_PLAYER_KEY bericht ({player_id: data})."""
+    data = message["data"].get(str(player_id))  # Keys zijn na JSON strings
+    if data is None:
+        return None
+    return encode_message({"type": message["type"], "data": data, "seq": message["seq"]})
+
+
+# Globale connection manager
+class ConnectionManager:
+    def __init__(self, send_timeout: float = WS_SEND_TIMEOUT,
+                 max_queue_size: int = WS_QUEUE_SIZE,
+                 overflow_policy: str = WS_OVERFLOW_POLICY,
+                 backend: Optional[BroadcastBackend] = None,
+                 command_ack_timeout: float = COMMAND_ACK_TIMEOUT):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Onbekende WS_OVERFLOW_POLICY: {overflow_policy}")
+        # game_code -> registry van de lokale verbindingen
+        self.games: Dict[str, GameConnections] = {}
+        # WebSocket -> ClientConnection, voor berichten naar één socket
+        self._by_socket: Dict[WebSocket, ClientConnection] = {}
+        self.send_timeout = send_timeout
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        # game_code -> tijd van broadcast tot verzonden (ms) per ontvanger
+        self.fanout_latency: Dict[str, Histogram] = {}
+        self.dropped_connections = 0
+        self.replaced_connections = 0
+        self.kicked_connections = 0
+        # Verdeelt broadcasts over workers; levert via deliver() aan lokale sockets
+        self.backend = backend if backend is not None else create_backend()
+        self._commands: Dict[str, Tuple[CommandHandler, Optional[CommandOwner]]] = {}
+        # request_id -> future die de bevestiging van een andere worker afwacht
+        self._requests: Dict[str, asyncio.Future] = {}
+        self.command_ack_timeout = command_ack_timeout
+
+    async def start(self):
+        await self.backend.start(self.deliver, self.run_command)
+
+    async def stop(self):
+        await self.backend.stop()
+
+    async def connect(self, websocket: WebSocket, game_code: str) -> ClientConnection:
+        await websocket.accept()
+        connection = ClientConnection(websocket, game_code, self)
+        game = self.games.get(game_code)
+        if game is None:
+            # Eerste lokale verbinding voor deze game: broadcasts van andere workers volgen
+            game = self.games[game_code] = GameConnections(game_code)
+            self.backend.subscribe(game_code)
+        game.add(connection)
+        self._by_socket[websocket] = connection
+        connection.start()
+        return connection
+
+    def resume(self, connection: ClientConnection, last_seq: Optional[int] = None,
+               epoch: Optional[str] = None, role: str = ROLE_PLAYER) -> bool:
+        """Start de event stream van een verbinding, eventueel vanaf `last_seq`.
+
+        Moet direct na connect() aangeroepen worden (zonder await ertussen), zodat
+        er geen broadcast tussen de gemiste events en de nieuwe valt. Gemiste
+        berichten voor `role` (bijv. answer_progress voor de hosts) komen mee;
+        die voor één speler volgen met resume_player zodra de speler bekend is.
+        Geeft False als de gemiste events niet meer beschikbaar zijn; de
+        aanroeper stuurt dan een snapshot.
+        """
+        events = self.games[connection.game_code].events
+        missed = None
+        if last_seq is not None and epoch == events.epoch:
+            missed = events.since(last_seq, (role,))
+        self._enqueue(connection, encode_message({
+            "type": "session",
+            "data": {"epoch": events.epoch, "seq": events.seq, "resumed": missed is not None}
+        }))
+        for text in missed or ():
+            self._enqueue(connection, text)
+        return missed is not None
+
+    def resume_player(self, connection: ClientConnection, last_seq: int):
+        """Gemiste berichten met eigen data per speler (bijv. player_rank) na een resume."""
+        game = self.games.get(connection.game_code)
+        if game is None or connection.player_id is None:
+            return
+        for _, text in game.events.latest_since(last_seq, EACH_PLAYER_KEY):
+            part = _player_part(loads(text), connection.player_id)
+            if part is not None:
+                self._enqueue(connection, part)
+
+    def roster(self, game_code: str) -> Optional[Roster]:
+        """Roster van een game met lokale verbindingen (mogelijk nog niet geladen)."""
+        game = self.games.get(game_code)
+        return game.roster if game is not None else None
+
+    def current_seq(self, game_code: str) -> int:
+        game = self.games.get(game_code)
+        return game.events.seq if game is not None else 0
+
+    def connection(self, websocket: WebSocket) -> Optional[ClientConnection]:
+        return self._by_socket.get(websocket)
+
+    def register_player(self, websocket: WebSocket, game_code: str, player_id: int,
+                        player_name: Optional[str] = None) -> Optional[ClientConnection]:
+        """Markeer de verbinding als speler.
+
+        Geeft de vorige verbinding van dezelfde speler terug (tweede tabblad),
+        zodat de aanroeper die kan sluiten.
+        """
+        connection = self._by_socket.get(websocket)
+        game = self.games.get(game_code)
+        if connection is None or game is None:
+            return None
+        return game.set_player(connection, player_id, player_name)
+
+    def register_host(self, websocket: WebSocket, game_code: str):
+        connection = self._by_socket.get(websocket)
+        game = self.games.get(game_code)
+        if connection is not None and game is not None:
+            game.set_host(connection)
+
+    def disconnect(self, websocket: WebSocket, game_code: str) -> Optional[ClientConnection]:
+        """Verwijder een verbinding (idempotent); geeft het record terug."""
+        connection = self._by_socket.pop(websocket, None)
+        if connection is None:
+            return None
+        connection.stop()
+
+        game = self.games.get(game_code)
+        if game is not None:
+            game.remove(connection)
+            if not game:
+                del self.games[game_code]
+                self.fanout_latency.pop(game_code, None)
+                self.backend.unsubscribe(game_code)
+        return connection
+
+    async def close(self, connection: ClientConnection, code: int, reason: str, message: Optional[dict] = None):
+        """Sluit een verbinding bewust vanaf de server (met optioneel laatste bericht)."""
+        connection.closing = reason
+        self.disconnect(connection.websocket, connection.game_code)
+        try:
+            if message is not None:
+                await asyncio.wait_for(connection.websocket.send_text(encode_message(message)), self.send_timeout)
+            await connection.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def replace(self, previous: ClientConnection):
+        """Sluit de oudere verbinding van een speler die opnieuw verbonden is."""
+        self.replaced_connections += 1
+        await self.close(previous, CLOSE_REPLACED, "replaced", {
+            "type": "error",
+            "message": "Je bent verbonden vanuit een ander tabblad"
+        })
+
+    async def kick(self, game_code: str, player_id: int) -> bool:
+        """Verwijder een speler uit de game; False als die hier niet verbonden is."""
+        game = self.games.get(game_code)
+        connection = game.by_player.get(player_id) if game is not None else None
+        if connection is None:
+            return False
+        self.kicked_connections += 1
+        await self.close(connection, CLOSE_KICKED, "kicked", {
+            "type": "kicked",
+            "message": "Je bent door de host uit het spel verwijderd"
+        })
+        return True
+
+    async def drop(self, connection: ClientConnection):
+        """Koppel een trage of kapotte client los."""
+        self.dropped_connections += 1
+        self.disconnect(connection.websocket, connection.game_code)
+        try:
+            await connection.websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
+
+    def get_player(self, game_code: str, player_id: int) -> Optional[ClientConnection]:
+        game = self.games.get(game_code)
+        return game.by_player.get(player_id) if game is not None else None
+
+    def get_player_by_name(self, game_code: str, player_name: str) -> Optional[ClientConnection]:
+        game = self.games.get(game_code)
+        return game.by_name.get(player_name) if game is not None else None
+
+    def _enqueue(self, connection: ClientConnection, text: str, coalesce_key: Optional[str] = None):
+        try:
+            connection.enqueue(text, coalesce_key)
+        except QueueOverflow:
+            spawn(self.drop(connection), name="drop_connection")
+
+    async def send_personal_message(self, message: dict, websocket: WebSocket):
+        connection = self._by_socket.get(websocket)
+        if connection is not None:
+            self._enqueue(connection, encode_message(message))
+
+    async def broadcast(self, message: dict, game_code: str):
+        # Eén keer serialiseren, daarna alleen in de queues zetten
+        coalesce_key = message.get("type") if message.get("type") in COALESCE_TYPES else None
+        await self.broadcast_text(encode_message(message), game_code, coalesce_key)
+
+    async def broadcast_roster(self, message: dict, game_code: str):
+        """Broadcast een player_joined/player_left delta; elke worker past hem toe op zijn roster."""
+        await self.broadcast_text(encode_message(message), game_code, ROSTER_KEY)
+
+    async def send_to_hosts(self, message: dict, game_code: str):
+        """Stuur een bericht alleen naar de host verbindingen van een game (ook op andere workers)."""
+        game = self.games.get(game_code)
+        if not self.backend.distributed and (game is None or not game.hosts):
+            return
+        coalesce_key = message.get("type") if message.get("type") in COALESCE_TYPES else None
+        await self.backend.publish(game_code, encode_message(message), coalesce_key, role=ROLE_HOST)
+
+    async def send_to_player(self, message: dict, game_code: str, player_id: int):
+        """Stuur een bericht naar één speler, ook als die op een andere worker zit."""
+        connection = self.get_player(game_code, player_id)
+        if connection is not None:
+            self._enqueue(connection, encode_message(message))
+        elif self.backend.distributed:
+            await self.backend.publish(game_code, encode_message(message), player_id=player_id)
+
+    async def send_to_each_player(self, message_type: str, data: Dict[int, Any], game_code: str):
+        """Stuur elke speler zijn eigen `data` (bijv. player_rank) met één publish."""
+        if data:
+            await self.backend.publish(
+                game_code, encode_message({"type": message_type, "data": data}), EACH_PLAYER_KEY
+            )
+
+    async def broadcast_text(self, text: str, game_code: str, coalesce_key: Optional[str] = None):
+        """Broadcast een al geserialiseerd bericht."""
+        await self.backend.publish(game_code, text, coalesce_key)
+
+    def on_command(self, command: str, handler: CommandHandler, owns: Optional[CommandOwner] = None):
+        """Registreer een handler voor opdrachten die andere workers via send_command sturen.
+
+        Met `owns` voert alleen de worker waarvoor owns(game_code) waar is de
+        opdracht uit (en bevestigt hij een request).
+        """
+        self._commands[command] = (handler, owns)
+
+    async def send_command(self, game_code: str, command: str, data: dict):
+        """Laat de andere workers van een game een opdracht uitvoeren."""
+        await self.backend.send_command(game_code, command, data)
+
+    async def request(self, game_code: str, command: str, data: dict) -> bool:
+        """Stuur een opdracht naar de andere workers en wacht tot er één hem uitvoert.
+
+        False als geen worker de opdracht binnen `command_ack_timeout` bevestigt
+        (bijv. omdat de live state nergens meer bestaat).
+        """
+        request_id = uuid.uuid4().hex
+        acked = self._requests[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            await self.backend.send_command(game_code, command, {**data, "request_id": request_id})
+            await asyncio.wait_for(acked, self.command_ack_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._requests.pop(request_id, None)
+
+    def run_command(self, game_code: str, command: str, data: dict):
+        if command == ACK_COMMAND:
+            acked = self._requests.get(data.get("request_id"))
+            if acked is not None and not acked.done():
+                acked.set_result(None)
+            return
+        handler, owns = self._commands.get(command, (None, None))
+        if handler is None:
+            logger.warning("Onbekende opdracht van een andere worker: %s", command)
+            return
+        if owns is not None and not owns(game_code):
+            return  # Een andere worker voert hem uit
+        request_id = data.pop("request_id", None)
+        if request_id is not None:
+            spawn(self.send_command(game_code, ACK_COMMAND, {"request_id": request_id}), name="command:ack")
+        spawn(handler(game_code, data), name=f"command:{command}")
+
+    def deliver(self, game_code: str, text: str, coalesce_key: Optional[str] = None,
+                player_id: Optional[int] = None, role: Optional[str] = None):
+        """Zet een bericht in de queues van de lokale verbindingen van een game."""
+        game = self.games.get(game_code)
+        if game is None:
+            return
+        if player_id is not None:
+            connection = game.by_player.get(player_id)
+            if connection is not None:
+                self._enqueue(connection, text, coalesce_key)
+            return
+        if role is not None:
+            # Niet voor iedereen: alleen de laatste versie van een state bericht
+            # (met coalesce key) blijft bewaard voor hosts die resumen
+            if coalesce_key is not None:
+                text = game.events.record_latest(role, coalesce_key, text)
+            targets = game.hosts.values() if role == ROLE_HOST else (c for c in game if c.role == role)
+            for connection in list(targets):
+                self._enqueue(connection, text, coalesce_key)
+            return
+        if coalesce_key == EACH_PLAYER_KEY:
+            message = loads(text)
+            # Laatste versie bewaren voor spelers die resumen (zie resume_player)
+            game.events.record_latest(EACH_PLAYER_KEY, message["type"], text)
+            message["seq"] = game.events.seq
+            for player_id, connection in list(game.by_player.items()):
+                part = _player_part(message, player_id)
+                if part is not None:
+                    self._enqueue(connection, part)
+            return
+        if coalesce_key == ROSTER_KEY:
+            game.roster.apply(loads(text))
+            coalesce_key = None
+        # Broadcast: nummeren en bewaren voor clients die later resumen
+        text = game.events.append(text)
+        for connection in game:
+            self._enqueue(connection, text, coalesce_key)
+
+    def observe_delivery(self, game_code: str, latency_ms: float):
+        histogram = self.fanout_latency.get(game_code)
+        if histogram is None:
+            histogram = self.fanout_latency[game_code] = Histogram()
+        histogram.observe(latency_ms)
+        broadcast_fanout.observe(latency_ms)
+
+    def slow_connections(self, game_code: str, limit: int = 10) -> List[dict]:
+        """Verbindingen met de diepste queues."""
+        game = self.games.get(game_code)
+        if game is None:
+            return []
+        ranked = sorted(game, key=lambda c: (len(c.queue), c.max_depth), reverse=True)
+        return [c.stats() for c in ranked[:limit]]
+
+    def stats(self) -> dict:
+        return {
+            "active_games": len(self.games),
+            "active_connections": len(self._by_socket),
+            "dropped_connections": self.dropped_connections,
+            "replaced_connections": self.replaced_connections,
+            "kicked_connections": self.kicked_connections,
+            "overflow_policy": self.overflow_policy,
+            "max_queue_size": self.max_queue_size,
+            "broadcast": self.backend.stats(),
+            "games": {
+                code: {
+                    "connections": len(game),
+                    "players": len(game.by_player),
+                    "hosts": len(game.hosts),
+                    "seq": game.events.seq,
+                    "queued": sum(len(c.queue) for c in game),
+                    "fanout_latency_ms": (
+                        self.fanout_latency[code].snapshot() if code in self.fanout_latency else None
+                    ),
+                    "slowest": self.slow_connections(code),
+                }
+                for code, game in self.games.items()
+            }
+        }
+
+
+manager = ConnectionManager()
+
+registry.gauge("quiz_active_games", "Games met WebSocket verbindingen op deze worker", lambda: len(manager.games))
+registry.gauge("quiz_websocket_connections", "Open WebSocket verbindingen op deze worker",
+               lambda: len(manager._by_socket))
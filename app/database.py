@@ -1,22 +1,130 @@
 """Database configuratie en sessie management."""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from typing import List
 import os
 
+from app import metrics, query_budget
+
 # Database URL uit environment of default SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./quiz_app.db")
 
+# Engine profiel: default, production of test (zie SQLITE_PROFILES)
+DB_PROFILE = os.getenv("DB_PROFILE", "default")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+# PRAGMAs per profiel, uitgevoerd op elke nieuwe SQLite connectie
+SQLITE_PROFILES = {
+    # Standaard SQLite gedrag (rollback journal, synchronous=FULL)
+    "default": {},
+    # WAL: lezers blokkeren schrijvers niet; NORMAL is veilig in WAL mode
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,           # ms wachten op de lock i.p.v. "database is locked"
+        "cache_size": -64000,           # ~64 MB page cache per connectie
+        "mmap_size": 268435456,         # 256 MB memory-mapped I/O
+        "temp_store": "MEMORY",
+    },
+    # Snel en niet duurzaam: alleen voor tests en benchmarks
+    "test": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "busy_timeout": 5000,
+    },
+}
+
+
+def sqlite_pragmas(profile: str) -> List[str]:
+    """PRAGMA statements voor een profiel, één keer opgebouwd."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Onbekend DB_PROFILE '{profile}', kies uit {', '.join(SQLITE_PROFILES)}")
+    return [f"PRAGMA {name}={value}" for name, value in SQLITE_PROFILES[profile].items()]
+
+
+def _engine_options(url: str, profile: str, is_async: bool = False) -> dict:
+    if not url.startswith("sqlite"):
+        return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_pre_ping": True}
+    if profile == "test":
+        # Eén gedeelde connectie; ook bruikbaar voor een in-memory database
+        # (let op: sync en async engine hebben elk hun eigen in-memory database)
+        return {"poolclass": StaticPool}
+    if profile == "production":
+        # aiosqlite gebruikt voor bestanden standaard NullPool (connectie per checkout)
+        pool = {"poolclass": AsyncAdaptedQueuePool} if is_async else {}
+        return {**pool, "pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW}
+    return {}
+
+
+def _install_pragmas(sync_engine, url: str, profile: str):
+    statements = sqlite_pragmas(profile)
+    if not url.startswith("sqlite") or not statements:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+
+def create_db_engine(url: str = DATABASE_URL, profile: str = DB_PROFILE, **kwargs):
+    """Sync engine volgens het gekozen profiel."""
+    sync_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+        echo=False,  # Set True voor SQL query logging
+        **{**_engine_options(url, profile), **kwargs}
+    )
+    _install_pragmas(sync_engine, url, profile)
+    return sync_engine
+
+
+def create_async_db_engine(url: str, profile: str = DB_PROFILE, **kwargs):
+    """Async engine volgens het gekozen profiel."""
+    async_db_engine = create_async_engine(
+        url, echo=False, **{**_engine_options(url, profile, is_async=True), **kwargs}
+    )
+    _install_pragmas(async_db_engine.sync_engine, url, profile)
+    return async_db_engine
+
+
 # Create engine met SQLite optimalisaties
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=False  # Set True voor SQL query logging
-)
+engine = create_db_engine(DATABASE_URL, DB_PROFILE)
+metrics.instrument_engine(engine)
+query_budget.instrument_engine(engine)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def to_async_url(url: str) -> str:
+    """Zet een sync database URL om naar de asyncio driver (aiosqlite/asyncpg)."""
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    for prefix in ("postgresql://", "postgres://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+# Async engine voor code die in de event loop draait (WebSockets, hot routes)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+async_engine = create_async_db_engine(ASYNC_DATABASE_URL, DB_PROFILE)
+metrics.instrument_engine(async_engine.sync_engine)
+query_budget.instrument_engine(async_engine.sync_engine)
+
+# expire_on_commit uit: objecten blijven bruikbaar zonder nieuwe (async) lazy load
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Base class voor models
 Base = declarative_base()
 
@@ -30,6 +138,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency voor async database sessies."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialiseer database en maak alle tabellen."""
     from app import models  # Import hier om circular imports te voorkomen
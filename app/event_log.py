@@ -0,0 +1,83 @@
+"""Genummerde event log per game voor reconnect/resume.
+
+Elke broadcast van een game krijgt een oplopend sequence number (`seq`) en
+wordt bewaard in een begrensde ring buffer. Een client die opnieuw verbindt
+stuurt de laatst geziene seq mee en krijgt alleen de gemiste events; valt die
+seq buiten de buffer (of hoort hij bij een andere epoch), dan volgt een
+snapshot van de huidige state.
+
+Berichten voor een deel van de game (answer_progress voor de hosts,
+player_rank met data per speler) krijgen ook een seq, maar alleen de laatste
+versie per (doel, type) wordt bewaard: `record_latest`. Bij resume komen die
+mee als de client ze gemist heeft.
+
+De epoch identificeert de log: een nieuwe log (andere worker, of de game had
+tussendoor geen lokale verbindingen) heeft een nieuwe epoch, zodat oude
+sequence numbers nooit verkeerd geïnterpreteerd worden.
+"""
+from collections import deque
+from typing import Collection, Deque, Dict, List, Optional, Tuple
+import os
+import uuid
+
+# Aantal events dat per game bewaard wordt voor resume
+EVENT_LOG_SIZE = int(os.getenv("EVENT_LOG_SIZE", "256"))
+
+
+def with_seq(text: str, seq: int) -> str:
+    """Voeg `seq` toe aan een geserialiseerd JSON object zonder opnieuw te serialiseren."""
+    return f'{text[:-1]},"seq":{seq}}}'
+
+
+class EventLog:
+    """Ring buffer met de laatste broadcasts van één game."""
+
+    __slots__ = ("epoch", "seq", "_events", "_latest", "_dropped")
+
+    def __init__(self, max_size: int = EVENT_LOG_SIZE):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self._events: Deque[Tuple[int, str]] = deque(maxlen=max_size)
+        # (doel, type) -> (seq, tekst) van het laatste gerichte bericht
+        self._latest: Dict[Tuple[str, str], Tuple[int, str]] = {}
+        # Seq van het laatste event dat uit de buffer geschoven is
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def append(self, text: str) -> str:
+        """Nummer een broadcast en bewaar hem; geeft de tekst met `seq` terug."""
+        self.seq += 1
+        text = with_seq(text, self.seq)
+        if len(self._events) == self._events.maxlen:
+            self._dropped = self._events[0][0] if self._events else self.seq
+        self._events.append((self.seq, text))
+        return text
+
+    def record_latest(self, target: str, message_type: str, text: str) -> str:
+        """Nummer een gericht bericht en bewaar alleen deze versie; geeft de tekst met `seq` terug."""
+        self.seq += 1
+        text = with_seq(text, self.seq)
+        self._latest[(target, message_type)] = (self.seq, text)
+        return text
+
+    def latest_since(self, last_seq: int, target: str) -> List[Tuple[int, str]]:
+        """(seq, tekst) van de laatste gerichte berichten voor `target` na `last_seq`."""
+        return sorted(
+            entry for (entry_target, _), entry in self._latest.items()
+            if entry_target == target and entry[0] > last_seq
+        )
+
+    def since(self, last_seq: int, targets: Collection[str] = ()) -> Optional[List[str]]:
+        """Events na `last_seq`, of None als die niet (meer) compleet in de buffer zitten.
+
+        Met `targets` komen ook de gemiste gerichte berichten voor die doelen
+        mee (zoals opgeslagen door record_latest), op volgorde van seq.
+        """
+        if last_seq < 0 or last_seq > self.seq or last_seq < self._dropped:
+            return None
+        events = [(seq, text) for seq, text in self._events if seq > last_seq]
+        for target in targets:
+            events += self.latest_since(last_seq, target)
+        return [text for _, text in sorted(events)]
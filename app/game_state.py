@@ -0,0 +1,203 @@
+"""In-memory game state voor het antwoord-pad van actieve games.
+
+Tijdens een actieve game worden antwoorden gevalideerd en gescoord tegen deze
+state in plaats van tegen de database. De state wordt aangemaakt bij
+`start_game` en per vraag bijgewerkt door `send_question`.
+
+De antwoordtijd wordt op de server gemeten (monotonic klok vanaf het moment
+dat de vraag actief werd); de door de client opgegeven tijd telt niet mee.
+"""
+from typing import Dict, FrozenSet, Iterable, Optional
+from datetime import datetime
+import threading
+import time
+
+from app.leaderboard import Leaderboard
+from app.metrics import answers, registry
+from app.quiz_cache import QuizSnapshot
+
+# Label kinderen vooraf opzoeken: submit is het hot path
+_correct_answers = answers.labels("correct")
+_incorrect_answers = answers.labels("incorrect")
+
+
+def calculate_points(is_correct: bool, time_limit: int, time_taken: int) -> int:
+    """Bereken punten: tot 1000 voor een snel correct antwoord."""
+    if not is_correct:
+        return 0
+
+    time_limit_ms = time_limit * 1000
+    if time_taken < time_limit_ms:
+        remaining_time = time_limit_ms - time_taken
+        return int(1000 * (remaining_time / time_limit_ms))
+    return 100  # Minimale punten voor correct maar te laat
+
+
+class AnswerRejected(Exception):
+    """Antwoord kan niet verwerkt worden (status code + melding voor de client)."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class QuestionState:
+    """De vraag die op dit moment gespeeld wordt."""
+
+    def __init__(self, question_id: int, correct_answer_id: int,
+                 answer_ids: Iterable[int], time_limit: int):
+        self.question_id = question_id
+        self.correct_answer_id = correct_answer_id
+        self.answer_ids: FrozenSet[int] = frozenset(answer_ids)
+        self.time_limit = time_limit
+        self.started_at = time.monotonic()
+
+    def elapsed_ms(self) -> int:
+        """Milliseconden sinds de start van de vraag, begrensd op de time limit."""
+        elapsed = int((time.monotonic() - self.started_at) * 1000)
+        return min(elapsed, self.time_limit * 1000)
+
+
+class ScoredAnswer:
+    """Resultaat van een in-memory gescoord antwoord."""
+
+    def __init__(self, player_id: int, question_id: int, answer_id: int,
+                 is_correct: bool, points: int, time_taken: int):
+        self.id: Optional[int] = None  # Wordt pas door de database toegekend
+        self.player_id = player_id
+        self.question_id = question_id
+        self.answer_id = answer_id
+        self.is_correct = is_correct
+        self.points = points
+        self.time_taken = time_taken
+        self.answered_at = datetime.utcnow()
+
+
+class GameState:
+    """Live state van een game: huidige vraag, spelers en wie al geantwoord heeft."""
+
+    def __init__(self, game_id: int, game_code: str, quiz: QuizSnapshot, player_ids: Iterable[int],
+                 leaderboard: Optional[Leaderboard] = None):
+        self.game_id = game_id
+        self.game_code = game_code
+        self.quiz_id = quiz.quiz_id
+        self.quiz = quiz  # Snapshot blijft gelijk zolang de game loopt
+        self.question_index = 0
+        self.question: Optional[QuestionState] = None
+        self.leaderboard = leaderboard
+
+        # player_id -> positie in de answered bitmap
+        self._player_slots: Dict[int, int] = {}
+        self._answered = bytearray()
+        self._answered_count = 0
+        self._lock = threading.Lock()
+
+        for player_id in player_ids:
+            self.add_player(player_id)
+
+    @property
+    def player_ids(self) -> FrozenSet[int]:
+        return frozenset(self._player_slots)
+
+    @property
+    def player_count(self) -> int:
+        return len(self._player_slots)
+
+    def add_player(self, player_id: int):
+        with self._lock:
+            if player_id not in self._player_slots:
+                self._player_slots[player_id] = len(self._answered)
+                self._answered.append(0)
+
+    def set_question(self, question_index: int, question: QuestionState):
+        """Activeer een nieuwe vraag en reset de answered bitmap."""
+        with self._lock:
+            self.question_index = question_index
+            self.question = question
+            self._answered = bytearray(len(self._answered))
+            self._answered_count = 0
+
+    def close_question(self) -> Optional[QuestionState]:
+        """Sluit de huidige vraag; latere antwoorden worden geweigerd."""
+        with self._lock:
+            question = self.question
+            self.question = None
+            return question
+
+    def answered_count(self) -> int:
+        return self._answered_count
+
+    def has_answered(self, player_id: int) -> bool:
+        slot = self._player_slots.get(player_id)
+        return slot is not None and bool(self._answered[slot])
+
+    def submit(self, player_id: int, question_id: int, answer_id: int) -> ScoredAnswer:
+        """Valideer en scoor een antwoord volledig in geheugen (tijd gemeten door de server)."""
+        slot = self._player_slots.get(player_id)
+        if slot is None:
+            raise AnswerRejected(404, "Speler niet gevonden")
+
+        question = self.question
+        if question is None or question.question_id != question_id:
+            raise AnswerRejected(400, "Vraag is niet actief")
+
+        if answer_id not in question.answer_ids:
+            raise AnswerRejected(404, "Antwoord niet gevonden")
+
+        with self._lock:
+            # Vraag kan gewisseld zijn terwijl we op de lock wachtten
+            if self.question is not question:
+                raise AnswerRejected(400, "Vraag is niet actief")
+            if self._answered[slot]:
+                raise AnswerRejected(400, "Vraag al beantwoord")
+            self._answered[slot] = 1
+            self._answered_count += 1
+            time_taken = question.elapsed_ms()
+
+        is_correct = answer_id == question.correct_answer_id
+        points = calculate_points(is_correct, question.time_limit, time_taken)
+        (_correct_answers if is_correct else _incorrect_answers).inc()
+        if self.leaderboard is not None:
+            self.leaderboard.record(player_id, points, is_correct)
+        return ScoredAnswer(player_id, question_id, answer_id, is_correct, points, time_taken)
+
+    def score_row(self, scored: ScoredAnswer) -> dict:
+        """Score rij voor de write-behind buffer."""
+        return {
+            "game_session_id": self.game_id,
+            "player_id": scored.player_id,
+            "question_id": scored.question_id,
+            "answer_id": scored.answer_id,
+            "is_correct": scored.is_correct,
+            "points": scored.points,
+            "time_taken": scored.time_taken,
+            "answered_at": scored.answered_at
+        }
+
+
+class GameStateRegistry:
+    """Houdt de GameState bij per game_code."""
+
+    def __init__(self):
+        self._games: Dict[str, GameState] = {}
+
+    def get(self, game_code: str) -> Optional[GameState]:
+        return self._games.get(game_code)
+
+    def create(self, game_id: int, game_code: str, quiz: QuizSnapshot, player_ids: Iterable[int],
+               leaderboard: Optional[Leaderboard] = None) -> GameState:
+        state = GameState(game_id, game_code, quiz, player_ids, leaderboard)
+        self._games[game_code] = state
+        return state
+
+    def remove(self, game_code: str):
+        self._games.pop(game_code, None)
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+
+game_states = GameStateRegistry()
+
+registry.gauge("quiz_live_games", "Games met in-memory state (actief gespeeld)", lambda: len(game_states))
@@ -0,0 +1,184 @@
+"""Incrementeel in-memory scoreboard per game.
+
+Elke gescoorde vraag werkt de stand van één speler bij. De spelers staan in
+een `SortedList` (sortedcontainers) op (total_score, correct_answers):
+bijwerken (remove + add) en rank lookups zijn O(log n), top-N is een slice
+van het begin. De SQL aggregate wordt alleen nog gebruikt om een scoreboard opnieuw op te bouwen
+(na een herstart of op een andere worker dan die van de host).
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import os
+import threading
+
+from sortedcontainers import SortedList
+from sqlalchemy import Integer, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+
+# Aantal scoreboards dat in geheugen blijft (ook na afloop van een game)
+LEADERBOARD_CACHE_SIZE = int(os.getenv("LEADERBOARD_CACHE_SIZE", "256"))
+
+
+class Standing:
+    """Stand van één speler."""
+
+    __slots__ = ("player_id", "player_name", "total_score", "correct_answers")
+
+    def __init__(self, player_id: int, player_name: str, total_score: int = 0, correct_answers: int = 0):
+        self.player_id = player_id
+        self.player_name = player_name
+        self.total_score = total_score
+        self.correct_answers = correct_answers
+
+    @property
+    def key(self) -> Tuple[int, int, int]:
+        # Oplopend gesorteerd = hoogste score eerst, player_id als tiebreaker
+        return (-self.total_score, -self.correct_answers, self.player_id)
+
+
+class Leaderboard:
+    """Gesorteerd scoreboard van een game."""
+
+    def __init__(self, total_questions: int = 0):
+        self.total_questions = total_questions
+        self._standings: Dict[int, Standing] = {}
+        self._order: SortedList = SortedList()
+        # Ranks bij de vorige rank_changes() aanroep
+        self._previous_ranks: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add_player(self, player_id: int, player_name: str, total_score: int = 0, correct_answers: int = 0):
+        with self._lock:
+            if player_id in self._standings:
+                return
+            standing = Standing(player_id, player_name, total_score, correct_answers)
+            self._standings[player_id] = standing
+            self._order.add(standing.key)
+
+    def record(self, player_id: int, points: int, is_correct: bool):
+        """Verwerk een gescoord antwoord in de stand."""
+        with self._lock:
+            standing = self._standings.get(player_id)
+            if standing is None:
+                return
+            self._order.remove(standing.key)
+            standing.total_score += points
+            standing.correct_answers += int(is_correct)
+            self._order.add(standing.key)
+
+    def rank(self, player_id: int) -> Optional[int]:
+        """Positie van een speler (1 = eerste)."""
+        with self._lock:
+            standing = self._standings.get(player_id)
+            if standing is None:
+                return None
+            return self._order.bisect_left(standing.key) + 1
+
+    def standing(self, player_id: int) -> Optional[Standing]:
+        return self._standings.get(player_id)
+
+    def top(self, n: Optional[int] = None) -> List[dict]:
+        """De eerste n entries (of allemaal) als LeaderboardEntry velden."""
+        with self._lock:
+            keys = self._order if n is None else self._order.islice(0, n)
+            return [
+                self._entry(self._standings[player_id], rank)
+                for rank, (_, _, player_id) in enumerate(keys, start=1)
+            ]
+
+    def rank_changes(self) -> List[dict]:
+        """Spelers waarvan de rank veranderd is sinds de vorige aanroep."""
+        with self._lock:
+            changes = []
+            ranks = {}
+            for rank, (_, _, player_id) in enumerate(self._order, start=1):
+                ranks[player_id] = rank
+                previous = self._previous_ranks.get(player_id)
+                if previous != rank:
+                    changes.append({
+                        "player_name": self._standings[player_id].player_name,
+                        "rank": rank,
+                        "previous_rank": previous
+                    })
+            self._previous_ranks = ranks
+            return changes
+
+    @staticmethod
+    def _entry(standing: Standing, rank: int) -> dict:
+        return {
+            "player_name": standing.player_name,
+            "total_score": standing.total_score,
+            "correct_answers": standing.correct_answers,
+            "rank": rank
+        }
+
+
+class LeaderboardRegistry:
+    """Scoreboards per game_code met LRU eviction."""
+
+    def __init__(self, max_size: int = LEADERBOARD_CACHE_SIZE):
+        self.max_size = max_size
+        self._boards: "OrderedDict[str, Leaderboard]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, game_code: str) -> Optional[Leaderboard]:
+        with self._lock:
+            board = self._boards.get(game_code)
+            if board is not None:
+                self._boards.move_to_end(game_code)
+            return board
+
+    def put(self, game_code: str, board: Leaderboard) -> Leaderboard:
+        with self._lock:
+            self._boards[game_code] = board
+            self._boards.move_to_end(game_code)
+            while len(self._boards) > self.max_size:
+                self._boards.popitem(last=False)
+        return board
+
+    def remove(self, game_code: str):
+        with self._lock:
+            self._boards.pop(game_code, None)
+
+
+async def load_leaderboard(db: AsyncSession, game: models.GameSession) -> Leaderboard:
+    """Bouw een scoreboard opnieuw op uit de scores tabel."""
+    totals = select(
+        models.Score.player_id.label("player_id"),
+        func.sum(models.Score.points).label("total_score"),
+        func.sum(func.cast(models.Score.is_correct, Integer)).label("correct_answers")
+    ).where(
+        models.Score.game_session_id == game.id
+    ).group_by(
+        models.Score.player_id
+    ).subquery()
+
+    rows = (await db.execute(
+        select(
+            models.Player.id,
+            models.Player.player_name,
+            totals.c.total_score,
+            totals.c.correct_answers
+        ).outerjoin(
+            totals, totals.c.player_id == models.Player.id
+        ).where(
+            models.Player.game_session_id == game.id
+        )
+    )).all()
+
+    total_questions = await db.scalar(
+        select(func.count(models.Question.id)).where(models.Question.quiz_id == game.quiz_id)
+    )
+
+    board = Leaderboard(total_questions=total_questions)
+    for player_id, player_name, total_score, correct_answers in rows:
+        board.add_player(player_id, player_name, total_score or 0, correct_answers or 0)
+    return board
+
+
+leaderboards = LeaderboardRegistry()
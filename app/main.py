@@ -1,23 +1,45 @@
 """FastAPI hoofdapplicatie voor Quiz Game."""
 from fastapi import FastAPI, Request, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import uvicorn
+import logging
 import os
 
-from app.database import init_db, get_db
+from app.database import init_db, get_db, async_engine
 from app import models
+from app.score_writer import score_writer
+from app.connections import manager
+from app.metrics import CONTENT_TYPE, METRICS_ENABLED, MetricsMiddleware, loop_monitor, registry
+from app.query_budget import QueryBudgetMiddleware
+from app.scheduler import scheduler
+from app.serialization import FastJSONResponse
 from app.routers import admin, game, websocket
 
+# Niveau voor de loggers van de app (app.*); uvicorn configureert zijn eigen loggers
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logging.getLogger("app").setLevel(LOG_LEVEL)
+
 # Initialiseer FastAPI app
 app = FastAPI(
     title="Quiz Game API",
     description="Realtime multiplayer quiz applicatie (Kahoot-style)",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson i.p.v. json.dumps voor alle JSON responses (zie app/serialization.py)
+    default_response_class=FastJSONResponse
 )
 
+# Latency, status en queries per route (zie /metrics)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Queries per request tegen het budget van de route (QUERY_BUDGET_MODE)
+app.add_middleware(QueryBudgetMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -31,14 +53,28 @@ app.include_router(websocket.router)
 
 
 @app.on_event("startup")
-def startup_event():
-    """Initialiseer database bij opstarten."""
+async def startup_event():
+    """Initialiseer database en broadcast backend bij opstarten."""
     print("🚀 Quiz Game App wordt opgestart...")
     init_db()
     print("✅ Database geïnitialiseerd")
+    score_writer.start()
+    await manager.start()
+    print(f"📡 Broadcast backend: {manager.backend.name}")
+    loop_monitor.start()
     print("🎮 Server draait op http://localhost:8000")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Schrijf gebufferde scores weg en sluit backend en async database connecties."""
+    await scheduler.stop()
+    await loop_monitor.stop()
+    await manager.stop()
+    await run_in_threadpool(score_writer.close)
+    await async_engine.dispose()
+
+
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request):
     """Homepage voor spelers om te joinen."""
@@ -90,7 +126,19 @@ def host_game(request: Request, game_code: str):
 @app.get("/health")
 def health_check():
     """Health check endpoint voor monitoring."""
-    return {"status": "healthy", "service": "quiz-game-app"}
+    return {
+        "status": "healthy",
+        "service": "quiz-game-app",
+        "score_writer": score_writer.stats()
+    }
+
+
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Metrics in Prometheus text format (per worker)."""
+        # Async: renderen op de event loop, waar ook de meeste metrics geschreven worden
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,351 @@
+"""Lichtgewicht metrics voor hot paths en het `/metrics` endpoint.
+
+Counters en histogrammen zijn gewone Python objecten: een observatie is een
+dict lookup, een bisect en een paar optellingen, zodat de instrumentatie ook in
+productie aan kan blijven. Ze worden bijgewerkt vanuit de event loop, de
+threadpool en de score writer thread; `+=` is geen atomaire operatie, dus elke
+counter en elk histogram heeft een eigen (ongedeelde) lock. Gauges worden pas bij het
+scrapen uitgerekend (callback). `registry.render()` geeft alles in het
+Prometheus text format (0.0.4).
+
+Instrumentatie:
+- MetricsMiddleware: latency en status per route template, plus het aantal
+  queries en de query tijd per request
+- instrument_engine: SQLAlchemy cursor events voor query aantallen en tijd
+- LoopLagMonitor: vertraging van de event loop
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+import asyncio
+import contextvars
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+# Zet op false om middleware, engine events en de loop monitor over te slaan
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Interval waarmee de event loop lag gemeten wordt
+LOOP_LAG_INTERVAL_MS = int(os.getenv("LOOP_LAG_INTERVAL_MS", "500"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Standaard buckets in milliseconden
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# Losse queries zijn meestal (ruim) onder de milliseconde
+QUERY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Histogram met vaste buckets (cumulatief uit te lezen, Prometheus-stijl)."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Laatste = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Schatting van een kwantiel (bovengrens van de bucket)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "max": round(self.max, 3),
+            "p50": round(self.quantile(0.50), 3),
+            "p95": round(self.quantile(0.95), 3),
+            "p99": round(self.quantile(0.99), 3),
+            "buckets": {str(bound): n for bound, n in zip(self.buckets + ("+Inf",), self.counts)},
+        }
+
+
+class Counter:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(round(value, 9))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[object]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric:
+    """Counter of histogram familie met een kind per combinatie van label waarden."""
+
+    def __init__(self, name: str, help: str, kind: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS_MS, scale: float = 1.0):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Waarden worden opgeslagen zoals geobserveerd (ms) en bij render geschaald
+        self.scale = scale
+        self.children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values: str):
+        child = self.children.get(values)
+        if child is None:
+            # Twee threads die tegelijk een nieuw label aanmaken mogen niet elk een eigen kind krijgen
+            with self._lock:
+                child = self.children.get(values)
+                if child is None:
+                    child = Histogram(self.buckets) if self.kind == "histogram" else Counter()
+                    self.children[values] = child
+        return child
+
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self.children.items()):
+            if self.kind == "counter":
+                lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}")
+                continue
+            names = self.labelnames + ("le",)
+            cumulative = 0
+            for bound, n in zip(child.buckets + (float("inf"),), child.counts):
+                cumulative += n
+                le = _format_value(bound * self.scale)
+                lines.append(f"{self.name}_bucket{_format_labels(names, values + (le,))} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum * self.scale)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Gauge:
+    """Gauge die bij het scrapen uit een callback gelezen wordt."""
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_format_value(self.read())}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' bestaat al")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Metric:
+        return self._add(Metric(name, help, "counter", labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS_MS, scale: float = 0.001) -> Metric:
+        """Histogram; standaard geobserveerd in ms en geëxporteerd in seconden."""
+        return self._add(Metric(name, help, "histogram", labelnames, buckets, scale))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        return self._add(Gauge(name, help, read))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "quiz_http_requests_total", "HTTP requests per route template en status", ("method", "route", "status")
+)
+http_latency = registry.histogram(
+    "quiz_http_request_duration_seconds", "HTTP request latency per route template", ("method", "route")
+)
+db_queries = registry.counter("quiz_db_queries_total", "Uitgevoerde SQL statements")
+db_query_latency = registry.histogram(
+    "quiz_db_query_duration_seconds", "Duur van één SQL statement", buckets=QUERY_BUCKETS_MS
+)
+db_queries_per_request = registry.histogram(
+    "quiz_db_queries_per_request", "SQL statements per HTTP request", ("route",),
+    buckets=QUERY_COUNT_BUCKETS, scale=1.0
+)
+db_time_per_request = registry.histogram(
+    "quiz_db_time_per_request_seconds", "Totale query tijd per HTTP request", ("route",),
+    buckets=QUERY_BUCKETS_MS
+)
+broadcast_fanout = registry.histogram(
+    "quiz_broadcast_fanout_seconds", "Tijd van enqueue tot verzonden per WebSocket bericht"
+)
+answers = registry.counter("quiz_answers_total", "Gescoorde antwoorden", ("result",))
+loop_lag = registry.histogram(
+    "quiz_event_loop_lag_seconds", "Vertraging van de event loop t.o.v. het meetinterval",
+    buckets=(0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
+
+class RequestQueries:
+    """Query teller voor het request dat nu loopt (via een contextvar)."""
+
+    __slots__ = ("count", "time_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.time_ms = 0.0
+
+
+current_queries: contextvars.ContextVar[Optional[RequestQueries]] = contextvars.ContextVar(
+    "current_queries", default=None
+)
+
+
+def instrument_engine(sync_engine):
+    """Tel queries en query tijd van een (sync of async.sync_engine) engine."""
+    if not METRICS_ENABLED:
+        return
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def observe_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_started) * 1000
+        db_queries.inc()
+        db_query_latency.observe(elapsed_ms)
+        # Contextvars lopen mee naar de threadpool en de greenlet van de async engine
+        queries = current_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.time_ms += elapsed_ms
+
+
+def route_template(scope) -> str:
+    """Route template (`/api/game/{game_code}`) i.p.v. het pad, om labels beperkt te houden."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope:
+        return scope.get("root_path") or "mount"  # Bijv. /static
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (geen BaseHTTPMiddleware: geen extra task per request)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            current_queries.reset(token)
+            route = route_template(scope)
+            http_requests.labels(scope["method"], route, str(status_code)).inc()
+            http_latency.labels(scope["method"], route).observe(elapsed_ms)
+            db_queries_per_request.labels(route).observe(queries.count)
+            db_time_per_request.labels(route).observe(queries.time_ms)
+
+
+class LoopLagMonitor:
+    """Meet hoeveel later dan gevraagd een sleep terugkomt (event loop bezet)."""
+
+    def __init__(self, interval_ms: int = LOOP_LAG_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.last_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if METRICS_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_ms = max(0.0, (time.perf_counter() - started - self.interval) * 1000)
+            loop_lag.observe(self.last_ms)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+loop_monitor = LoopLagMonitor()
+
+registry.gauge(
+    "quiz_event_loop_lag_last_seconds", "Laatst gemeten event loop lag", lambda: loop_monitor.last_ms / 1000
+)
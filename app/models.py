@@ -1,5 +1,5 @@
 """SQLAlchemy database models."""
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -18,6 +18,11 @@ class Quiz(Base):
     # Relationships
     questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan")
     game_sessions = relationship("GameSession", back_populates="quiz")
+    
+    __table_args__ = (
+        # Keyset pagination in de admin lijst
+        Index("ix_quizzes_created_at_id", "created_at", "id"),
+    )
 
 
 class Question(Base):
@@ -33,6 +38,11 @@ class Question(Base):
     # Relationships
     quiz = relationship("Quiz", back_populates="questions")
     answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Vragen van een quiz in volgorde (send_question, snapshots)
+        Index("ix_questions_quiz_id_order", "quiz_id", "order"),
+    )
 
 
 class Answer(Base):
@@ -81,6 +91,11 @@ class Player(Base):
     # Relationships
     game_session = relationship("GameSession", back_populates="players")
     scores = relationship("Score", back_populates="player", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Join en WebSocket connect zoeken op (game, naam); namen zijn uniek per game
+        UniqueConstraint("game_session_id", "player_name", name="uq_players_game_session_id_player_name"),
+    )
 
 
 class Score(Base):
@@ -101,4 +116,12 @@ class Score(Base):
     game_session = relationship("GameSession", back_populates="scores")
     player = relationship("Player", back_populates="scores")
     question = relationship("Question")
-    answer = relationship("Answer")
\ No newline at end of file
+    answer = relationship("Answer")
+    
+    __table_args__ = (
+        # Eén antwoord per speler per vraag, afgedwongen door de database
+        UniqueConstraint(
+            "game_session_id", "player_id", "question_id",
+            name="uq_scores_game_session_id_player_id_question_id"
+        ),
+    )
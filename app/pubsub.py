@@ -0,0 +1,414 @@
+"""Pub/sub backends voor broadcasts over meerdere workers.
+
+`ConnectionManager.broadcast` publiceert via een backend. Het bericht wordt
+direct aan de lokale sockets geleverd en daarnaast naar de andere workers
+gestuurd; elke worker levert alleen aan zijn eigen sockets.
+
+Backends (env BROADCAST_BACKEND):
+- local: alleen dit proces (standaard, geen extra I/O)
+- redis: Redis pub/sub, één channel per game_code (vereist het `redis` package)
+- unix: lokale broker via een Unix socket, voor meerdere workers op één host
+
+Sharding per game_code: een worker abonneert zich alleen op games waarvoor
+hij zelf verbindingen heeft, zodat andere games hem niets kosten.
+
+Naast berichten voor de sockets (alle, één speler of alleen de hosts) gaan
+ook opdrachten over de backend: `send_command` vraagt de andere workers van
+een game iets te doen, bijv. een antwoord scoren op de worker van de host,
+waar de live state staat.
+
+De Unix broker starten:
+    python -m app.pubsub --path /tmp/quiz-broadcast.sock
+"""
+from typing import Callable, Dict, Optional, Set
+from abc import ABC, abstractmethod
+import argparse
+import asyncio
+import logging
+import os
+import uuid
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Optioneel; alleen nodig voor BROADCAST_BACKEND=redis
+    redis_asyncio = None
+
+from app.scheduler import spawn
+from app.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# local, redis of unix
+BROADCAST_BACKEND = os.getenv("BROADCAST_BACKEND", "local")
+BROADCAST_REDIS_URL = os.getenv("BROADCAST_REDIS_URL", "redis://localhost:6379/0")
+BROADCAST_SOCKET_PATH = os.getenv("BROADCAST_SOCKET_PATH", "/tmp/quiz-broadcast.sock")
+# Prefix voor Redis channels: <prefix><game_code>
+BROADCAST_CHANNEL_PREFIX = os.getenv("BROADCAST_CHANNEL_PREFIX", "quiz:")
+
+# Wachttijd tussen reconnect pogingen naar de broker (seconden)
+RECONNECT_DELAY = 1.0
+
+# deliver(game_code, text, coalesce_key, player_id, role)
+DeliverCallback = Callable[[str, str, Optional[str], Optional[int], Optional[str]], None]
+# command(game_code, command, data)
+CommandCallback = Callable[[str, str, dict], None]
+
+
+class BroadcastBackend(ABC):
+    """Basis: levert lokaal en stuurt door naar andere workers."""
+
+    name = "base"
+    # False: er zijn geen andere workers, berichten blijven in dit proces
+    distributed = True
+
+    def __init__(self):
+        # Herkent eigen berichten die via de broker terugkomen
+        self.origin = uuid.uuid4().hex
+        self._deliver: Optional[DeliverCallback] = None
+        self._command: Optional[CommandCallback] = None
+        self._subscriptions: Set[str] = set()
+        self.published = 0
+        self.received = 0
+
+    async def start(self, deliver: DeliverCallback, command: Optional[CommandCallback] = None):
+        self._deliver = deliver
+        self._command = command
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, game_code: str):
+        """Ontvang berichten van andere workers voor deze game."""
+        self._subscriptions.add(game_code)
+
+    def unsubscribe(self, game_code: str):
+        self._subscriptions.discard(game_code)
+
+    async def publish(self, game_code: str, text: str, coalesce_key: Optional[str] = None,
+                      player_id: Optional[int] = None, role: Optional[str] = None):
+        """Lever lokaal en publiceer naar de andere workers.
+
+        Met `player_id` is het bericht alleen voor die speler bedoeld, met
+        `role` alleen voor verbindingen met die rol (bijv. de hosts).
+        """
+        self._deliver(game_code, text, coalesce_key, player_id, role)
+        payload = dumps({"o": self.origin, "k": coalesce_key, "p": player_id, "r": role, "t": text}).decode()
+        await self._publish_remote(game_code, payload)
+        self.published += 1
+
+    async def send_command(self, game_code: str, command: str, data: dict):
+        """Stuur een opdracht naar de andere workers van een game (niet naar dit proces)."""
+        payload = dumps({"o": self.origin, "c": command, "d": data}).decode()
+        await self._publish_remote(game_code, payload)
+        self.published += 1
+
+    @abstractmethod
+    async def _publish_remote(self, game_code: str, payload: str):
+        """Stuur een envelope naar de andere workers die deze game volgen."""
+
+    def _receive(self, game_code: str, payload: str):
+        """Bericht van een andere worker aan de lokale sockets leveren."""
+        try:
+            envelope = loads(payload)
+        except ValueError:
+            logger.warning("Ongeldig broadcast bericht voor %s", game_code)
+            return
+        if envelope.get("o") == self.origin or game_code not in self._subscriptions:
+            return
+        self.received += 1
+        if "c" in envelope:
+            if self._command is not None:
+                self._command(game_code, envelope["c"], envelope.get("d") or {})
+            return
+        self._deliver(game_code, envelope["t"], envelope.get("k"), envelope.get("p"), envelope.get("r"))
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "subscriptions": len(self._subscriptions),
+            "published": self.published,
+            "received": self.received,
+        }
+
+
+class LocalBackend(BroadcastBackend):
+    """In-process: één worker, geen serialisatie of I/O."""
+
+    name = "local"
+    distributed = False
+
+    async def publish(self, game_code: str, text: str, coalesce_key: Optional[str] = None,
+                      player_id: Optional[int] = None, role: Optional[str] = None):
+        self._deliver(game_code, text, coalesce_key, player_id, role)
+        self.published += 1
+
+    async def send_command(self, game_code: str, command: str, data: dict):
+        pass  # Geen andere workers
+
+    async def _publish_remote(self, game_code: str, payload: str):
+        pass
+
+
+class RedisBackend(BroadcastBackend):
+    """Redis pub/sub met één channel per game_code."""
+
+    name = "redis"
+
+    def __init__(self, url: str = BROADCAST_REDIS_URL, channel_prefix: str = BROADCAST_CHANNEL_PREFIX):
+        if redis_asyncio is None:
+            raise RuntimeError("BROADCAST_BACKEND=redis vereist het 'redis' package (pip install redis)")
+        super().__init__()
+        self.url = url
+        self.channel_prefix = channel_prefix
+        self._client = None
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: DeliverCallback, command: Optional[CommandCallback] = None):
+        await super().start(deliver, command)
+        self._client = redis_asyncio.from_url(self.url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        for game_code in self._subscriptions:
+            await self._pubsub.subscribe(self.channel_prefix + game_code)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+
+    def subscribe(self, game_code: str):
+        super().subscribe(game_code)
+        if self._pubsub is not None:
+            spawn(self._pubsub.subscribe(self.channel_prefix + game_code), name=f"subscribe:{game_code}")
+
+    def unsubscribe(self, game_code: str):
+        super().unsubscribe(game_code)
+        if self._pubsub is not None:
+            spawn(self._pubsub.unsubscribe(self.channel_prefix + game_code), name=f"unsubscribe:{game_code}")
+
+    async def _publish_remote(self, game_code: str, payload: str):
+        await self._client.publish(self.channel_prefix + game_code, payload)
+
+    async def _read_loop(self):
+        prefix_length = len(self.channel_prefix)
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Redis broadcast fout: %s", e)
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            channel = message["channel"]
+            data = message["data"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            if isinstance(data, bytes):
+                data = data.decode()
+            self._receive(channel[prefix_length:], data)
+
+
+class UnixSocketBackend(BroadcastBackend):
+    """Client van de lokale broker (`BrokerServer`) via een Unix socket.
+
+    Regelprotocol: SUB <code>, UNSUB <code>, PUB <code> <payload>; de broker
+    stuurt MSG <code> <payload> naar de andere abonnees van die game.
+    """
+
+    name = "unix"
+
+    def __init__(self, path: str = BROADCAST_SOCKET_PATH):
+        super().__init__()
+        self.path = path
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: DeliverCallback, command: Optional[CommandCallback] = None):
+        await super().start(deliver, command)
+        try:
+            await self._connect()
+        except OSError as e:
+            # Zonder broker werkt deze worker lokaal door; de read loop blijft proberen
+            logger.warning("Broadcast broker niet bereikbaar (%s), alleen lokale levering", e)
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def stop(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        self._close_writer()
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        self._reader = reader
+        self._writer = writer
+        for game_code in self._subscriptions:
+            self._send(f"SUB {game_code}\n")
+
+    def _close_writer(self):
+        self._reader = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _send(self, line: str):
+        if self._writer is not None:
+            self._writer.write(line.encode())
+
+    def subscribe(self, game_code: str):
+        super().subscribe(game_code)
+        self._send(f"SUB {game_code}\n")
+
+    def unsubscribe(self, game_code: str):
+        super().unsubscribe(game_code)
+        self._send(f"UNSUB {game_code}\n")
+
+    async def _publish_remote(self, game_code: str, payload: str):
+        if self._writer is None:
+            return  # Broker weg; lokale levering is al gebeurd
+        self._send(f"PUB {game_code} {payload}\n")
+        await self._writer.drain()
+
+    async def _read_loop(self):
+        while True:
+            line = b""
+            if self._reader is not None:
+                try:
+                    line = await self._reader.readline()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    pass
+
+            if not line:
+                # Broker verbinding verloren: opnieuw verbinden en abonneren
+                if self._writer is not None:
+                    logger.warning("Broadcast broker verbinding verloren, opnieuw verbinden...")
+                self._close_writer()
+                while True:
+                    await asyncio.sleep(RECONNECT_DELAY)
+                    try:
+                        await self._connect()
+                        break
+                    except OSError:
+                        continue
+                continue
+
+            parts = line.decode().rstrip("\n").split(" ", 2)
+            if len(parts) == 3 and parts[0] == "MSG":
+                self._receive(parts[1], parts[2])
+
+
+class BrokerServer:
+    """Lokale broker: stuurt PUB berichten door naar abonnees per game_code."""
+
+    # Abonnees met meer ongelezen bytes dan dit worden overgeslagen
+    MAX_BUFFERED_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, path: str = BROADCAST_SOCKET_PATH):
+        self.path = path
+        # game_code -> verbonden workers die deze game volgen
+        self._subscribers: Dict[str, Set[asyncio.StreamWriter]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Set[asyncio.Task] = set()
+        self.forwarded = 0
+        self.skipped = 0
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        self._subscribers.clear()
+
+    async def serve_forever(self):
+        await self.start()
+        logger.info("Broadcast broker luistert op %s", self.path)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        games: Set[str] = set()
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.decode().rstrip("\n").split(" ", 2)
+                command = parts[0]
+                if command == "SUB" and len(parts) >= 2:
+                    games.add(parts[1])
+                    self._subscribers.setdefault(parts[1], set()).add(writer)
+                elif command == "UNSUB" and len(parts) >= 2:
+                    games.discard(parts[1])
+                    self._remove(parts[1], writer)
+                elif command == "PUB" and len(parts) == 3:
+                    self._forward(parts[1], f"MSG {parts[1]} {parts[2]}\n".encode(), writer)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # Worker weg of broker stopt
+        finally:
+            for game_code in games:
+                self._remove(game_code, writer)
+            writer.close()
+            self._handlers.discard(task)
+
+    def _remove(self, game_code: str, writer: asyncio.StreamWriter):
+        subscribers = self._subscribers.get(game_code)
+        if subscribers is not None:
+            subscribers.discard(writer)
+            if not subscribers:
+                del self._subscribers[game_code]
+
+    def _forward(self, game_code: str, data: bytes, sender: asyncio.StreamWriter):
+        for writer in self._subscribers.get(game_code, ()):
+            if writer is sender:
+                continue
+            if writer.transport.get_write_buffer_size() > self.MAX_BUFFERED_BYTES:
+                self.skipped += 1
+                continue
+            writer.write(data)
+            self.forwarded += 1
+
+
+def create_backend(name: str = BROADCAST_BACKEND) -> BroadcastBackend:
+    if name == "local":
+        return LocalBackend()
+    if name == "redis":
+        return RedisBackend()
+    if name == "unix":
+        return UnixSocketBackend()
+    raise ValueError(f"Onbekende BROADCAST_BACKEND: {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokale broadcast broker voor meerdere workers")
+    parser.add_argument("--path", default=BROADCAST_SOCKET_PATH, help="Pad van de Unix socket")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(BrokerServer(args.path).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
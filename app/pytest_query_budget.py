@@ -0,0 +1,104 @@
+"""Pytest plugin voor de query budgets uit app/query_budget.py.
+
+Activeren met `pytest -p app.pytest_query_budget` of in een conftest.py:
+
+    pytest_plugins = ["app.pytest_query_budget"]
+
+- Elk HTTP request en WebSocket bericht tijdens een test wordt gemeten; boven
+  het budget van de route (ROUTE_BUDGETS) of bij een herhaalde SELECT vorm
+  faalt de test (`--query-budget=warn` rapporteert alleen)
+- Fixture `max_queries` voor een eigen budget binnen een test:
+
+      def test_quiz(client, max_queries):
+          with max_queries(3):
+              client.get("/api/admin/quiz/1")
+
+- Na de run volgt een overzicht per route: aanroepen, hoogste aantal queries
+  en budget, plus routes met een budget die geen enkele test raakte
+"""
+from typing import Iterator, List, Optional
+import contextlib
+
+import pytest
+
+from app import query_budget
+from app.query_budget import QueryTracker, report, track_queries
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("query-budget")
+    group.addoption(
+        "--query-budget", choices=("fail", "warn"), default="fail",
+        help="Laat tests falen boven het query budget of rapporteer alleen (standaard: fail)"
+    )
+
+
+def pytest_configure(config):
+    # Alles meten; falen gebeurt per test hieronder (ook voor WebSocket berichten,
+    # waar een exception in de handler de test niet zou bereiken)
+    query_budget.configure(mode="warn", sample_rate=1.0)
+
+
+def _problems(trackers: List[QueryTracker], budget: Optional[int] = None) -> List[str]:
+    """Overschrijdingen van het route budget van elke tracker (of van `budget`) en N+1 vermoedens."""
+    problems = []
+    for tracker in trackers:
+        limit = tracker.budget if budget is None else budget
+        if limit is not None and tracker.count > limit:
+            problems.append(f"{tracker.label}: {tracker.count} queries (budget {limit})")
+        for shape, n in tracker.repeated():
+            problems.append(f"{tracker.label}: {n}x dezelfde SELECT (mogelijk N+1): {shape[:200]}")
+    return problems
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    trackers: List[QueryTracker] = []
+    report.subscribe(trackers.append)
+    try:
+        result = yield
+    finally:
+        report.unsubscribe(trackers.append)
+    problems = _problems(trackers)
+    if problems and item.config.getoption("query_budget") == "fail":
+        pytest.fail("Query budget overschreden:\n" + "\n".join(problems), pytrace=False)
+    return result
+
+
+@pytest.fixture
+def max_queries():
+    """Context manager: alle requests, berichten en directe queries in het blok binnen `budget`."""
+
+    @contextlib.contextmanager
+    def check(budget: int, label: str = "test") -> Iterator[List[QueryTracker]]:
+        trackers: List[QueryTracker] = []
+        report.subscribe(trackers.append)
+        try:
+            # Directe queries in de test zelf (TestClient requests draaien in een
+            # eigen thread en komen via de report listener binnen)
+            with track_queries(label, budget=budget, sample=False):
+                yield trackers
+        finally:
+            report.unsubscribe(trackers.append)
+        problems = _problems(trackers, budget)
+        if problems:
+            pytest.fail(f"Meer dan {budget} queries:\n" + "\n".join(problems), pytrace=False)
+
+    return check
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not report.routes:
+        return
+    terminalreporter.section("query budgets")
+    for label, route in sorted(report.routes.items()):
+        status = "OVER" if route.violations else "ok"
+        terminalreporter.write_line(
+            f"{status:<4} {label:<45} aanroepen={route.calls:<5} max={route.max_count:<4} "
+            f"budget={'-' if route.budget is None else route.budget}"
+        )
+        for shape, n in route.repeated.items():
+            terminalreporter.write_line(f"     {n}x {shape[:160]}")
+    untested = sorted(set(query_budget.ROUTE_BUDGETS) - set(report.routes))
+    if untested:
+        terminalreporter.write_line("Niet geraakt door de tests: " + ", ".join(untested))
@@ -0,0 +1,235 @@
+"""Query budgets per route en per WebSocket bericht (N+1 detectie).
+
+Tijdens een request of een WebSocket bericht telt een `before_cursor_execute`
+listener de SQL statements. Statements met dezelfde vorm (gelijke SQL na het
+samenvoegen van IN-lijsten) die vaak terugkomen wijzen op een lazy load in
+een lus. Boven het budget van de route volgt een waarschuwing (`warn`) of
+een QueryBudgetExceeded (`raise`, voor tests).
+
+Budgets staan in ROUTE_BUDGETS met als key "METHOD /route/{template}" of
+"ws:<berichttype>"; overige routes krijgen QUERY_BUDGET_DEFAULT en None
+betekent alleen de N+1 controle. In productie
+kan een fractie van de requests gemeten worden met QUERY_BUDGET_SAMPLE_RATE.
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import contextlib
+import contextvars
+import logging
+import os
+import random
+import re
+
+from sqlalchemy import event
+
+from app.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# off, warn of raise
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off")
+# Fractie van de requests/berichten die gemeten wordt (1.0 = alles)
+QUERY_BUDGET_SAMPLE_RATE = float(os.getenv("QUERY_BUDGET_SAMPLE_RATE", "1.0"))
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "20"))
+# Zo vaak dezelfde statement vorm binnen één request geldt als verdacht
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "3"))
+
+MODES = ("off", "warn", "raise")
+
+# Maximaal aantal statements per route of WebSocket bericht
+ROUTE_BUDGETS: Dict[str, Optional[int]] = {
+    "GET /api/admin/quiz": 1,
+    "GET /api/admin/quiz/{quiz_id}": 3,
+    # Schrijven per rij (SQLite batcht INSERT .. RETURNING niet): groeit met de quiz
+    "POST /api/admin/quiz": None,
+    "POST /api/admin/quiz/import": None,
+    "PUT /api/admin/quiz/{quiz_id}": None,
+    "DELETE /api/admin/quiz/{quiz_id}": 7,
+    "POST /api/game/start": 5,
+    "POST /api/game/join": 3,
+    "GET /api/game/{game_code}": 1,
+    "GET /api/game/{game_code}/players": 2,
+    "GET /api/game/{game_code}/leaderboard": 4,
+    "POST /api/game/answer": 6,
+    # Tijdens het spel loopt het antwoord-pad volledig in geheugen
+    "ws:submit_answer": 0,
+    "ws:answer_submitted": 0,
+    "ws:start_game": 5,
+    "ws:next_question": 3,
+    "ws:end_question": 2,
+    "ws:kick_player": 2,
+}
+
+# IN-lijsten (`IN (?, ?, ?)`, `%(p_1)s, ...`, `$1, $2`) tellen als één vorm
+_PARAM = r"(?:\?|%\(\w+\)s|\$\d+(?:::\w+)?)"
+_PARAM_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})+\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    return _PARAM_LIST.sub("(?)", " ".join(statement.split()))
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryTracker:
+    """Statements van één request of WebSocket bericht."""
+
+    __slots__ = ("label", "count", "shapes", "budget")
+
+    def __init__(self, label: Optional[str] = None):
+        self.label = label
+        self.count = 0
+        self.shapes: Dict[str, int] = {}
+        self.budget: Optional[int] = None  # Gezet door check()
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def record(self, statement: str):
+        self.count += 1
+        # Alleen SELECTs: herhaalde INSERTs komen van de unit of work (SQLite
+        # kan INSERT .. RETURNING niet batchen), niet van lazy loads
+        if statement.lstrip()[:6].upper() == "SELECT":
+            shape = statement_shape(statement)
+            self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statement vormen die minstens `threshold` keer voorkwamen, vaakste eerst."""
+        return sorted(
+            ((shape, n) for shape, n in self.shapes.items() if n >= threshold),
+            key=lambda item: item[1], reverse=True
+        )
+
+
+class RouteQueries:
+    __slots__ = ("calls", "max_count", "budget", "violations", "repeated")
+
+    def __init__(self):
+        self.calls = 0
+        self.budget: Optional[int] = None
+        self.max_count = 0
+        self.violations = 0
+        self.repeated: Dict[str, int] = {}
+
+
+class QueryBudgetReport:
+    """Hoogste aantal queries per route over alle gemeten requests."""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteQueries] = {}
+        self._listeners: List[Callable[[QueryTracker], None]] = []
+
+    def observe(self, tracker: QueryTracker):
+        route = self.routes.get(tracker.label)
+        if route is None:
+            route = self.routes[tracker.label] = RouteQueries()
+        route.calls += 1
+        route.max_count = max(route.max_count, tracker.count)
+        route.budget = tracker.budget
+        if tracker.over_budget:
+            route.violations += 1
+        for shape, n in tracker.repeated():
+            route.repeated[shape] = max(route.repeated.get(shape, 0), n)
+        for listener in self._listeners:
+            listener(tracker)
+
+    def subscribe(self, listener: Callable[[QueryTracker], None]):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[QueryTracker], None]):
+        self._listeners.remove(listener)
+
+    def clear(self):
+        self.routes.clear()
+
+
+report = QueryBudgetReport()
+
+current_tracker: contextvars.ContextVar[Optional[QueryTracker]] = contextvars.ContextVar(
+    "current_tracker", default=None
+)
+
+
+def configure(mode: Optional[str] = None, sample_rate: Optional[float] = None):
+    """Pas mode en sample rate aan (bijv. vanuit de pytest plugin)."""
+    global QUERY_BUDGET_MODE, QUERY_BUDGET_SAMPLE_RATE
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"Onbekende QUERY_BUDGET_MODE '{mode}', kies uit {', '.join(MODES)}")
+        QUERY_BUDGET_MODE = mode
+    if sample_rate is not None:
+        QUERY_BUDGET_SAMPLE_RATE = sample_rate
+
+
+def budget_for(label: str) -> Optional[int]:
+    return ROUTE_BUDGETS.get(label, QUERY_BUDGET_DEFAULT)
+
+
+def check(tracker: QueryTracker, budget: Optional[int] = None):
+    """Leg het aantal vast en waarschuw of faal boven het budget."""
+    tracker.budget = budget_for(tracker.label) if budget is None else budget
+    report.observe(tracker)
+    for shape, n in tracker.repeated():
+        logger.warning("Mogelijk N+1 in %s: %dx %s", tracker.label, n, shape[:200])
+    if not tracker.over_budget:
+        return
+    message = f"{tracker.label} voerde {tracker.count} queries uit (budget {tracker.budget})"
+    if QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning("Query budget overschreden: %s", message)
+
+
+def _sampled() -> bool:
+    if QUERY_BUDGET_MODE == "off":
+        return False
+    return QUERY_BUDGET_SAMPLE_RATE >= 1 or random.random() < QUERY_BUDGET_SAMPLE_RATE
+
+
+@contextlib.contextmanager
+def track_queries(label: Optional[str] = None, budget: Optional[int] = None,
+                  sample: bool = True) -> Iterator[Optional[QueryTracker]]:
+    """Tel de queries in dit blok; het label mag binnen het blok nog gezet worden.
+
+    Geeft None als er niet gemeten wordt (mode off of niet gesampled).
+    """
+    if sample and not _sampled():
+        yield None
+        return
+    tracker = QueryTracker(label)
+    token = current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        current_tracker.reset(token)
+    # Alleen na een normaal afgerond blok; een exception gaat voor
+    check(tracker, budget)
+
+
+def instrument_engine(sync_engine):
+    """Registreer statements van een (sync of async.sync_engine) engine bij de huidige tracker."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def track_statement(conn, cursor, statement, parameters, context, executemany):
+        tracker = current_tracker.get()
+        if tracker is not None:
+            tracker.record(statement)
+
+
+class QueryBudgetMiddleware:
+    """Pure ASGI middleware die elk (gesampled) HTTP request tegen zijn budget houdt."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or QUERY_BUDGET_MODE == "off":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as tracker:
+            await self.app(scope, receive, send)
+            if tracker is not None:
+                # Route template is pas na de routing bekend
+                tracker.label = f"{scope['method']} {route_template(scope)}"
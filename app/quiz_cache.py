@@ -0,0 +1,195 @@
+"""Immutable quiz snapshots voor actieve games.
+
+Een snapshot wordt één keer geladen (vragen + antwoorden via eager loading)
+en bevat per vraag het al geserialiseerde `question_start` bericht zonder
+correcte antwoorden. Snapshots staan in een LRU cache en worden ongeldig
+gemaakt als een quiz gewijzigd of verwijderd wordt; lopende games houden hun
+eigen snapshot.
+
+`invalidate` werkt alleen in dit proces. Daarom controleert elke cache hit met
+één query `updated_at` van de quiz: een wijziging of verwijdering via een
+andere worker laadt de snapshot opnieuw (of geeft None).
+"""
+from typing import Optional, Tuple
+from collections import OrderedDict
+import os
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app import models
+from app.serialization import encode_message
+
+# Aantal quizzen dat in de cache blijft
+QUIZ_CACHE_SIZE = int(os.getenv("QUIZ_CACHE_SIZE", "128"))
+
+
+class AnswerSnapshot:
+    __slots__ = ("id", "answer_text", "is_correct", "order")
+
+    def __init__(self, answer: models.Answer):
+        self.id = answer.id
+        self.answer_text = answer.answer_text
+        self.is_correct = bool(answer.is_correct)
+        self.order = answer.order
+
+
+class QuestionSnapshot:
+    __slots__ = ("id", "question_text", "time_limit", "order", "answers",
+                 "correct_answer_id", "question_start_text")
+
+    def __init__(self, question: models.Question, index: int, total_questions: int):
+        self.id = question.id
+        self.question_text = question.question_text
+        self.time_limit = question.time_limit
+        self.order = question.order
+        self.answers: Tuple[AnswerSnapshot, ...] = tuple(
+            AnswerSnapshot(a) for a in sorted(question.answers, key=lambda a: (a.order, a.id))
+        )
+        self.correct_answer_id = next((a.id for a in self.answers if a.is_correct), None)
+
+        # Publiek bericht (zonder correcte antwoord indicator), één keer geserialiseerd
+        self.question_start_text = encode_message({
+            "type": "question_start",
+            "data": {
+                "question": {
+                    "id": self.id,
+                    "question_text": self.question_text,
+                    "time_limit": self.time_limit,
+                    "answers": [
+                        {"id": a.id, "answer_text": a.answer_text, "order": a.order}
+                        for a in self.answers
+                    ]
+                },
+                "question_number": index + 1,
+                "total_questions": total_questions
+            }
+        })
+
+    @property
+    def answer_ids(self) -> Tuple[int, ...]:
+        return tuple(a.id for a in self.answers)
+
+
+class QuizSnapshot:
+    """Geordende vragen en antwoorden van een quiz op het moment van laden."""
+
+    __slots__ = ("quiz_id", "title", "updated_at", "questions")
+
+    def __init__(self, quiz: models.Quiz):
+        self.quiz_id = quiz.id
+        self.title = quiz.title
+        # Versie van de quiz; een cache hit vergelijkt dit met de database
+        self.updated_at = quiz.updated_at
+        ordered = sorted(quiz.questions, key=lambda q: (q.order, q.id))
+        self.questions: Tuple[QuestionSnapshot, ...] = tuple(
+            QuestionSnapshot(q, idx, len(ordered)) for idx, q in enumerate(ordered)
+        )
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def question(self, index: int) -> Optional[QuestionSnapshot]:
+        if 0 <= index < len(self.questions):
+            return self.questions[index]
+        return None
+
+
+def _snapshot_query(quiz_id: int):
+    """Quiz met vragen en antwoorden in twee extra (selectin) queries."""
+    return select(models.Quiz).options(
+        selectinload(models.Quiz.questions).selectinload(models.Question.answers)
+    ).where(models.Quiz.id == quiz_id)
+
+
+def load_quiz_snapshot(db: Session, quiz_id: int) -> Optional[QuizSnapshot]:
+    quiz = db.execute(_snapshot_query(quiz_id)).scalars().first()
+    if quiz is None:
+        return None
+    return QuizSnapshot(quiz)
+
+
+def _version_query(quiz_id: int):
+    return select(models.Quiz.updated_at).where(models.Quiz.id == quiz_id)
+
+
+async def load_quiz_snapshot_async(db: AsyncSession, quiz_id: int) -> Optional[QuizSnapshot]:
+    quiz = (await db.execute(_snapshot_query(quiz_id))).scalars().first()
+    if quiz is None:
+        return None
+    return QuizSnapshot(quiz)
+
+
+class QuizCache:
+    """LRU cache van quiz snapshots per quiz_id."""
+
+    def __init__(self, max_size: int = QUIZ_CACHE_SIZE):
+        self.max_size = max_size
+        self._snapshots: "OrderedDict[int, QuizSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Verhoogd bij elke invalidate, zodat een lopende load geen oude data opslaat
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        # Hits die verouderd bleken (gewijzigd via een andere worker)
+        self.stale = 0
+
+    def _lookup(self, quiz_id: int):
+        """Geef (snapshot, generation); snapshot is None bij een miss."""
+        with self._lock:
+            snapshot = self._snapshots.get(quiz_id)
+            if snapshot is not None:
+                self._snapshots.move_to_end(quiz_id)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return snapshot, self._generation
+
+    def _is_current(self, snapshot: QuizSnapshot, updated_at) -> bool:
+        if snapshot.updated_at == updated_at:
+            return True
+        self.stale += 1
+        return False
+
+    def _store(self, quiz_id: int, snapshot: Optional[QuizSnapshot], generation: int):
+        with self._lock:
+            # Tussendoor ge-invalidate: niet opslaan, kan verouderd zijn
+            if generation != self._generation:
+                return
+            if snapshot is None:
+                # Quiz bestaat niet (meer)
+                self._snapshots.pop(quiz_id, None)
+                return
+            self._snapshots[quiz_id] = snapshot
+            while len(self._snapshots) > self.max_size:
+                self._snapshots.popitem(last=False)
+
+    def get(self, db: Session, quiz_id: int) -> Optional[QuizSnapshot]:
+        snapshot, generation = self._lookup(quiz_id)
+        if snapshot is not None and self._is_current(snapshot, db.scalar(_version_query(quiz_id))):
+            return snapshot
+        snapshot = load_quiz_snapshot(db, quiz_id)
+        self._store(quiz_id, snapshot, generation)
+        return snapshot
+
+    async def get_async(self, db: AsyncSession, quiz_id: int) -> Optional[QuizSnapshot]:
+        snapshot, generation = self._lookup(quiz_id)
+        if snapshot is not None and self._is_current(snapshot, await db.scalar(_version_query(quiz_id))):
+            return snapshot
+        snapshot = await load_quiz_snapshot_async(db, quiz_id)
+        self._store(quiz_id, snapshot, generation)
+        return snapshot
+
+    def invalidate(self, quiz_id: int):
+        with self._lock:
+            self._generation += 1
+            self._snapshots.pop(quiz_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+
+quiz_cache = QuizCache()
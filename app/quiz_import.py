@@ -0,0 +1,252 @@
+"""Bulk import van quiz vragen uit JSON Lines of CSV.
+
+Bestanden worden regel voor regel gelezen, elke regel wordt gevalideerd met
+`QuestionCreate` en vragen + antwoorden worden in chunks met executemany
+ingevoegd. Geheugengebruik blijft daardoor gelijk, ongeacht de bestandsgrootte.
+
+JSON Lines: één vraag per regel, zelfde velden als `QuestionCreate`:
+    {"question_text": "...", "time_limit": 20, "answers": [{"answer_text": "...", "is_correct": true}, ...]}
+
+CSV: kolommen question_text, time_limit, answer_1..answer_4 en correct
+(kolomnummer van het correcte antwoord, 1-4). Lege antwoordkolommen worden
+overgeslagen; `correct` blijft naar het kolomnummer verwijzen.
+
+Gebruik vanaf de command line:
+    python -m app.quiz_import vragen.jsonl --title "Mijn quiz"
+"""
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import csv
+import json
+import sys
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+
+IMPORT_CHUNK_SIZE = 500
+# Maximaal aantal foutmeldingen in het rapport (de teller loopt door)
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = ("jsonl", "csv")
+
+
+class ImportReport:
+    """Voortgang en resultaat van een import."""
+
+    def __init__(self, quiz_id: int):
+        self.quiz_id = quiz_id
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def add_error(self, row: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+
+def detect_format(filename: Optional[str]) -> str:
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def iter_jsonl_rows(lines: Iterable[str]) -> Iterator[Tuple[int, object]]:
+    """Yield (regelnummer, dict of foutmelding) per niet-lege regel."""
+    for row, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, ValueError(f"Ongeldige JSON: {e.msg}")
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[Tuple[int, object]]:
+    """Yield (regelnummer, dict of foutmelding) per CSV regel."""
+    reader = csv.DictReader(lines)
+    for record in reader:
+        row = reader.line_num
+        # (kolomnummer, tekst); het nummer blijft gelijk als er kolommen leeg zijn
+        answer_texts = [
+            (i, record[f"answer_{i}"].strip()) for i in range(1, 5)
+            if (record.get(f"answer_{i}") or "").strip()
+        ]
+        try:
+            correct = int(record.get("correct") or 0)
+        except ValueError:
+            yield row, ValueError("Kolom 'correct' moet een nummer zijn")
+            continue
+        if 1 <= correct <= 4 and all(column != correct for column, _ in answer_texts):
+            yield row, ValueError(f"Correct antwoord answer_{correct} is leeg")
+            continue
+
+        question = {
+            "question_text": record.get("question_text") or "",
+            "answers": [
+                {"answer_text": text, "is_correct": column == correct}
+                for column, text in answer_texts
+            ]
+        }
+        if (record.get("time_limit") or "").strip():
+            question["time_limit"] = record["time_limit"]
+        yield row, question
+
+
+def parse_question(raw: object) -> schemas.QuestionCreate:
+    """Valideer één ruwe rij; gooit ValueError met een leesbare melding."""
+    if isinstance(raw, Exception):
+        raise raw
+    try:
+        question = schemas.QuestionCreate.model_validate(raw)
+    except ValidationError as e:
+        first = e.errors()[0]
+        location = ".".join(str(part) for part in first["loc"])
+        raise ValueError(f"{location}: {first['msg']}" if location else first["msg"])
+
+    correct_count = sum(1 for a in question.answers if a.is_correct)
+    if correct_count != 1:
+        raise ValueError(f"Vraag moet precies 1 correct antwoord hebben, niet {correct_count}")
+    return question
+
+
+def insert_questions(db: Session, quiz_id: int, first_order: int, questions: List[schemas.QuestionCreate]):
+    """Voeg een chunk vragen met antwoorden in met twee executemany statements."""
+    question_ids = db.scalars(
+        insert(models.Question).returning(models.Question.id, sort_by_parameter_order=True),
+        [
+            {
+                "quiz_id": quiz_id,
+                "question_text": q.question_text,
+                "time_limit": q.time_limit,
+                "order": first_order + idx
+            }
+            for idx, q in enumerate(questions)
+        ]
+    ).all()
+
+    db.execute(insert(models.Answer), [
+        {
+            "question_id": question_id,
+            "answer_text": a.answer_text,
+            "is_correct": a.is_correct,
+            "order": a_idx
+        }
+        for question_id, q in zip(question_ids, questions)
+        for a_idx, a in enumerate(q.answers)
+    ])
+
+
+def import_questions(
+    db: Session,
+    quiz_id: int,
+    rows: Iterable[Tuple[int, object]],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[ImportReport], None]] = None
+) -> ImportReport:
+    """Valideer en importeer rijen in chunks; ongeldige rijen komen in het rapport.
+
+    Commit niet; de aanroeper bepaalt of het resultaat bewaard wordt.
+    """
+    report = ImportReport(quiz_id)
+    chunk: List[schemas.QuestionCreate] = []
+
+    for row, raw in rows:
+        try:
+            chunk.append(parse_question(raw))
+        except ValueError as e:
+            report.add_error(row, str(e))
+            continue
+
+        if len(chunk) >= chunk_size:
+            insert_questions(db, quiz_id, report.imported, chunk)
+            report.imported += len(chunk)
+            chunk = []
+            if progress is not None:
+                progress(report)
+
+    if chunk:
+        insert_questions(db, quiz_id, report.imported, chunk)
+        report.imported += len(chunk)
+        if progress is not None:
+            progress(report)
+
+    return report
+
+
+def import_quiz(
+    db: Session,
+    lines: Iterable[str],
+    title: str,
+    description: Optional[str] = None,
+    file_format: str = "jsonl",
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[ImportReport], None]] = None
+) -> ImportReport:
+    """Maak een quiz aan en importeer de vragen uit `lines` in één transactie.
+
+    Zonder geldige vragen wordt alles teruggedraaid.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Onbekend formaat '{file_format}', kies uit {', '.join(FORMATS)}")
+
+    db_quiz = models.Quiz(title=title, description=description)
+    db.add(db_quiz)
+    db.flush()  # Get quiz ID
+
+    rows = iter_csv_rows(lines) if file_format == "csv" else iter_jsonl_rows(lines)
+    try:
+        report = import_questions(db, db_quiz.id, rows, chunk_size, progress)
+    except Exception:
+        db.rollback()
+        raise
+
+    if report.imported == 0:
+        db.rollback()
+    else:
+        db.commit()
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Importeer een quiz uit JSON Lines of CSV")
+    parser.add_argument("path", help="Pad naar .jsonl of .csv bestand")
+    parser.add_argument("--title", required=True, help="Titel van de nieuwe quiz")
+    parser.add_argument("--description", default=None)
+    parser.add_argument("--format", choices=FORMATS, default=None, help="Standaard: afgeleid van extensie")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    from app.database import SessionLocal, init_db
+    init_db()
+
+    def show_progress(report: ImportReport):
+        print(f"  {report.imported} vragen geïmporteerd, {report.failed} fouten", file=sys.stderr)
+
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8", newline="") as f:
+            report = import_quiz(
+                db, f, args.title, args.description,
+                file_format=args.format or detect_format(args.path),
+                chunk_size=args.chunk_size,
+                progress=show_progress
+            )
+    finally:
+        db.close()
+
+    for error in report.errors:
+        print(f"  Regel {error['row']}: {error['error']}", file=sys.stderr)
+
+    if report.imported == 0:
+        print("❌ Geen geldige vragen gevonden, niets geïmporteerd")
+        sys.exit(1)
+    print(f"✅ Quiz {report.quiz_id} aangemaakt met {report.imported} vragen ({report.failed} fouten)")
+
+
+if __name__ == "__main__":
+    main()
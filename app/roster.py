@@ -0,0 +1,111 @@
+"""In-memory spelerslijst (roster) per game.
+
+De lobby en het host scherm krijgen bij connect één `roster` bericht met de
+volledige lijst en daarna alleen `player_joined`/`player_left` deltas. Elke
+worker met verbindingen voor een game houdt zo'n roster bij door dezelfde
+deltas toe te passen (zie ConnectionManager.deliver); zonder lokale
+verbindingen wordt hij weggegooid en bij de volgende connect opnieuw geladen.
+
+De geserialiseerde lijst en de ETag worden gecached tot de volgende wijziging,
+zodat `GET /api/game/{code}/players` een ongewijzigde lijst met 304 afdoet.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.serialization import dumps
+
+
+def player_entry(player: models.Player) -> dict:
+    """Roster entry in hetzelfde formaat als PlayerResponse."""
+    return schemas.PlayerResponse.model_validate(player).model_dump(mode="json")
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vergelijk een If-None-Match header (lijst, `*` of weak) met onze ETag."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class Roster:
+    """Spelers van één game in join volgorde, met gecachte JSON body."""
+
+    __slots__ = ("loaded", "_players", "_body", "_etag")
+
+    def __init__(self):
+        self.loaded = False
+        self._players: Dict[int, dict] = {}
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def _changed(self):
+        self._body = None
+        self._etag = None
+
+    def load(self, players: Iterable[dict]):
+        self._players = {player["id"]: player for player in players}
+        self.loaded = True
+        self._changed()
+
+    def upsert(self, player: dict):
+        if self._players.get(player["id"]) != player:
+            self._players[player["id"]] = player
+            self._changed()
+
+    def set_connected(self, player_id: int, is_connected: bool):
+        player = self._players.get(player_id)
+        if player is not None and player["is_connected"] != is_connected:
+            self._players[player_id] = {**player, "is_connected": is_connected}
+            self._changed()
+
+    def remove(self, player_id: int):
+        if self._players.pop(player_id, None) is not None:
+            self._changed()
+
+    def apply(self, message: dict):
+        """Verwerk een player_joined/player_left delta."""
+        if not self.loaded:
+            return  # Wordt bij het laden compleet uit de database gehaald
+        data = message["data"]
+        if message["type"] == "player_joined":
+            self.upsert(data["player"])
+        elif message["type"] == "player_left":
+            if data.get("removed"):
+                self.remove(data["player_id"])
+            else:
+                self.set_connected(data["player_id"], False)
+
+    def players(self) -> List[dict]:
+        return list(self._players.values())
+
+    def body(self) -> Tuple[bytes, str]:
+        """JSON body van de spelerslijst plus ETag (gecached tot de volgende wijziging)."""
+        if self._body is None:
+            self._body = dumps(self.players())
+            self._etag = make_etag(self._body)
+        return self._body, self._etag
+
+
+async def load_roster(db: AsyncSession, game_id: int, roster: Optional[Roster] = None) -> Roster:
+    """Laad de spelers van een game uit de database (in `roster` of een nieuwe)."""
+    players = await db.scalars(
+        select(models.Player).where(models.Player.game_session_id == game_id).order_by(models.Player.id)
+    )
+    roster = roster if roster is not None else Roster()
+    roster.load(player_entry(player) for player in players)
+    return roster
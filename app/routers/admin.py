@@ -1,14 +1,30 @@
 """Admin routes voor quiz beheer."""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from datetime import datetime, timezone
+import io
 
 from app.database import get_db
 from app import models, schemas
+from app.quiz_cache import quiz_cache
+from app.quiz_import import FORMATS, detect_format, import_quiz
+from app.serialization import model_response
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
 
+def _load_quiz(db: Session, quiz_id: int) -> Optional[models.Quiz]:
+    """Quiz met vragen en antwoorden in drie queries (geen lazy load per vraag).
+
+    populate_existing: ververst ook objecten die na een commit al in de sessie zitten.
+    """
+    return db.query(models.Quiz).options(
+        selectinload(models.Quiz.questions).selectinload(models.Question.answers)
+    ).populate_existing().filter(models.Quiz.id == quiz_id).first()
+
+
 @router.post("/quiz", response_model=schemas.QuizResponse, status_code=status.HTTP_201_CREATED)
 def create_quiz(quiz: schemas.QuizCreate, db: Session = Depends(get_db)):
     """Maak een nieuwe quiz aan met vragen en antwoorden."""
@@ -17,20 +33,9 @@ def create_quiz(quiz: schemas.QuizCreate, db: Session = Depends(get_db)):
         title=quiz.title,
         description=quiz.description
     )
-    db.add(db_quiz)
-    db.flush()  # Get quiz ID
     
-    # Voeg vragen toe
+    # Voeg vragen toe; ids worden bij de commit in batches toegekend
     for q_idx, question in enumerate(quiz.questions):
-        db_question = models.Question(
-            quiz_id=db_quiz.id,
-            question_text=question.question_text,
-            time_limit=question.time_limit,
-            order=q_idx
-        )
-        db.add(db_question)
-        db.flush()  # Get question ID
-        
         # Valideer: precies 1 correct antwoord
         correct_count = sum(1 for a in question.answers if a.is_correct)
         if correct_count != 1:
@@ -39,106 +44,321 @@ def create_quiz(quiz: schemas.QuizCreate, db: Session = Depends(get_db)):
                 detail=f"Vraag '{question.question_text}' moet precies 1 correct antwoord hebben, niet {correct_count}"
             )
         
-        # Voeg antwoorden toe
-        for a_idx, answer in enumerate(question.answers):
-            db_answer = models.Answer(
-                question_id=db_question.id,
-                answer_text=answer.answer_text,
-                is_correct=answer.is_correct,
-                order=a_idx
-            )
-            db.add(db_answer)
+        db_quiz.questions.append(models.Question(
+            question_text=question.question_text,
+            time_limit=question.time_limit,
+            order=q_idx,
+            answers=[
+                models.Answer(
+                    answer_text=answer.answer_text,
+                    is_correct=answer.is_correct,
+                    order=a_idx
+                )
+                for a_idx, answer in enumerate(question.answers)
+            ]
+        ))
     
+    db.add(db_quiz)
     db.commit()
-    db.refresh(db_quiz)
-    return db_quiz
+    return model_response(schemas.QuizResponse, _load_quiz(db, db_quiz.id), status.HTTP_201_CREATED)
+
+
+@router.post("/quiz/import", response_model=schemas.QuizImportResult, status_code=status.HTTP_201_CREATED)
+def import_quiz_file(
+    file: UploadFile = File(...),
+    title: str = Form(..., max_length=200),
+    description: Optional[str] = Form(None),
+    format: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
+    """Importeer een quiz uit een JSON Lines of CSV bestand (gestreamd)."""
+    file_format = format or detect_format(file.filename)
+    if file_format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Onbekend formaat, kies uit {', '.join(FORMATS)}")
+    
+    # Regel voor regel lezen uit de (naar schijf gespoolde) upload
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        report = import_quiz(db, lines, title, description, file_format=file_format)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Bestand moet UTF-8 zijn")
+    finally:
+        lines.detach()
+    
+    if report.imported == 0:
+        raise HTTPException(status_code=400, detail={
+            "message": "Geen geldige vragen gevonden",
+            "errors": report.errors
+        })
+    
+    return schemas.QuizImportResult(
+        quiz_id=report.quiz_id,
+        imported=report.imported,
+        failed=report.failed,
+        errors=report.errors
+    )
 
 
 @router.get("/quiz", response_model=List[schemas.QuizListItem])
-def list_quizzes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Haal alle quizzen op (zonder vragen)."""
-    quizzes = db.query(models.Quiz).offset(skip).limit(limit).all()
-    
-    result = []
-    for quiz in quizzes:
-        question_count = db.query(models.Question).filter(models.Question.quiz_id == quiz.id).count()
-        result.append(
-            schemas.QuizListItem(
-                id=quiz.id,
-                title=quiz.title,
-                description=quiz.description,
-                created_at=quiz.created_at,
-                question_count=question_count
-            )
+def list_quizzes(
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Haal quizzen op (zonder vragen), gesorteerd op (created_at, id).
+    
+    Volgende pagina: geef created_at en id van het laatste item mee als
+    after_created_at en after_id (keyset pagination, geen offset).
+    """
+    if (after_created_at is None) != (after_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Geef after_created_at en after_id samen mee"
+        )
+    
+    page = db.query(models.Quiz)
+    if after_created_at is not None:
+        page = page.filter(or_(
+            models.Quiz.created_at > after_created_at,
+            and_(models.Quiz.created_at == after_created_at, models.Quiz.id > after_id)
+        ))
+    page = page.order_by(models.Quiz.created_at, models.Quiz.id).limit(limit).subquery()
+    
+    # Aantal vragen alleen voor de quizzen op deze pagina
+    counts = db.query(
+        models.Question.quiz_id,
+        func.count(models.Question.id).label("question_count")
+    ).filter(
+        models.Question.quiz_id.in_(db.query(page.c.id))
+    ).group_by(
+        models.Question.quiz_id
+    ).subquery()
+    
+    rows = db.query(
+        page.c.id,
+        page.c.title,
+        page.c.description,
+        page.c.created_at,
+        func.coalesce(counts.c.question_count, 0)
+    ).outerjoin(
+        counts, counts.c.quiz_id == page.c.id
+    ).order_by(
+        page.c.created_at, page.c.id
+    ).all()
+    
+    return [
+        schemas.QuizListItem(
+            id=quiz_id,
+            title=title,
+            description=description,
+            created_at=created_at,
+            question_count=question_count
         )
-    return result
+        for quiz_id, title, description, created_at, question_count in rows
+    ]
 
 
 @router.get("/quiz/{quiz_id}", response_model=schemas.QuizResponse)
 def get_quiz(quiz_id: int, db: Session = Depends(get_db)):
     """Haal een specifieke quiz op met alle vragen en antwoorden."""
-    quiz = db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
+    quiz = _load_quiz(db, quiz_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz niet gevonden")
-    return quiz
+    return model_response(schemas.QuizResponse, quiz)
+
+
+def _set_if_changed(obj, **values) -> bool:
+    """Zet alleen gewijzigde attributen; True als er iets veranderd is."""
+    changed = False
+    for name, value in values.items():
+        if getattr(obj, name) != value:
+            setattr(obj, name, value)
+            changed = True
+    return changed
+
+
+def _match_ids(existing: dict, items: list, kind: str) -> set:
+    """Controleer dat elk meegestuurd id bestaat en maar één keer voorkomt."""
+    seen = set()
+    for item in items:
+        if item.id is None:
+            continue
+        if item.id not in existing or item.id in seen:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{kind} {item.id} hoort niet bij deze quiz of staat er dubbel in"
+            )
+        seen.add(item.id)
+    return seen
+
+
+def _refuse_scored(db: Session, question_ids: set, answer_ids: set):
+    """409 als te verwijderen vragen of antwoorden scores van gespeelde games hebben."""
+    if not question_ids and not answer_ids:
+        return
+    scored = db.query(models.Score.question_id, models.Score.answer_id).filter(or_(
+        models.Score.question_id.in_(question_ids),
+        models.Score.answer_id.in_(answer_ids)
+    )).first()
+    if scored is not None:
+        kind = "Vraag" if scored.question_id in question_ids else "Antwoord"
+        item_id = scored.question_id if kind == "Vraag" else scored.answer_id
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{kind} {item_id} heeft scores van gespeelde games en kan niet verwijderd worden"
+        )
+
+
+def _new_question(question: schemas.QuestionUpdate, q_idx: int) -> models.Question:
+    if any(answer.id is not None for answer in question.answers):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Nieuwe vraag '{question.question_text}' kan geen bestaande antwoorden bevatten"
+        )
+    return models.Question(
+        question_text=question.question_text,
+        time_limit=question.time_limit,
+        order=q_idx,
+        answers=[
+            models.Answer(answer_text=a.answer_text, is_correct=a.is_correct, order=a_idx)
+            for a_idx, a in enumerate(question.answers)
+        ]
+    )
+
+
+def _sync_answers(db_question: models.Question, answers: List[schemas.AnswerUpdate]) -> bool:
+    """Koppel antwoorden op id en pas alleen de verschillen toe."""
+    changed = False
+    existing = {a.id: a for a in db_question.answers}
+    keep = _match_ids(existing, answers, "Antwoord")
+    
+    for a_idx, answer in enumerate(answers):
+        if answer.id is None:
+            db_question.answers.append(models.Answer(
+                answer_text=answer.answer_text,
+                is_correct=answer.is_correct,
+                order=a_idx
+            ))
+            changed = True
+        else:
+            changed |= _set_if_changed(
+                existing[answer.id],
+                answer_text=answer.answer_text,
+                is_correct=answer.is_correct,
+                order=a_idx
+            )
+    
+    for answer_id, db_answer in existing.items():
+        if answer_id not in keep:
+            db_question.answers.remove(db_answer)
+            changed = True
+    
+    return changed
 
 
 @router.put("/quiz/{quiz_id}", response_model=schemas.QuizResponse)
-def update_quiz(quiz_id: int, quiz_update: schemas.QuizCreate, db: Session = Depends(get_db)):
-    """Update een bestaande quiz."""
-    db_quiz = db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
+def update_quiz(quiz_id: int, quiz_update: schemas.QuizUpdate, db: Session = Depends(get_db)):
+    """Update een bestaande quiz.
+    
+    Vragen en antwoorden worden op `id` gekoppeld aan de opgeslagen rijen:
+    alleen gewijzigde rijen krijgen een UPDATE, zodat ids (en daarmee scores van
+    eerdere games) bij dezelfde inhoud blijven. Zonder id wordt een rij
+    ingevoegd; opgeslagen rijen waarvan het id ontbreekt worden verwijderd,
+    behalve als er al scores naar verwijzen (409). Met
+    `updated_at` uit de laatst opgehaalde versie wordt een gelijktijdige
+    wijziging gedetecteerd (409).
+    """
+    # Valideer correct antwoord voordat er iets gewijzigd wordt
+    for question in quiz_update.questions:
+        correct_count = sum(1 for a in question.answers if a.is_correct)
+        if correct_count != 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Elke vraag moet precies 1 correct antwoord hebben"
+            )
+    
+    db_quiz = _load_quiz(db, quiz_id)
     if not db_quiz:
         raise HTTPException(status_code=404, detail="Quiz niet gevonden")
     
-    # Update quiz metadata
-    db_quiz.title = quiz_update.title
-    db_quiz.description = quiz_update.description
+    expected_updated_at = quiz_update.updated_at
+    if expected_updated_at is not None:
+        if expected_updated_at.tzinfo is not None:
+            expected_updated_at = expected_updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+        if expected_updated_at != db_quiz.updated_at:
+            raise HTTPException(status_code=409, detail="Quiz is intussen gewijzigd, herlaad en probeer opnieuw")
+    loaded_updated_at = db_quiz.updated_at
+    
+    # Quiz metadata gaat mee in de versie-check UPDATE hieronder
+    changed = (db_quiz.title, db_quiz.description) != (quiz_update.title, quiz_update.description)
+    
+    # Vragen op id koppelen
+    existing = {q.id: q for q in db_quiz.questions}
+    keep = _match_ids(existing, quiz_update.questions, "Vraag")
     
-    # Verwijder oude vragen (cascade verwijdert ook antwoorden)
-    db.query(models.Question).filter(models.Question.quiz_id == quiz_id).delete()
+    # Scores verwijzen zonder ON DELETE naar vragen en antwoorden: die niet weggooien
+    removed_answers = set()
+    for question in quiz_update.questions:
+        if question.id is not None:
+            sent = {a.id for a in question.answers}
+            removed_answers |= {a.id for a in existing[question.id].answers if a.id not in sent}
+    _refuse_scored(db, set(existing) - keep, removed_answers)
     
-    # Voeg nieuwe vragen toe
     for q_idx, question in enumerate(quiz_update.questions):
-        db_question = models.Question(
-            quiz_id=db_quiz.id,
+        if question.id is None:
+            db_quiz.questions.append(_new_question(question, q_idx))
+            changed = True
+            continue
+        db_question = existing[question.id]
+        changed |= _set_if_changed(
+            db_question,
             question_text=question.question_text,
             time_limit=question.time_limit,
             order=q_idx
         )
-        db.add(db_question)
-        db.flush()
-        
-        # Valideer correct antwoord
-        correct_count = sum(1 for a in question.answers if a.is_correct)
-        if correct_count != 1:
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Elke vraag moet precies 1 correct antwoord hebben"
-            )
-        
-        # Voeg antwoorden toe
-        for a_idx, answer in enumerate(question.answers):
-            db_answer = models.Answer(
-                question_id=db_question.id,
-                answer_text=answer.answer_text,
-                is_correct=answer.is_correct,
-                order=a_idx
-            )
-            db.add(db_answer)
+        changed |= _sync_answers(db_question, question.answers)
+    
+    # Vragen die niet meer in de update staan verwijderen (cascade verwijdert ook antwoorden)
+    for question_id, db_question in existing.items():
+        if question_id not in keep:
+            db_quiz.questions.remove(db_question)
+            changed = True
+    
+    if not changed:
+        db.rollback()
+        return model_response(schemas.QuizResponse, _load_quiz(db, quiz_id))
+    
+    # Optimistic concurrency: alleen bijwerken als niemand anders tussendoor schreef.
+    # Dit gebeurt vóór de flush van de ORM wijzigingen (autoflush staat uit).
+    result = db.execute(
+        update(models.Quiz)
+        .where(models.Quiz.id == quiz_id, models.Quiz.updated_at == loaded_updated_at)
+        .values(
+            title=quiz_update.title,
+            description=quiz_update.description,
+            updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Quiz is intussen gewijzigd, herlaad en probeer opnieuw")
     
     db.commit()
-    db.refresh(db_quiz)
-    return db_quiz
+    quiz_cache.invalidate(quiz_id)
+    return model_response(schemas.QuizResponse, _load_quiz(db, quiz_id))
 
 
 @router.delete("/quiz/{quiz_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_quiz(quiz_id: int, db: Session = Depends(get_db)):
     """Verwijder een quiz."""
-    db_quiz = db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
+    # Vragen en antwoorden in één keer laden voor de ORM cascade
+    db_quiz = _load_quiz(db, quiz_id)
     if not db_quiz:
         raise HTTPException(status_code=404, detail="Quiz niet gevonden")
     
     db.delete(db_quiz)
     db.commit()
+    quiz_cache.invalidate(quiz_id)
     return None
\ No newline at end of file
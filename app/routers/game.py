@@ -1,14 +1,23 @@
 """Game logic routes."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from typing import List, Optional
 import random
 import string
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app import models, schemas
+from app.connections import manager
+from app.game_state import AnswerRejected, calculate_points, game_states
+from app.leaderboard import leaderboards, load_leaderboard
+from app.metrics import answers
+from app.roster import etag_matches, load_roster, player_entry
+from app.score_writer import score_writer
+from app.serialization import FastJSONResponse, model_response
 
 router = APIRouter(prefix="/api/game", tags=["game"])
 
@@ -62,12 +71,12 @@ def get_game_session(game_code: str, db: Session = Depends(get_db)):
 
 
 @router.post("/join", response_model=schemas.PlayerResponse)
-def join_game(player_data: schemas.PlayerJoin, db: Session = Depends(get_db)):
+async def join_game(player_data: schemas.PlayerJoin, db: AsyncSession = Depends(get_async_db)):
     """Speler joint een game sessie."""
     # Valideer game bestaat
-    game = db.query(models.GameSession).filter(
+    game = await db.scalar(select(models.GameSession).where(
         models.GameSession.game_code == player_data.game_code
-    ).first()
+    ))
     
     if not game:
         raise HTTPException(status_code=404, detail="Game code ongeldig")
@@ -75,91 +84,99 @@ def join_game(player_data: schemas.PlayerJoin, db: Session = Depends(get_db)):
     if game.status != "waiting":
         raise HTTPException(status_code=400, detail="Game is al gestart of afgelopen")
     
-    # Check of naam al bestaat
-    existing_player = db.query(models.Player).filter(
-        models.Player.game_session_id == game.id,
-        models.Player.player_name == player_data.player_name
-    ).first()
-    
-    if existing_player:
-        raise HTTPException(status_code=400, detail="Naam is al in gebruik")
-    
-    # Maak speler
+    # Maak speler; de unique constraint op (game, naam) vangt dubbele namen af
     player = models.Player(
         game_session_id=game.id,
         player_name=player_data.player_name
     )
     db.add(player)
-    db.commit()
-    db.refresh(player)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Naam is al in gebruik")
+    await db.refresh(player)
+    
+    # Lokale roster bijwerken; andere workers krijgen de speler via player_joined
+    roster = manager.roster(player_data.game_code)
+    if roster is not None and roster.loaded:
+        roster.upsert(player_entry(player))
     
     return player
 
 
 @router.get("/{game_code}/players", response_model=List[schemas.PlayerResponse])
-def get_game_players(game_code: str, db: Session = Depends(get_db)):
-    """Haal alle spelers van een game op."""
-    game = db.query(models.GameSession).filter(models.GameSession.game_code == game_code).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="Game niet gevonden")
-    
-    players = db.query(models.Player).filter(models.Player.game_session_id == game.id).all()
-    return players
+async def get_game_players(game_code: str, db: AsyncSession = Depends(get_async_db),
+                           if_none_match: Optional[str] = Header(None)):
+    """Haal alle spelers van een game op (304 als de lijst niet veranderd is)."""
+    # Roster van de WebSocket verbindingen op deze worker, anders uit de database
+    roster = manager.roster(game_code)
+    if roster is None or not roster.loaded:
+        game_id = await db.scalar(select(models.GameSession.id).where(models.GameSession.game_code == game_code))
+        if not game_id:
+            raise HTTPException(status_code=404, detail="Game niet gevonden")
+        roster = await load_roster(db, game_id)
+    
+    body, etag = roster.body()
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.post("/answer", response_model=schemas.ScoreResponse)
-def submit_answer(answer_data: schemas.AnswerSubmit, db: Session = Depends(get_db)):
+async def submit_answer(answer_data: schemas.AnswerSubmit, db: AsyncSession = Depends(get_async_db)):
     """Verwerk een antwoord van een speler."""
+    # Snelle route: valideer en scoor tegen de live game state (geen I/O)
+    state = game_states.get(answer_data.game_code)
+    if state is not None:
+        try:
+            scored = state.submit(
+                answer_data.player_id,
+                answer_data.question_id,
+                answer_data.answer_id
+            )
+        except AnswerRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        
+        # Score rij gaat via de write-behind buffer naar de database
+        score_writer.enqueue(state.game_code, state.score_row(scored))
+        return model_response(schemas.ScoreResponse, scored)
+    
+    # Geen live state (bijv. na herstart): valideer via de database
     # Valideer game
-    game = db.query(models.GameSession).filter(
+    game = await db.scalar(select(models.GameSession).where(
         models.GameSession.game_code == answer_data.game_code
-    ).first()
+    ))
     
     if not game or game.status != "active":
         raise HTTPException(status_code=400, detail="Game is niet actief")
     
     # Valideer speler
-    player = db.query(models.Player).filter(
+    player_id = await db.scalar(select(models.Player.id).where(
         models.Player.id == answer_data.player_id,
         models.Player.game_session_id == game.id
-    ).first()
+    ))
     
-    if not player:
+    if not player_id:
         raise HTTPException(status_code=404, detail="Speler niet gevonden")
     
-    # Check of vraag al beantwoord
-    existing_score = db.query(models.Score).filter(
-        models.Score.game_session_id == game.id,
-        models.Score.player_id == answer_data.player_id,
-        models.Score.question_id == answer_data.question_id
-    ).first()
-    
-    if existing_score:
-        raise HTTPException(status_code=400, detail="Vraag al beantwoord")
-    
     # Valideer antwoord
-    answer = db.query(models.Answer).filter(models.Answer.id == answer_data.answer_id).first()
+    answer = await db.get(models.Answer, answer_data.answer_id)
     if not answer:
         raise HTTPException(status_code=404, detail="Antwoord niet gevonden")
     
     # Valideer vraag
-    question = db.query(models.Question).filter(models.Question.id == answer_data.question_id).first()
+    question = await db.get(models.Question, answer_data.question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Vraag niet gevonden")
     
-    # Bereken score
+    # Bereken score; zonder live state is er geen server-side starttijd, dus
+    # de tijd van de client, begrensd op de time limit
     is_correct = answer.is_correct
-    points = 0
-    
-    if is_correct:
-        time_limit_ms = question.time_limit * 1000
-        time_taken_ms = answer_data.time_taken
-        
-        if time_taken_ms < time_limit_ms:
-            remaining_time = time_limit_ms - time_taken_ms
-            points = int(1000 * (remaining_time / time_limit_ms))
-        else:
-            points = 100  # Minimale punten voor correct maar te laat
+    time_limit_ms = question.time_limit * 1000
+    time_taken = time_limit_ms if answer_data.time_taken is None else answer_data.time_taken
+    time_taken = min(max(time_taken, 0), time_limit_ms)
+    points = calculate_points(is_correct, question.time_limit, time_taken)
     
     # Sla score op
     score = models.Score(
@@ -169,53 +186,44 @@ def submit_answer(answer_data: schemas.AnswerSubmit, db: Session = Depends(get_d
         answer_id=answer_data.answer_id,
         is_correct=is_correct,
         points=points,
-        time_taken=answer_data.time_taken
+        time_taken=time_taken
     )
     db.add(score)
-    db.commit()
-    db.refresh(score)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Unique constraint op (game, speler, vraag)
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Vraag al beantwoord")
+    await db.refresh(score)
+    answers.labels("correct" if is_correct else "incorrect").inc()
     
-    return score
+    board = leaderboards.get(answer_data.game_code)
+    if board is not None:
+        board.record(score.player_id, score.points, score.is_correct)
+    
+    return model_response(schemas.ScoreResponse, score)
 
 
 @router.get("/{game_code}/leaderboard", response_model=schemas.Leaderboard)
-def get_leaderboard(game_code: str, db: Session = Depends(get_db)):
+async def get_leaderboard(game_code: str, db: AsyncSession = Depends(get_async_db)):
     """Haal het scoreboard op voor een game."""
-    game = db.query(models.GameSession).filter(models.GameSession.game_code == game_code).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="Game niet gevonden")
-    
-    # Query scores per speler
-    leaderboard_query = db.query(
-        models.Player.player_name,
-        func.sum(models.Score.points).label('total_score'),
-        func.sum(func.cast(models.Score.is_correct, Integer)).label('correct_answers')
-    ).join(
-        models.Score, models.Player.id == models.Score.player_id
-    ).filter(
-        models.Player.game_session_id == game.id
-    ).group_by(
-        models.Player.id
-    ).order_by(
-        func.sum(models.Score.points).desc()
-    ).all()
-    
-    # Maak entries met rank
-    entries = []
-    for idx, (name, score, correct) in enumerate(leaderboard_query, start=1):
-        entries.append(schemas.LeaderboardEntry(
-            player_name=name,
-            total_score=score or 0,
-            correct_answers=correct or 0,
-            rank=idx
-        ))
-    
-    # Tel totaal aantal vragen
-    total_questions = db.query(models.Question).filter(
-        models.Question.quiz_id == game.quiz_id
-    ).count()
-    
-    return schemas.Leaderboard(
-        entries=entries,
-        total_questions=total_questions
-    )
\ No newline at end of file
+    board = leaderboards.get(game_code)
+    
+    if board is None:
+        # Niet in geheugen (na herstart, of de game loopt op een andere worker):
+        # opnieuw opbouwen uit de scores
+        game = await db.scalar(select(models.GameSession).where(models.GameSession.game_code == game_code))
+        if not game:
+            raise HTTPException(status_code=404, detail="Game niet gevonden")
+        board = await load_leaderboard(db, game)
+        # Alleen een afgelopen game is definitief; tijdens het spel schrijft de
+        # worker van de host nog scores en zou een gecachte kopie verouderen
+        if game.status == "finished":
+            leaderboards.put(game_code, board)
+    
+    # Model direct naar bytes; FastAPI zou het opnieuw valideren en eerst een dict maken
+    return FastJSONResponse(schemas.Leaderboard(
+        entries=board.top(),
+        total_questions=board.total_questions
+    ))
@@ -1,199 +1,637 @@
 """WebSocket handler voor realtime game communicatie."""
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
-from typing import Dict, List, Set
-import json
-import asyncio
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import delete, select, update
 from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Set
+import asyncio
+import logging
+import os
+import time
+
+from app.database import AsyncSessionLocal
+from app import models, schemas
+from app.game_state import AnswerRejected, QuestionState, game_states
+from app.leaderboard import Leaderboard, leaderboards
+from app.connections import manager
+from app.query_budget import track_queries
+from app.quiz_cache import QuizSnapshot, quiz_cache
+from app.roster import load_roster, player_entry
+from app.scheduler import scheduler, spawn
+from app.score_writer import score_writer
+from app.serialization import encode_message, loads
 
-from app.database import get_db, SessionLocal
-from app import models
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Globale connection manager
-class ConnectionManager:
-    def __init__(self):
-        # game_code -> set van WebSocket connections
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, game_code: str):
-        await websocket.accept()
-        if game_code not in self.active_connections:
-            self.active_connections[game_code] = set()
-        self.active_connections[game_code].add(websocket)
-    
-    def disconnect(self, websocket: WebSocket, game_code: str):
-        if game_code in self.active_connections:
-            self.active_connections[game_code].discard(websocket)
-            if not self.active_connections[game_code]:
-                del self.active_connections[game_code]
-    
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
-        await websocket.send_json(message)
-    
-    async def broadcast(self, message: dict, game_code: str):
-        if game_code in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[game_code]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.add(connection)
-            
-            # Verwijder disconnected websockets
-            for conn in disconnected:
-                self.active_connections[game_code].discard(conn)
+# Extra tijd na de time limit voor antwoorden die nog onderweg zijn
+QUESTION_GRACE_MS = int(os.getenv("QUESTION_GRACE_MS", "500"))
+# Automatisch naar de volgende vraag na het tonen van de tussenstand
+AUTO_ADVANCE = os.getenv("AUTO_ADVANCE", "false").lower() in ("1", "true", "yes")
+AUTO_ADVANCE_DELAY_S = float(os.getenv("AUTO_ADVANCE_DELAY_S", "5"))
+# Minimale tijd tussen twee answer_progress berichten per game
+ANSWER_PROGRESS_INTERVAL = int(os.getenv("ANSWER_PROGRESS_INTERVAL_MS", "250")) / 1000
+
+# Berichten die alleen een host-verbinding mag sturen
+HOST_MESSAGES = frozenset({"start_game", "end_question", "next_question", "kick_player"})
+WS_MESSAGES = HOST_MESSAGES | {"submit_answer", "answer_submitted"}
 
-manager = ConnectionManager()
+# answer_progress throttling: laatste verzendtijd en games met een geplande verzending
+_progress_sent_at: Dict[str, float] = {}
+_progress_pending: Set[str] = set()
+# Eén vraagwissel tegelijk per game (host en auto-advance kunnen samenvallen)
+_advance_locks: Dict[str, asyncio.Lock] = {}
 
 
 @router.websocket("/ws/{game_code}/{player_name}")
-async def websocket_endpoint(websocket: WebSocket, game_code: str, player_name: str):
-    """WebSocket verbinding voor een speler in een game."""
-    await manager.connect(websocket, game_code)
+async def websocket_endpoint(websocket: WebSocket, game_code: str, player_name: str, role: str = "player",
+                             last_seq: Optional[int] = None, epoch: Optional[str] = None):
+    """WebSocket verbinding voor een speler of de host (`?role=host`) in een game.
     
-    db = SessionLocal()
+    Na een reconnect geeft de client `?last_seq=..&epoch=..` mee (uit het
+    session bericht en de `seq` van de broadcasts) en krijgt hij de gemiste
+    events, of een snapshot als die niet meer beschikbaar zijn.
+    """
+    connection = await manager.connect(websocket, game_code)
+    # Direct na connect: gemiste events komen zo vóór nieuwe broadcasts in de queue
+    resumed = manager.resume(connection, last_seq, epoch, role)
+    
+    is_host = role == "host"
+    player_id = None
     
     try:
-        # Valideer game en speler
-        game = db.query(models.GameSession).filter(
-            models.GameSession.game_code == game_code
-        ).first()
-        
-        if not game:
-            await websocket.send_json({"type": "error", "message": "Game niet gevonden"})
-            await websocket.close()
-            return
-        
-        player = db.query(models.Player).filter(
-            models.Player.game_session_id == game.id,
-            models.Player.player_name == player_name
-        ).first()
-        
-        if not player:
-            await websocket.send_json({"type": "error", "message": "Speler niet gevonden"})
-            await websocket.close()
-            return
+        # Korte async sessie; er blijft geen connectie open tijdens receive
+        async with AsyncSessionLocal() as db:
+            # Valideer game en speler
+            game = await db.scalar(select(models.GameSession).where(
+                models.GameSession.game_code == game_code
+            ))
+            
+            if not game:
+                await websocket.send_text(encode_message({"type": "error", "message": "Game niet gevonden"}))
+                await websocket.close()
+                manager.disconnect(websocket, game_code)
+                return
+            
+            game_id = game.id
+            quiz_id = game.quiz_id
+            game_status = game.status
+            
+            if not is_host:
+                player = await db.scalar(select(models.Player).where(
+                    models.Player.game_session_id == game.id,
+                    models.Player.player_name == player_name
+                ))
+                
+                if not player:
+                    await websocket.send_text(encode_message({"type": "error", "message": "Speler niet gevonden"}))
+                    await websocket.close()
+                    manager.disconnect(websocket, game_code)
+                    return
+                
+                # Update speler status
+                player.is_connected = True
+                entry = player_entry(player)
+                await db.commit()
+                player_id = player.id
+            
+            # Spelerslijst één keer per worker uit de database; daarna via deltas
+            roster = manager.roster(game_code)
+            if roster is not None and not roster.loaded:
+                await load_roster(db, game_id, roster)
         
-        # Update speler status
-        player.is_connected = True
-        db.commit()
+        if roster is not None:
+            if not is_host:
+                roster.upsert(entry)
+            await manager.send_personal_message({
+                "type": "roster",
+                "data": {"players": roster.players(), "player_count": len(roster)}
+            }, websocket)
+        player_count = len(roster) if roster is not None else 0
         
-        # Broadcast dat speler is gejoined
-        player_count = db.query(models.Player).filter(
-            models.Player.game_session_id == game.id
-        ).count()
+        if is_host:
+            # Host is geen speler: geen player_joined, wel answer_progress
+            manager.register_host(websocket, game_code)
+        else:
+            previous = manager.register_player(websocket, game_code, player_id, player_name)
+            if resumed:
+                # Gemiste player_rank e.d. konden pas na het valideren van de speler
+                manager.resume_player(connection, last_seq)
+            
+            if previous is not None:
+                # Zelfde speler in een tweede tabblad: de oude verbinding sluiten,
+                # voor de andere spelers verandert er niets
+                await manager.replace(previous)
+            else:
+                # Broadcast dat speler is gejoined (delta op de roster)
+                await manager.broadcast_roster({
+                    "type": "player_joined",
+                    "data": {
+                        "player": entry,
+                        "player_name": player_name,
+                        "player_count": player_count
+                    }
+                }, game_code)
         
-        await manager.broadcast({
-            "type": "player_joined",
-            "data": {
-                "player_name": player_name,
-                "player_count": player_count
-            }
-        }, game_code)
+        if last_seq is not None and not resumed:
+            # Te ver achter (of andere worker): huidige state in plaats van de events
+            await manager.send_personal_message({
+                "type": "snapshot",
+                "seq": manager.current_seq(game_code),
+                "data": build_snapshot(game_code, game_status, player_count, player_id)
+            }, websocket)
         
         # Luister naar berichten
         while True:
-            data = await websocket.receive_json()
+            data = loads(await websocket.receive_text())
             message_type = data.get("type")
             
-            if message_type == "start_game":
-                # Host start het spel
-                game.status = "active"
-                game.started_at = datetime.utcnow()
-                game.current_question = 0
-                db.commit()
-                
-                # Stuur eerste vraag
-                await send_question(game_code, game.quiz_id, 0, db)
+            # Queries per bericht tegen het budget (zie app/query_budget.py)
+            label = f"ws:{message_type}" if message_type in WS_MESSAGES else "ws:unknown"
+            with track_queries(label):
+                if message_type in HOST_MESSAGES and not is_host:
+                    await manager.send_personal_message(
+                        {"type": "error", "message": "Alleen de host kan het spel besturen"}, websocket
+                    )
             
-            elif message_type == "next_question":
-                # Host gaat naar volgende vraag
-                game.current_question += 1
-                db.commit()
-                
-                questions = db.query(models.Question).filter(
-                    models.Question.quiz_id == game.quiz_id
-                ).order_by(models.Question.order).all()
-                
-                if game.current_question < len(questions):
-                    await send_question(game_code, game.quiz_id, game.current_question, db)
-                else:
-                    # Spel afgelopen
-                    game.status = "finished"
-                    game.finished_at = datetime.utcnow()
-                    db.commit()
-                    
-                    await manager.broadcast({
-                        "type": "game_finished",
-                        "data": {"game_code": game_code}
-                    }, game_code)
+                elif message_type == "start_game":
+                    # Host start het spel
+                    error = await start_game(game_code, game_id, quiz_id)
+                    if error:
+                        await manager.send_personal_message({"type": "error", "message": error}, websocket)
             
-            elif message_type == "answer_submitted":
-                # Speler heeft antwoord gegeven - broadcast update
-                await manager.broadcast({
-                    "type": "answer_received",
-                    "data": {"player_name": player_name}
-                }, game_code)
+                elif message_type == "end_question":
+                    # Host sluit de vraag en toont de tussenstand (op de worker met de live state)
+                    if not await run_on_owner(game_code, "end_question"):
+                        await end_question(game_code)
+            
+                elif message_type == "next_question":
+                    # Host gaat naar volgende vraag
+                    if not await run_on_owner(game_code, "next_question"):
+                        await next_question(game_code, game_id, quiz_id)
+            
+                elif message_type == "kick_player":
+                    # Host verwijdert een speler uit de lobby
+                    error = await kick_player(game_code, game_id, (data.get("data") or {}).get("player_name"))
+                    if error:
+                        await manager.send_personal_message({"type": "error", "message": error}, websocket)
+            
+                elif message_type == "submit_answer" and not is_host:
+                    # Antwoord via de bestaande verbinding; resultaat alleen naar deze speler
+                    await submit_answer(websocket, game_code, player_id, data.get("data"))
+            
+                elif message_type == "answer_submitted":
+                    # Oude clients (antwoord via HTTP): alleen de voortgang bijwerken
+                    await broadcast_answer_progress(game_code)
     
     except WebSocketDisconnect:
-        manager.disconnect(websocket, game_code)
+        await disconnected(connection, is_host, player_id, player_name)
+    
+    except Exception:
+        logger.exception("WebSocket fout in game %s (%s)", game_code, player_name)
+        await disconnected(connection, is_host, player_id, player_name)
+
+
+async def disconnected(connection, is_host: bool, player_id: Optional[int], player_name: str):
+    """Ruim een verbroken verbinding op en meld de speler af bij de rest van de game."""
+    game_code = connection.game_code
+    manager.disconnect(connection.websocket, game_code)
+    
+    # Vervangen door een nieuw tabblad of gekickt: status en player_left zijn al geregeld
+    if is_host or player_id is None or connection.closing is not None:
+        return
+    
+    # Shield: de update moet afronden, ook als de handler gecanceld wordt
+    await asyncio.shield(set_player_connected(player_id, False))
+    
+    await manager.broadcast_roster({
+        "type": "player_left",
+        "data": {"player_id": player_id, "player_name": player_name, "removed": False}
+    }, game_code)
+
+
+def build_snapshot(game_code: str, status: str, player_count: int,
+                   player_id: Optional[int] = None) -> schemas.WSSnapshot:
+    """Compacte state van een game uit de live state (geen database queries)."""
+    state = game_states.get(game_code)
+    if state is None:
+        return schemas.WSSnapshot(status=status, player_count=player_count)
+    
+    fields = {}
+    question = state.question
+    if question is not None:
+        public = state.quiz.question(state.question_index)
+        fields["question"] = loads(public.question_start_text)["data"]
+        fields["remaining_ms"] = question.time_limit * 1000 - question.elapsed_ms()
+        fields["answered"] = player_id is not None and state.has_answered(player_id)
+    
+    board = state.leaderboard
+    if board is not None:
+        fields["leaderboard"] = board.top(10)
+        standing = board.standing(player_id) if player_id is not None else None
+        if standing is not None:
+            fields["rank"] = schemas.WSPlayerRank(
+                rank=board.rank(player_id),
+                total_score=standing.total_score,
+                correct_answers=standing.correct_answers,
+                player_count=len(board)
+            )
+    return schemas.WSSnapshot(status="active", player_count=player_count, **fields)
+
+
+async def submit_answer(websocket: WebSocket, game_code: str, player_id: int, payload):
+    """Valideer en scoor een antwoord tegen de live state en antwoord op dezelfde socket.
+    
+    Staat de live state op een andere worker (die van de host), dan wordt het
+    antwoord daar gescoord; het resultaat komt via send_to_player terug.
+    Bevestigt geen enkele worker het antwoord, dan is de game niet actief.
+    """
+    try:
+        answer = schemas.WSSubmitAnswer.model_validate(payload or {})
+    except ValidationError:
+        await manager.send_personal_message({
+            "type": "answer_rejected",
+            "data": {"status_code": 422, "detail": "Ongeldig antwoord bericht"}
+        }, websocket)
+        return
+    
+    async def reply(message: dict):
+        await manager.send_personal_message(message, websocket)
+    
+    if await run_on_owner(game_code, "submit_answer", {"player_id": player_id, **answer.model_dump()}):
+        return
+    
+    await score_answer(game_code, player_id, answer, reply)
+
+
+async def run_on_owner(game_code: str, command: str, data: Optional[dict] = None) -> bool:
+    """Laat de worker met de live state van de game een opdracht uitvoeren.
+    
+    False als de state op deze worker staat, er geen andere workers zijn of
+    geen worker de opdracht bevestigt; de aanroeper handelt hem dan zelf af.
+    """
+    if game_states.get(game_code) is not None or not manager.backend.distributed:
+        return False
+    return await manager.request(game_code, command, data or {})
+
+
+def owns_game(game_code: str) -> bool:
+    return game_states.get(game_code) is not None
+
+
+async def score_answer(game_code: str, player_id: int, answer: schemas.WSSubmitAnswer,
+                       reply: Callable[[dict], Awaitable[None]]):
+    """Scoor een antwoord tegen de live state; `reply` stuurt het resultaat naar de speler."""
+    state = game_states.get(game_code)
+    try:
+        if state is None:
+            raise AnswerRejected(400, "Game is niet actief")
+        scored = state.submit(player_id, answer.question_id, answer.answer_id)
+    except AnswerRejected as e:
+        await reply({
+            "type": "answer_rejected",
+            "data": {"status_code": e.status_code, "detail": e.detail}
+        })
+        return
+    
+    # Score rij gaat via de write-behind buffer naar de database
+    score_writer.enqueue(game_code, state.score_row(scored))
+    
+    await reply({
+        "type": "answer_result",
+        "data": schemas.ScoreResponse.model_validate(scored)
+    })
+    await broadcast_answer_progress(game_code)
+
+
+async def remote_submit_answer(game_code: str, data: dict):
+    """Antwoord van een speler die op een andere worker verbonden is."""
+    player_id = data["player_id"]
+    
+    async def reply(message: dict):
+        await manager.send_to_player(message, game_code, player_id)
+    
+    await score_answer(game_code, player_id, schemas.WSSubmitAnswer.model_validate(data), reply)
+
+
+manager.on_command("submit_answer", remote_submit_answer, owns=owns_game)
+
+
+async def remote_start_game(game_code: str, data: dict):
+    """start_game van een host op een andere worker."""
+    state = game_states.get(game_code)
+    if state is None:
+        return
+    error = await start_game(game_code, state.game_id, state.quiz_id)
+    if error:
+        await manager.send_to_hosts({"type": "error", "message": error}, game_code)
+
+
+async def remote_next_question(game_code: str, data: dict):
+    """next_question van een host op een andere worker."""
+    state = game_states.get(game_code)
+    if state is not None:
+        await next_question(game_code, state.game_id, state.quiz_id)
+
+
+async def remote_end_question(game_code: str, data: dict):
+    """end_question van een host op een andere worker."""
+    await end_question(game_code)
+
+
+manager.on_command("start_game", remote_start_game, owns=owns_game)
+manager.on_command("next_question", remote_next_question, owns=owns_game)
+manager.on_command("end_question", remote_end_question, owns=owns_game)
+
+
+async def broadcast_answer_progress(game_code: str):
+    """Meld de voortgang aan de hosts, hoogstens eens per ANSWER_PROGRESS_INTERVAL.
+    
+    Antwoorden binnen het interval worden samengevoegd tot één bericht met de
+    stand op het moment van verzenden.
+    """
+    if game_code in _progress_pending:
+        return  # Verzending staat al gepland en neemt dit antwoord mee
+    
+    wait = _progress_sent_at.get(game_code, 0.0) + ANSWER_PROGRESS_INTERVAL - time.monotonic()
+    if wait <= 0:
+        await send_answer_progress(game_code)
+        return
+    
+    _progress_pending.add(game_code)
+    asyncio.get_running_loop().call_later(
+        wait, lambda: spawn(send_answer_progress(game_code), name=f"answer_progress:{game_code}")
+    )
+
+
+async def send_answer_progress(game_code: str):
+    """Geaggregeerde voortgang ("N van M beantwoord") naar de host verbindingen."""
+    _progress_pending.discard(game_code)
+    _progress_sent_at[game_code] = time.monotonic()
+    
+    state = game_states.get(game_code)
+    if state is None or state.question is None:
+        return
+    await manager.send_to_hosts({
+        "type": "answer_progress",
+        "data": schemas.WSAnswerProgress(
+            question_id=state.question.question_id,
+            answered=state.answered_count(),
+            total=state.player_count
+        )
+    }, game_code)
+
+
+async def kick_player(game_code: str, game_id: int, player_name: str):
+    """Verwijder een speler uit de lobby en sluit diens verbinding.
+    
+    Geeft een foutmelding terug als de speler niet verwijderd kan worden.
+    """
+    if not player_name:
+        return "Geen speler opgegeven"
+    
+    async with AsyncSessionLocal() as db:
+        status = await db.scalar(select(models.GameSession.status).where(models.GameSession.id == game_id))
+        if status != "waiting":
+            return "Spelers kunnen alleen in de lobby verwijderd worden"
+        
+        # Core delete: in de lobby zijn er nog geen scores om te cascaden
+        player_id = await db.scalar(delete(models.Player).where(
+            models.Player.game_session_id == game_id,
+            models.Player.player_name == player_name
+        ).returning(models.Player.id))
+        if player_id is None:
+            return "Speler niet gevonden"
+        await db.commit()
+    
+    if not await manager.kick(game_code, player_id):
+        # Speler zit op een andere worker (of is niet verbonden): de client sluit zelf
+        await manager.send_to_player({
+            "type": "kicked",
+            "message": "Je bent door de host uit het spel verwijderd"
+        }, game_code, player_id)
+    
+    await manager.broadcast_roster({
+        "type": "player_left",
+        "data": {"player_id": player_id, "player_name": player_name, "removed": True}
+    }, game_code)
+    return None
+
+
+async def set_player_connected(player_id: int, is_connected: bool):
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(models.Player).where(models.Player.id == player_id).values(is_connected=is_connected)
+        )
+        await db.commit()
+
+
+async def start_game(game_code: str, game_id: int, quiz_id: int):
+    """Start de game: laad de quiz snapshot, maak live state en stuur vraag 1.
+    
+    Loopt de game al op een andere worker, dan herstart die worker hem met
+    zijn eigen live state. Geeft een foutmelding terug als de game niet
+    gestart kan worden.
+    """
+    if game_states.get(game_code) is None and manager.backend.distributed:
+        async with AsyncSessionLocal() as db:
+            status = await db.scalar(select(models.GameSession.status).where(models.GameSession.id == game_id))
+        if status == "active" and await run_on_owner(game_code, "start_game"):
+            return None
+    
+    async with AsyncSessionLocal() as db:
+        # Quiz snapshot voor de hele game (vragen + antwoorden in één keer)
+        quiz = await quiz_cache.get_async(db, quiz_id)
+        if not quiz:
+            return "Quiz heeft geen vragen"
         
-        # Update speler status
-        if player:
-            player.is_connected = False
-            db.commit()
+        await db.execute(update(models.GameSession).where(models.GameSession.id == game_id).values(
+            status="active",
+            started_at=datetime.utcnow(),
+            current_question=0
+        ))
+        await db.commit()
         
-        await manager.broadcast({
-            "type": "player_left",
-            "data": {"player_name": player_name}
-        }, game_code)
+        # Live state en scoreboard voor het antwoord-pad
+        players = (await db.execute(
+            select(models.Player.id, models.Player.player_name).where(
+                models.Player.game_session_id == game_id
+            )
+        )).all()
     
-    except Exception as e:
-        print(f"WebSocket error: {e}")
-        manager.disconnect(websocket, game_code)
+    board = Leaderboard(total_questions=len(quiz))
+    for player_id, name in players:
+        board.add_player(player_id, name)
+    board.rank_changes()  # Startposities als referentie voor de eerste delta
+    leaderboards.put(game_code, board)
     
-    finally:
-        db.close()
+    game_states.create(
+        game_id, game_code, quiz,
+        [player_id for player_id, _ in players],
+        leaderboard=board
+    )
+    
+    # Stuur eerste vraag
+    await send_question(game_code, quiz, 0)
+    return None
 
 
-async def send_question(game_code: str, quiz_id: int, question_index: int, db: Session):
-    """Stuur een vraag naar alle spelers."""
-    questions = db.query(models.Question).filter(
-        models.Question.quiz_id == quiz_id
-    ).order_by(models.Question.order).all()
+async def next_question(game_code: str, game_id: int, quiz_id: int,
+                        expected_index: Optional[int] = None):
+    """Sluit de huidige vraag af en stuur de volgende, of beëindig de game.
     
-    if question_index >= len(questions):
+    Afsluiten, doorschuiven en versturen gebeuren onder een lock per game en
+    de volgende index komt uit de live state, zodat twee gelijktijdige
+    aanroepen (host en auto-advance, of twee hosts) nooit dezelfde vraag
+    opnieuw versturen. Met `expected_index` gebeurt er niets als de game
+    intussen al verder is.
+    """
+    lock = _advance_locks.setdefault(game_code, asyncio.Lock())
+    async with lock:
+        state = game_states.get(game_code)
+        if expected_index is not None and (state is None or state.question_index != expected_index):
+            return
+        
+        # Een geplande timeout of auto-advance is hiermee achterhaald
+        scheduler.cancel(game_code)
+        await end_question(game_code)
+        
+        async with AsyncSessionLocal() as db:
+            if state is not None:
+                quiz = state.quiz
+                index = state.question_index + 1
+            else:
+                # Geen live state (bijv. na een herstart): positie uit de database
+                row = (await db.execute(
+                    select(models.GameSession.current_question, models.GameSession.status)
+                    .where(models.GameSession.id == game_id)
+                )).first()
+                if row is None or row.status != "active":
+                    return
+                quiz = await quiz_cache.get_async(db, quiz_id)
+                index = (row.current_question or 0) + 1
+            
+            game = update(models.GameSession).where(models.GameSession.id == game_id)
+            if quiz is not None and index < len(quiz):
+                await db.execute(game.values(current_question=index))
+                await db.commit()
+                await send_question(game_code, quiz, index)
+                return
+            
+            # Spel afgelopen
+            await db.execute(game.values(status="finished", finished_at=datetime.utcnow()))
+            await db.commit()
+        
+        scheduler.cancel(game_code)
+        game_states.remove(game_code)
+        _progress_sent_at.pop(game_code, None)
+        _advance_locks.pop(game_code, None)
+        
+        await manager.broadcast({
+            "type": "game_finished",
+            "data": {"game_code": game_code}
+        }, game_code)
+
+
+async def end_question(game_code: str):
+    """Sluit de huidige vraag af en stuur het correcte antwoord plus de tussenstand."""
+    state = game_states.get(game_code)
+    if state is None:
         return
     
-    question = questions[question_index]
+    question = state.close_question()
+    if question is None:
+        return  # Al afgesloten
     
-    # Format antwoorden (zonder correcte antwoord indicator)
-    answers = []
-    for answer in question.answers:
-        answers.append({
-            "id": answer.id,
-            "answer_text": answer.answer_text,
-            "order": answer.order
-        })
+    if AUTO_ADVANCE:
+        schedule_auto_advance(state)
+    else:
+        scheduler.cancel(game_code)
     
+    # Alle antwoorden van deze vraag moeten in de database staan
+    # (blokkerende flush in de threadpool, niet in de event loop)
+    await run_in_threadpool(score_writer.flush, game_code)
+    
+    board = state.leaderboard
     await manager.broadcast({
-        "type": "question_start",
-        "data": {
-            "question": {
-                "id": question.id,
-                "question_text": question.question_text,
-                "time_limit": question.time_limit,
-                "answers": answers
-            },
-            "question_number": question_index + 1,
-            "total_questions": len(questions)
-        }
+        "type": "question_end",
+        "data": schemas.WSQuestionEnd(
+            correct_answer_id=question.correct_answer_id,
+            leaderboard=board.top(10),
+            rank_changes=board.rank_changes()
+        )
     }, game_code)
+    
+    # Eigen positie alleen naar de betreffende speler: één bericht met alle
+    # posities, elke worker levert aan zijn eigen spelers
+    player_count = len(board)
+    ranks = {}
+    for player_id in state.player_ids:
+        standing = board.standing(player_id)
+        if standing is None:
+            continue
+        ranks[player_id] = schemas.WSPlayerRank(
+            rank=board.rank(player_id),
+            total_score=standing.total_score,
+            correct_answers=standing.correct_answers,
+            player_count=player_count
+        )
+    await manager.send_to_each_player("player_rank", ranks, game_code)
+
+
+async def send_question(game_code: str, quiz: QuizSnapshot, question_index: int):
+    """Stuur een vraag naar alle spelers."""
+    question = quiz.question(question_index)
+    if question is None:
+        return
+    
+    # Activeer de vraag in de live state voordat spelers hem zien
+    state = game_states.get(game_code)
+    if state is not None:
+        state.set_question(question_index, QuestionState(
+            question_id=question.id,
+            correct_answer_id=question.correct_answer_id,
+            answer_ids=question.answer_ids,
+            time_limit=question.time_limit
+        ))
+        schedule_question_timeout(state, question_index)
+    
+    # Payload is al geserialiseerd in de snapshot
+    await manager.broadcast_text(question.question_start_text, game_code)
+
+
+def schedule_question_timeout(state, question_index: int):
+    """Sluit de vraag automatisch na de time limit (plus marge)."""
+    async def close_question():
+        current = game_states.get(state.game_code)
+        if current is state and current.question_index == question_index:
+            await end_question(state.game_code)
+    
+    delay = state.question.time_limit + QUESTION_GRACE_MS / 1000
+    scheduler.schedule(state.game_code, delay, close_question)
+
+
+def schedule_auto_advance(state):
+    """Ga na AUTO_ADVANCE_DELAY_S naar de volgende vraag, tenzij de host al verder is."""
+    question_index = state.question_index
+    
+    async def advance():
+        current = game_states.get(state.game_code)
+        if current is state and current.question_index == question_index and current.question is None:
+            await next_question(state.game_code, state.game_id, state.quiz_id, expected_index=question_index)
+    
+    scheduler.schedule(state.game_code, AUTO_ADVANCE_DELAY_S, advance)
 
 
 @router.get("/ws/test")
 async def websocket_test():
     """Test endpoint voor WebSocket connectiviteit."""
-    return {"message": "WebSocket endpoint beschikbaar", "active_games": len(manager.active_connections)}
\ No newline at end of file
+    return {"message": "WebSocket endpoint beschikbaar", "active_games": len(manager.games)}
+
+
+@router.get("/ws/stats")
+async def websocket_stats():
+    """Connection en fan-out latency statistieken per game."""
+    return {**manager.stats(), "scheduler": scheduler.stats()}
@@ -0,0 +1,176 @@
+"""Server-side timers voor vragen (timer wheel).
+
+Eén asyncio task bedient de timers van alle games. Timers staan in een
+hashed timer wheel met vaste slots van SCHEDULER_TICK_MS; per tick wordt
+alleen het huidige slot bekeken, dus de kosten hangen niet af van het aantal
+games. Per game_code is er hoogstens één timer: een nieuwe timer vervangt de
+vorige (bijv. "vraag sluiten" wordt "volgende vraag").
+
+Callbacks zijn coroutine functies en draaien als eigen task, zodat een trage
+callback de wheel niet ophoudt. `spawn` start zulke losse tasks en houdt ze
+vast tot ze klaar zijn (de event loop zelf bewaart alleen een zwakke referentie).
+"""
+from typing import Awaitable, Callable, Coroutine, Dict, List, Optional, Set
+import asyncio
+import logging
+import math
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Resolutie van de timers
+SCHEDULER_TICK_MS = int(os.getenv("SCHEDULER_TICK_MS", "100"))
+# Aantal slots; timers verder weg dan één omwenteling blijven gewoon staan
+SCHEDULER_WHEEL_SIZE = int(os.getenv("SCHEDULER_WHEEL_SIZE", "512"))
+
+TimerCallback = Callable[[], Awaitable[None]]
+
+# Lopende achtergrond tasks; zonder referentie kan de GC ze halverwege opruimen
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _background_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Achtergrond task %s faalde", task.get_name(), exc_info=task.exception())
+
+
+def spawn(coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+    """Start een losse task, houd hem vast tot hij klaar is en log een exception."""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_done)
+    return task
+
+
+class Timer:
+    __slots__ = ("key", "deadline_tick", "callback", "cancelled")
+
+    def __init__(self, key: str, deadline_tick: int, callback: TimerCallback):
+        self.key = key
+        self.deadline_tick = deadline_tick
+        self.callback = callback
+        self.cancelled = False
+
+
+class TimerWheel:
+    """Timers per key (game_code) op één gedeelde asyncio task."""
+
+    def __init__(self, tick_ms: int = SCHEDULER_TICK_MS, wheel_size: int = SCHEDULER_WHEEL_SIZE):
+        self.tick = tick_ms / 1000
+        self.wheel_size = wheel_size
+        self._slots: List[List[Timer]] = [[] for _ in range(wheel_size)]
+        self._timers: Dict[str, Timer] = {}
+        self._origin = time.monotonic()
+        self._current_tick = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.fired = 0
+        self.max_lag_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def _now_tick(self) -> int:
+        return int((time.monotonic() - self._origin) / self.tick)
+
+    def schedule(self, key: str, delay: float, callback: TimerCallback):
+        """Roep `callback` aan na `delay` seconden; vervangt een bestaande timer voor key."""
+        self.cancel(key)
+        # Eerste tick op of na het gevraagde moment: nooit eerder dan gevraagd
+        deadline = time.monotonic() - self._origin + max(delay, 0.0)
+        deadline_tick = max(self._now_tick() + 1, math.ceil(deadline / self.tick))
+        timer = Timer(key, deadline_tick, callback)
+        self._timers[key] = timer
+        self._slots[deadline_tick % self.wheel_size].append(timer)
+        self._ensure_running()
+
+    def cancel(self, key: str):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            # Blijft in zijn slot staan en wordt daar overgeslagen
+            timer.cancelled = True
+
+    def remaining(self, key: str) -> Optional[float]:
+        """Seconden tot de timer van key afgaat (None als er geen is)."""
+        timer = self._timers.get(key)
+        if timer is None:
+            return None
+        return max(0.0, timer.deadline_tick * self.tick - (time.monotonic() - self._origin))
+
+    def _ensure_running(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        self._current_tick = self._now_tick()
+        while True:
+            if not self._timers:
+                # Niets te doen: slapen tot er een timer bijkomt
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                self._current_tick = self._now_tick()
+
+            next_at = self._origin + (self._current_tick + 1) * self.tick
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Ook ticks inhalen die gemist zijn (event loop was bezet)
+            now_tick = self._now_tick()
+            lag_ms = (time.monotonic() - next_at) * 1000
+            if lag_ms > self.max_lag_ms:
+                self.max_lag_ms = lag_ms
+            while self._current_tick < now_tick:
+                self._current_tick += 1
+                self._expire(self._current_tick)
+
+    def _expire(self, tick: int):
+        slot = self._slots[tick % self.wheel_size]
+        if not slot:
+            return
+        keep = []
+        for timer in slot:
+            if timer.cancelled:
+                continue
+            if timer.deadline_tick > tick:
+                keep.append(timer)  # Pas in een volgende omwenteling
+                continue
+            if self._timers.get(timer.key) is timer:
+                del self._timers[timer.key]
+            self.fired += 1
+            spawn(self._fire(timer), name=f"timer:{timer.key}")
+        self._slots[tick % self.wheel_size] = keep
+
+    @staticmethod
+    async def _fire(timer: Timer):
+        try:
+            await timer.callback()
+        except Exception:
+            logger.exception("Timer %s faalde", timer.key)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._timers.clear()
+        self._slots = [[] for _ in range(self.wheel_size)]
+
+    def stats(self) -> dict:
+        return {
+            "timers": len(self._timers),
+            "fired": self.fired,
+            "tick_ms": round(self.tick * 1000, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+        }
+
+
+scheduler = TimerWheel()
@@ -15,6 +15,11 @@ class AnswerCreate(AnswerBase):
     pass
 
 
+class AnswerUpdate(AnswerCreate):
+    """Antwoord in een quiz update; zonder id wordt het een nieuw antwoord."""
+    id: Optional[int] = None
+
+
 class AnswerResponse(AnswerBase):
     id: int
     question_id: int
@@ -44,6 +49,12 @@ class QuestionCreate(QuestionBase):
     answers: List[AnswerCreate] = Field(..., min_length=2, max_length=4)
 
 
+class QuestionUpdate(QuestionCreate):
+    """Vraag in een quiz update; zonder id wordt het een nieuwe vraag."""
+    id: Optional[int] = None
+    answers: List[AnswerUpdate] = Field(..., min_length=2, max_length=4)
+
+
 class QuestionResponse(QuestionBase):
     id: int
     quiz_id: int
@@ -72,6 +83,12 @@ class QuizCreate(QuizBase):
     questions: List[QuestionCreate] = Field(..., min_length=1)
 
 
+class QuizUpdate(QuizCreate):
+    """Quiz update; updated_at van de bewerkte versie voor conflict detectie."""
+    questions: List[QuestionUpdate] = Field(..., min_length=1)
+    updated_at: Optional[datetime] = None
+
+
 class QuizResponse(QuizBase):
     id: int
     created_at: datetime
@@ -92,6 +109,19 @@ class QuizListItem(QuizBase):
         from_attributes = True
 
 
+class QuizImportError(BaseModel):
+    row: int
+    error: str
+
+
+class QuizImportResult(BaseModel):
+    """Resultaat van een bulk import."""
+    quiz_id: int
+    imported: int
+    failed: int
+    errors: List[QuizImportError]
+
+
 # ===== Game Session Schemas =====
 class GameSessionCreate(BaseModel):
     quiz_id: int
@@ -133,11 +163,12 @@ class AnswerSubmit(BaseModel):
     player_id: int
     question_id: int
     answer_id: int
-    time_taken: int  # Milliseconden
+    # Milliseconden; alleen gebruikt als de server de vraag niet zelf heeft getimed
+    time_taken: Optional[int] = None
 
 
 class ScoreResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # Leeg zolang de score nog niet is weggeschreven
     player_id: int
     question_id: int
     is_correct: bool
@@ -178,6 +209,44 @@ class WSQuestionStart(BaseModel):
     total_questions: int
 
 
+class WSRankChange(BaseModel):
+    player_name: str
+    rank: int
+    previous_rank: Optional[int] = None
+
+
 class WSQuestionEnd(BaseModel):
     correct_answer_id: int
-    leaderboard: List[LeaderboardEntry]
\ No newline at end of file
+    leaderboard: List[LeaderboardEntry]  # Top 10
+    rank_changes: List[WSRankChange] = []
+
+
+class WSSubmitAnswer(BaseModel):
+    """Payload van een submit_answer bericht (speler volgt uit de verbinding)."""
+    question_id: int
+    answer_id: int
+
+
+class WSAnswerProgress(BaseModel):
+    question_id: int
+    answered: int
+    total: int
+
+
+class WSPlayerRank(BaseModel):
+    """Eigen positie, alleen naar de betreffende speler gestuurd."""
+    rank: int
+    total_score: int
+    correct_answers: int
+    player_count: int
+
+
+class WSSnapshot(BaseModel):
+    """Huidige state voor een client die te ver achter loopt om te resumen."""
+    status: str
+    player_count: int
+    question: Optional[WSQuestionStart] = None  # Alleen als er een vraag open staat
+    remaining_ms: Optional[int] = None
+    answered: bool = False
+    leaderboard: List[LeaderboardEntry] = []
+    rank: Optional[WSPlayerRank] = None
@@ -0,0 +1,223 @@
+"""Write-behind buffer voor Score rijen.
+
+Antwoorden worden per game gebufferd en in batches weggeschreven met een
+enkele multi-row INSERT, zodat het bevestigen van een antwoord niet meer op
+de database hoeft te wachten.
+"""
+from typing import Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+import logging
+import os
+import threading
+import time
+
+from app.database import SessionLocal
+from app import models
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Flush na dit aantal rijen per game of na dit tijdvenster
+SCORE_FLUSH_BATCH_SIZE = int(os.getenv("SCORE_FLUSH_BATCH_SIZE", "500"))
+SCORE_FLUSH_INTERVAL_MS = int(os.getenv("SCORE_FLUSH_INTERVAL_MS", "200"))
+# Zo vaak wordt een rij die los niet weg te schrijven is opnieuw geprobeerd
+SCORE_MAX_ATTEMPTS = int(os.getenv("SCORE_MAX_ATTEMPTS", "5"))
+
+
+def _insert_ignoring_duplicates(dialect_name: str):
+    """INSERT die rijen overslaat die de unique constraint op scores schenden.
+
+    Een al opgeslagen antwoord (bijv. via de database route na een herstart)
+    mag niet de hele batch laten falen en eindeloos opnieuw proberen.
+    """
+    if dialect_name == "sqlite":
+        return sqlite.insert(models.Score).on_conflict_do_nothing()
+    if dialect_name == "postgresql":
+        return postgresql.insert(models.Score).on_conflict_do_nothing()
+    return insert(models.Score)
+
+
+class ScoreWriteBuffer:
+    """Buffert Score inserts per game en schrijft ze in batches weg."""
+
+    def __init__(self, session_factory=SessionLocal,
+                 batch_size: int = SCORE_FLUSH_BATCH_SIZE,
+                 flush_interval_ms: int = SCORE_FLUSH_INTERVAL_MS,
+                 max_attempts: int = SCORE_MAX_ATTEMPTS):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_attempts = max_attempts
+
+        # game_code -> rijen die nog weggeschreven moeten worden
+        self._pending: Dict[str, List[dict]] = {}
+        # id(rij) -> mislukte pogingen; alleen gebruikt onder _write_lock
+        self._attempts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Serialiseert writes zodat flush() ook op lopende writes wacht
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        # Metrics
+        self.rows_written = 0
+        self.flush_count = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def enqueue(self, game_code: str, row: dict):
+        """Voeg een Score rij toe aan de buffer van een game."""
+        with self._lock:
+            rows = self._pending.setdefault(game_code, [])
+            rows.append(row)
+            full = len(rows) >= self.batch_size
+        self._ensure_started()
+        if full:
+            self._wakeup.set()
+
+    def flush(self, game_code: Optional[str] = None) -> int:
+        """Schrijf de buffer (van één of alle games) direct weg.
+
+        Wacht ook op een write die op dat moment al loopt, zodat alle eerder
+        bevestigde antwoorden in de database staan als deze functie terugkeert.
+        """
+        with self._write_lock:
+            with self._lock:
+                if game_code is None:
+                    batches = list(self._pending.items())
+                    self._pending = {}
+                else:
+                    rows = self._pending.pop(game_code, None)
+                    batches = [(game_code, rows)] if rows else []
+
+            written = 0
+            for code, rows in batches:
+                written += self._write(code, rows)
+            return written
+
+    def _insert(self, rows: List[dict]):
+        db = self.session_factory()
+        try:
+            statement = _insert_ignoring_duplicates(db.get_bind().dialect.name)
+            for i in range(0, len(rows), self.batch_size):
+                chunk = rows[i:i + self.batch_size]
+                db.execute(statement.values(chunk))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write(self, game_code: str, rows: List[dict]) -> int:
+        start = time.perf_counter()
+        try:
+            self._insert(rows)
+            written = len(rows)
+            for row in rows:
+                self._attempts.pop(id(row), None)
+        except Exception as e:
+            self.failed_flushes += 1
+            logger.warning("Score flush voor %s mislukt, rij voor rij opnieuw: %s", game_code, e)
+            written = self._write_individually(game_code, rows)
+
+        if written:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.flush_count += 1
+            self.rows_written += written
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self.total_flush_ms += elapsed_ms
+        return written
+
+    def _write_individually(self, game_code: str, rows: List[dict]) -> int:
+        """Schrijf een mislukte batch rij voor rij, zodat één foute rij de rest niet tegenhoudt.
+
+        Rijen die los ook falen gaan terug in de buffer; na `max_attempts`
+        pogingen wordt zo'n rij gelogd en verworpen (bijv. een FK fout na een
+        gewijzigde quiz), in plaats van elke batch opnieuw te laten falen.
+        """
+        written = 0
+        retry = []
+        for row in rows:
+            try:
+                self._insert([row])
+            except Exception as e:
+                attempts = self._attempts.pop(id(row), 0) + 1
+                if attempts >= self.max_attempts:
+                    self.dropped_rows += 1
+                    logger.error("Score rij verworpen na %d pogingen (%s): %s (%s)", attempts, game_code, row, e)
+                else:
+                    self._attempts[id(row)] = attempts
+                    retry.append(row)
+            else:
+                self._attempts.pop(id(row), None)
+                written += 1
+
+        if retry:
+            # Terug in de buffer zodat de volgende flush het opnieuw probeert
+            with self._lock:
+                self._pending[game_code] = retry + self._pending.get(game_code, [])
+        return written
+
+    def start(self):
+        """Start de achtergrond thread die periodiek flusht."""
+        self._stopped = False
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._thread is None and not self._stopped:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="score-writer", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._pending:
+                self.flush()
+
+    def close(self):
+        """Stop de achtergrond thread en schrijf alles weg."""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def queue_depth(self, game_code: Optional[str] = None) -> int:
+        with self._lock:
+            if game_code is not None:
+                return len(self._pending.get(game_code, ()))
+            return sum(len(rows) for rows in self._pending.values())
+
+    def stats(self) -> dict:
+        """Metrics voor monitoring: queue diepte en flush latency."""
+        with self._lock:
+            per_game = {code: len(rows) for code, rows in self._pending.items()}
+        return {
+            "queue_depth": sum(per_game.values()),
+            "queue_depth_per_game": per_game,
+            "rows_written": self.rows_written,
+            "flush_count": self.flush_count,
+            "failed_flushes": self.failed_flushes,
+            "dropped_rows": self.dropped_rows,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.flush_count, 3) if self.flush_count else 0.0,
+        }
+
+
+score_writer = ScoreWriteBuffer()
+
+registry.gauge("quiz_score_queue_depth", "Scores in de write-behind buffer", score_writer.queue_depth)
@@ -0,0 +1,135 @@
+"""Snelle JSON serialisatie voor HTTP responses en WebSocket berichten.
+
+Alle JSON die de app verstuurt gaat via deze module in plaats van direct via
+`json.dumps`/`send_json`. Serializers (env JSON_SERIALIZER):
+- orjson: orjson (standaard als het package geïnstalleerd is)
+- json: de standaard library, zonder extra dependency
+- auto: orjson indien beschikbaar, anders json
+
+Pydantic modellen gaan niet via een tussenliggende dict: `model_json` laat
+pydantic-core het model direct naar bytes schrijven, ook als `data` van een
+WebSocket bericht (`encode_message`). `FastJSONResponse` is de standaard
+response class van de app; routes met grote response modellen geven het
+gevalideerde model er rechtstreeks aan.
+"""
+from typing import Any
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time
+import json
+import os
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Optioneel; zonder orjson valt auto terug op json
+    orjson = None
+
+# auto, orjson of json
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "auto")
+
+
+def _default(obj: Any) -> Any:
+    """Types die de serializer zelf niet kent."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj).__name__} is niet JSON serialiseerbaar")
+
+
+class Serializer(ABC):
+    name = "base"
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """Compacte JSON als UTF-8 bytes."""
+
+    @abstractmethod
+    def loads(self, data: Any) -> Any:
+        """JSON (str of bytes) naar Python objecten."""
+
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("JSON_SERIALIZER=orjson vereist het 'orjson' package (pip install orjson)")
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self._options)
+
+    def loads(self, data: Any) -> Any:
+        return orjson.loads(data)
+
+
+class StdlibSerializer(Serializer):
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode()
+
+    def loads(self, data: Any) -> Any:
+        return json.loads(data)
+
+
+def create_serializer(name: str = JSON_SERIALIZER) -> Serializer:
+    if name == "auto":
+        return OrjsonSerializer() if orjson is not None else StdlibSerializer()
+    if name == "orjson":
+        return OrjsonSerializer()
+    if name == "json":
+        return StdlibSerializer()
+    raise ValueError(f"Onbekende JSON_SERIALIZER: {name}")
+
+
+serializer = create_serializer()
+
+
+def dumps(obj: Any) -> bytes:
+    return serializer.dumps(obj)
+
+
+def loads(data: Any) -> Any:
+    return serializer.loads(data)
+
+
+def model_json(model: BaseModel) -> bytes:
+    """Pydantic model direct naar JSON bytes (pydantic-core, geen dict ertussen)."""
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def encode_message(message: dict) -> str:
+    """Serialiseer een WebSocket bericht één keer naar tekst (compact, UTF-8).
+
+    Is `data` een pydantic model, dan schrijft pydantic-core het model zelf en
+    komt alleen de envelope (`type` en eventuele andere velden) via de serializer.
+    """
+    data = message.get("data")
+    if not isinstance(data, BaseModel):
+        return dumps(message).decode()
+    envelope = dumps({key: value for key, value in message.items() if key != "data"})
+    separator = b"," if len(envelope) > 2 else b""
+    return (envelope[:-1] + separator + b'"data":' + model_json(data) + b"}").decode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse via de gekozen serializer; een pydantic model gaat direct naar bytes."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return model_json(content)
+        return dumps(content)
+
+
+def model_response(model_class: type, obj: Any, status_code: int = 200) -> FastJSONResponse:
+    """Valideer `obj` (bijv. een ORM object) tegen `model_class` en stuur het als bytes.
+
+    FastAPI valideert een teruggegeven object zelf tegen het response_model en
+    maakt er eerst een dict van; een Response gaat er ongewijzigd doorheen.
+    """
+    return FastJSONResponse(model_class.model_validate(obj), status_code=status_code)
+
@@ -0,0 +1,112 @@
+// WebSocket verbinding met automatische reconnect en resume
+//
+// Broadcasts van de server hebben een oplopend `seq`. Na een verbroken
+// verbinding verbindt de client opnieuw met de laatst geziene seq en krijgt
+// alleen de gemiste events, of een `snapshot` met de huidige state.
+
+// Close codes waarbij we niet opnieuw verbinden
+const CLOSE_REPLACED = 4001;
+const CLOSE_KICKED = 4003;
+
+function connectGameSocket(gameCode, playerName, onMessage, options = {}) {
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const socket = {
+        ws: null,
+        epoch: null,
+        lastSeq: 0,
+        retries: 0,
+        closed: false,
+        // Geeft false terug als het bericht niet verstuurd kon worden (bv. tijdens een reconnect)
+        send(data) {
+            if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+                this.ws.send(data);
+                return true;
+            }
+            return false;
+        },
+        close() {
+            this.closed = true;
+            if (this.ws) this.ws.close();
+        }
+    };
+
+    function open() {
+        const params = new URLSearchParams(options.query || {});
+        if (socket.epoch !== null) {
+            params.set('last_seq', socket.lastSeq);
+            params.set('epoch', socket.epoch);
+        }
+        const query = params.toString();
+        socket.ws = new WebSocket(
+            `${protocol}//${window.location.host}/ws/${gameCode}/${encodeURIComponent(playerName)}${query ? '?' + query : ''}`
+        );
+
+        socket.ws.onopen = () => {
+            socket.retries = 0;
+            if (options.onOpen) options.onOpen();
+        };
+
+        socket.ws.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+
+            if (message.type === 'session') {
+                socket.epoch = message.data.epoch;
+                // Bij resume volgen nog oudere events; die moeten we wel verwerken
+                if (!message.data.resumed) socket.lastSeq = message.data.seq;
+                return;
+            }
+
+            if (message.type === 'snapshot') {
+                socket.lastSeq = message.seq;
+            } else if (message.seq !== undefined) {
+                if (message.seq <= socket.lastSeq) return;  // Al gezien
+                socket.lastSeq = message.seq;
+            }
+
+            onMessage(message);
+        };
+
+        socket.ws.onerror = (error) => {
+            console.error('WebSocket error:', error);
+        };
+
+        socket.ws.onclose = (event) => {
+            if (socket.closed || event.code === CLOSE_REPLACED || event.code === CLOSE_KICKED) {
+                return;
+            }
+            if (options.onReconnecting) options.onReconnecting();
+            // Exponential backoff, maximaal 10 seconden
+            const delay = Math.min(500 * 2 ** socket.retries, 10000);
+            socket.retries++;
+            setTimeout(open, delay);
+        };
+    }
+
+    open();
+    return socket;
+}
+
+// Spelerslijst bijhouden uit het roster bericht (bij connect) en de deltas.
+// Geeft true terug als het bericht de lijst veranderde.
+function applyRosterMessage(players, message) {
+    switch (message.type) {
+        case 'roster':
+            players.clear();
+            message.data.players.forEach(player => players.set(player.id, player));
+            return true;
+
+        case 'player_joined':
+            if (!message.data.player) return false;
+            players.set(message.data.player.id, message.data.player);
+            return true;
+
+        case 'player_left':
+            if (message.data.removed) {
+                players.delete(message.data.player_id);
+            } else if (players.has(message.data.player_id)) {
+                players.set(message.data.player_id, {...players.get(message.data.player_id), is_connected: false});
+            }
+            return true;
+    }
+    return false;
+}
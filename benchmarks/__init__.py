@@ -0,0 +1 @@
+"""Benchmarks voor de quiz game (draaien met `python -m benchmarks.<naam>`)."""
@@ -0,0 +1,121 @@
+"""Synthetische datasets voor de benchmarks in een tijdelijke SQLite database.
+
+Rijen worden met bulk inserts (Core, executemany) aangemaakt, zodat ook
+datasets met een miljoen scores binnen enkele seconden klaar staan. Alle
+waarden komen uit een geseede random generator: twee runs met dezelfde
+grootte meten precies dezelfde data.
+"""
+from typing import Iterator, List, Tuple
+import contextlib
+import math
+import os
+import random
+import tempfile
+
+from sqlalchemy import insert, select
+
+from app import models
+from app.database import Base, create_db_engine
+
+# Rijen per executemany batch
+CHUNK_SIZE = 50_000
+
+
+@contextlib.contextmanager
+def temp_database(profile: str = "production") -> Iterator[Tuple[str, object]]:
+    """Lege database met het volledige schema; geeft (url, sync engine)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'fixture.db')}"
+        db_engine = create_db_engine(url, profile)
+        Base.metadata.create_all(bind=db_engine)
+        try:
+            yield url, db_engine
+        finally:
+            db_engine.dispose()
+
+
+def _chunks(rows: List[dict]) -> Iterator[List[dict]]:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        yield rows[start:start + CHUNK_SIZE]
+
+
+def create_quiz(db_engine, questions: int, answers_per_question: int = 4, seed: int = 1) -> int:
+    """Quiz met `questions` vragen van elk `answers_per_question` antwoorden; geeft het quiz id."""
+    rng = random.Random(seed)
+    with db_engine.begin() as conn:
+        quiz_id = conn.execute(
+            insert(models.Quiz).values(title=f"Synthetische quiz ({questions} vragen)")
+        ).inserted_primary_key[0]
+        conn.execute(insert(models.Question), [
+            {"quiz_id": quiz_id, "question_text": f"Vraag {i + 1}: " + "x" * rng.randint(20, 120),
+             "time_limit": rng.choice((10, 20, 30)), "order": i}
+            for i in range(questions)
+        ])
+        question_ids = conn.scalars(
+            select(models.Question.id).where(models.Question.quiz_id == quiz_id).order_by(models.Question.order)
+        ).all()
+        answers = []
+        for question_id in question_ids:
+            correct = rng.randrange(answers_per_question)
+            answers.extend(
+                {"question_id": question_id, "answer_text": f"Antwoord {a + 1}",
+                 "is_correct": a == correct, "order": a}
+                for a in range(answers_per_question)
+            )
+        for chunk in _chunks(answers):
+            conn.execute(insert(models.Answer), chunk)
+    return quiz_id
+
+
+def score_shape(rows: int) -> Tuple[int, int]:
+    """Verdeel `rows` scores over (spelers, vragen); één score per speler per vraag."""
+    questions = max(1, int(math.sqrt(rows)))
+    return math.ceil(rows / questions), questions
+
+
+def create_game_with_scores(db_engine, rows: int, seed: int = 1) -> Tuple[int, str]:
+    """Game met ongeveer `rows` scores (spelers x vragen); geeft (game id, game code)."""
+    rng = random.Random(seed)
+    players, questions = score_shape(rows)
+    quiz_id = create_quiz(db_engine, questions, seed=seed)
+    game_code = f"{rows % 1_000_000:06d}"
+
+    with db_engine.begin() as conn:
+        game_id = conn.execute(insert(models.GameSession).values(
+            quiz_id=quiz_id, game_code=game_code, status="finished", current_question=questions
+        )).inserted_primary_key[0]
+        conn.execute(insert(models.Player), [
+            {"game_session_id": game_id, "player_name": f"speler{i}", "is_connected": False}
+            for i in range(players)
+        ])
+        player_ids = conn.scalars(
+            select(models.Player.id).where(models.Player.game_session_id == game_id)
+        ).all()
+        question_ids = conn.scalars(
+            select(models.Question.id).where(models.Question.quiz_id == quiz_id)
+        ).all()
+
+        written = 0
+        batch = []
+        for question_id in question_ids:
+            for player_id in player_ids:
+                if written == rows:
+                    break
+                is_correct = rng.random() < 0.6
+                time_taken = rng.randint(500, 20_000)
+                batch.append({
+                    "game_session_id": game_id,
+                    "player_id": player_id,
+                    "question_id": question_id,
+                    "answer_id": None,
+                    "is_correct": is_correct,
+                    "points": max(100, 1000 - time_taken // 20) if is_correct else 0,
+                    "time_taken": time_taken,
+                })
+                written += 1
+                if len(batch) == CHUNK_SIZE:
+                    conn.execute(insert(models.Score), batch)
+                    batch = []
+        if batch:
+            conn.execute(insert(models.Score), batch)
+    return game_id, game_code
@@ -0,0 +1,192 @@
+"""Micro-benchmarks voor de hot paths, op synthetische datasets.
+
+- points: `calculate_points` en `GameState.submit` (het antwoord-pad)
+- leaderboard: `get_leaderboard` koud (SQL aggregate via `load_leaderboard`)
+  en warm (in-memory `Leaderboard.top`) over 10k/100k/1M score rijen
+- question_payload: `QuizSnapshot` opbouwen (alle `question_start` payloads
+  van `send_question` in één keer geserialiseerd)
+- quiz_response: `QuizResponse` met `from_attributes` plus JSON serialisatie
+  voor quizzes met honderden vragen
+
+De datasets komen uit benchmarks.fixtures in een tijdelijke SQLite database.
+Tijden zijn per aanroep: het minimum en de mediaan over `--repeat` metingen.
+
+Gebruik:
+    python -m benchmarks.hot_paths
+    python -m benchmarks.hot_paths --scores 10000 100000 1000000 --questions 200 800 --json hot.json
+    python -m benchmarks.hot_paths --only leaderboard --scores 1000000
+"""
+from typing import Callable, List, Optional
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from app import models, schemas
+from app.database import create_async_db_engine, to_async_url
+from app.game_state import GameState, QuestionState, calculate_points
+from app.leaderboard import load_leaderboard
+from app.quiz_cache import QuizSnapshot
+from benchmarks.fixtures import create_game_with_scores, create_quiz, temp_database
+
+BENCHMARKS = ("points", "leaderboard", "question_payload", "quiz_response")
+
+
+def measure(fn: Callable[[], object], number: int = 1, repeat: int = 5) -> dict:
+    """Tijd per aanroep in ms (min en mediaan over `repeat` rondes van `number` aanroepen)."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        "min_ms": round(min(timings) * 1000, 6),
+        "median_ms": round(statistics.median(timings) * 1000, 6),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _load_quiz(db_engine, quiz_id: int) -> models.Quiz:
+    """Quiz met vragen en antwoorden, zoals de admin en de quiz cache hem laden."""
+    db = sessionmaker(bind=db_engine, expire_on_commit=False)()
+    try:
+        return db.execute(select(models.Quiz).options(
+            selectinload(models.Quiz.questions).selectinload(models.Question.answers)
+        ).where(models.Quiz.id == quiz_id)).scalars().one()
+    finally:
+        db.close()
+
+
+def bench_points(players: int, repeat: int) -> List[dict]:
+    rng = random.Random(1)
+    samples = [(rng.random() < 0.6, rng.choice((10, 20, 30)), rng.randint(0, 30_000)) for _ in range(10_000)]
+
+    def points():
+        for is_correct, time_limit, time_taken in samples:
+            calculate_points(is_correct, time_limit, time_taken)
+
+    results = [{"benchmark": "calculate_points", "size": len(samples), **measure(points, repeat=repeat)}]
+
+    with temp_database() as (_, db_engine):
+        quiz = QuizSnapshot(_load_quiz(db_engine, create_quiz(db_engine, 1)))
+    question = quiz.question(0)
+    state = GameState(1, "BENCH1", quiz, range(1, players + 1))
+
+    def submit_all():
+        # Nieuwe vraag per ronde: reset de answered bitmap
+        state.set_question(0, QuestionState(
+            question.id, question.correct_answer_id, question.answer_ids, question.time_limit
+        ))
+        for player_id in range(1, players + 1):
+            state.submit(player_id, question.id, question.answers[player_id % len(question.answers)].id)
+
+    results.append({"benchmark": "GameState.submit", "size": players, **measure(submit_all, repeat=repeat)})
+    return results
+
+
+def bench_leaderboard(sizes: List[int], repeat: int) -> List[dict]:
+    results = []
+    for rows in sizes:
+        with temp_database() as (url, db_engine):
+            game_id, _ = create_game_with_scores(db_engine, rows)
+            async_engine = create_async_db_engine(to_async_url(url))
+
+            async def cold():
+                async with async_engine.connect():
+                    pass  # Connectie opwarmen buiten de meting
+                timings = []
+                board = None
+                for _ in range(repeat):
+                    async with AsyncSession(async_engine) as db:
+                        game = await db.get(models.GameSession, game_id)
+                        started = time.perf_counter()
+                        board = await load_leaderboard(db, game)
+                        board.top()
+                        timings.append(time.perf_counter() - started)
+                await async_engine.dispose()
+                return timings, board
+
+            timings, board = asyncio.run(cold())
+            results.append({
+                "benchmark": "get_leaderboard (koud, SQL aggregate)", "size": rows,
+                "min_ms": round(min(timings) * 1000, 6),
+                "median_ms": round(statistics.median(timings) * 1000, 6),
+                "number": 1, "repeat": repeat,
+            })
+
+        def warm():
+            schemas.Leaderboard(entries=board.top(), total_questions=board.total_questions)
+
+        results.append({
+            "benchmark": "get_leaderboard (warm, in-memory)", "size": rows,
+            **measure(warm, number=10, repeat=repeat),
+        })
+    return results
+
+
+def bench_quiz(sizes: List[int], repeat: int, payload: bool = True, response: bool = True) -> List[dict]:
+    results = []
+    for questions in sizes:
+        with temp_database() as (_, db_engine):
+            quiz = _load_quiz(db_engine, create_quiz(db_engine, questions))
+
+        if payload:
+            results.append({
+                "benchmark": "send_question payloads (QuizSnapshot)", "size": questions,
+                **measure(lambda: QuizSnapshot(quiz), repeat=repeat),
+            })
+
+        if response:
+            results.append({
+                "benchmark": "QuizResponse from_attributes", "size": questions,
+                **measure(lambda: schemas.QuizResponse.model_validate(quiz), repeat=repeat),
+            })
+            validated = schemas.QuizResponse.model_validate(quiz)
+            results.append({
+                "benchmark": "QuizResponse JSON", "size": questions,
+                **measure(validated.model_dump_json, repeat=repeat),
+            })
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks voor de hot paths")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--scores", nargs="+", type=int, default=[10_000, 100_000, 1_000_000],
+                        help="Aantallen score rijen voor de leaderboard benchmark")
+    parser.add_argument("--questions", nargs="+", type=int, default=[100, 500],
+                        help="Aantallen vragen per quiz voor de payload/serialisatie benchmarks")
+    parser.add_argument("--players", type=int, default=1000, help="Spelers voor GameState.submit")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", default=None, help="Schrijf resultaten naar dit bestand")
+    args = parser.parse_args(argv)
+
+    results = []
+    if "points" in args.only:
+        results += bench_points(args.players, args.repeat)
+    if "leaderboard" in args.only:
+        results += bench_leaderboard(args.scores, args.repeat)
+    if "question_payload" in args.only or "quiz_response" in args.only:
+        results += bench_quiz(args.questions, args.repeat,
+                              payload="question_payload" in args.only,
+                              response="quiz_response" in args.only)
+
+    for result in results:
+        print(f"{result['benchmark']:<40} n={result['size']:<8} "
+              f"min={result['min_ms']:.4f}ms  mediaan={result['median_ms']:.4f}ms")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
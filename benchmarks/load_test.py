@@ -0,0 +1,356 @@
+"""Load test: simuleer een volledige game met veel gelijktijdige spelers.
+
+Maakt een quiz via `/api/admin/quiz`, start een game, laat N spelers joinen
+via `/api/game/join`, opent N WebSockets plus een host verbinding en speelt
+alle vragen: de host stuurt `start_game`/`next_question`, spelers antwoorden
+na een realistische bedenktijd (lognormaal rond `--think-time`).
+
+Gemeten (p50/p95/p99/max in ms):
+- joins: `POST /api/game/join`
+- connects: WebSocket open tot het eerste bericht
+- answers: `submit_answer` tot `answer_result`
+- fanout: host stuurt `start_game`/`next_question` tot `question_start` bij de speler
+plus doorvoer (joins/sec, antwoorden/sec). Het resultaatbestand (JSON) bevat
+ook de git commit, zodat runs tussen commits te vergelijken zijn.
+
+Zonder `--url` start het script zelf een uvicorn instance met een tijdelijke
+SQLite database (DB_PROFILE=production).
+
+Gebruik:
+    python -m benchmarks.load_test --players 500 --questions 5
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --players 2000 --json load.json
+
+Voor duizenden spelers moet de file descriptor limiet omhoog (`ulimit -n 65536`).
+"""
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import websockets
+
+try:
+    import httpx
+except ImportError:  # Optioneel; alleen nodig voor deze load test
+    httpx = None
+
+
+def percentiles(samples: List[float]) -> dict:
+    """p50/p95/p99/max (nearest rank) van latencies in ms."""
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def rank(q: float) -> float:
+        return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)], 3)
+
+    return {
+        "count": len(ordered),
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def local_server():
+    """Start uvicorn met een tijdelijke database en geef de base url."""
+    with tempfile.TemporaryDirectory() as tmp:
+        port = _free_port()
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'load.db')}",
+            "DB_PROFILE": "production",
+        }
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app",
+             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            env=env,
+        )
+        url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 20
+            while True:
+                try:
+                    if httpx.get(f"{url}/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn kon niet gestart worden")
+                time.sleep(0.2)
+            yield url
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+class LoadTest:
+    """Eén game met `players` spelers tegen een draaiende server."""
+
+    def __init__(self, url: str, players: int, questions: int, time_limit: int,
+                 think_time: float, correct_ratio: float, concurrency: int):
+        self.url = url.rstrip("/")
+        self.ws_url = "ws" + self.url[len("http"):]
+        self.players = players
+        self.questions = questions
+        self.time_limit = time_limit
+        self.think_time = think_time
+        self.correct_ratio = correct_ratio
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+        self.join_ms: List[float] = []
+        self.connect_ms: List[float] = []
+        self.answer_ms: List[float] = []
+        self.fanout_ms: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+        # question_number -> moment waarop de host de vraag aanvroeg
+        self._question_sent_at: Dict[int, float] = {}
+        self.expected_answers = players
+        self._answered = 0
+        self._all_answered = asyncio.Event()
+        self._answer_window = [math.inf, 0.0]
+
+    def _error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def _think(self) -> float:
+        # Lognormaal: de meeste spelers rond think_time, een staart van trage spelers
+        delay = random.lognormvariate(math.log(self.think_time), 0.5)
+        return min(delay, self.time_limit * 0.9)
+
+    async def create_game(self, client) -> str:
+        quiz = {
+            "title": "Load test",
+            "questions": [{
+                "question_text": f"Vraag {i + 1}",
+                "time_limit": self.time_limit,
+                "answers": [
+                    {"answer_text": f"Antwoord {a + 1}", "is_correct": a == 0} for a in range(4)
+                ]
+            } for i in range(self.questions)]
+        }
+        response = await client.post(f"{self.url}/api/admin/quiz", json=quiz)
+        response.raise_for_status()
+        response = await client.post(f"{self.url}/api/game/start", json={"quiz_id": response.json()["id"]})
+        response.raise_for_status()
+        return response.json()["game_code"]
+
+    async def join(self, client, game_code: str, name: str) -> bool:
+        async with self.semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                f"{self.url}/api/game/join", json={"game_code": game_code, "player_name": name}
+            )
+            self.join_ms.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            self._error(f"join_{response.status_code}")
+            return False
+        return True
+
+    async def connect(self, path: str):
+        async with self.semaphore:
+            started = time.perf_counter()
+            ws = await websockets.connect(f"{self.ws_url}{path}", open_timeout=30, max_queue=None)
+            await ws.recv()  # session bericht
+            self.connect_ms.append((time.perf_counter() - started) * 1000)
+        return ws
+
+    async def play(self, ws):
+        """Speler: antwoord op elke vraag tot game_finished."""
+        try:
+            await self._play(ws)
+        except websockets.ConnectionClosed:
+            self._error("closed")
+
+    async def _play(self, ws):
+        # Verzendtijd van het openstaande antwoord; bedenktijd loopt in een eigen
+        # task zodat het lezen van berichten (en de fanout meting) nooit wacht
+        pending: Dict[str, float] = {}
+        tasks = set()
+
+        async def answer(question: dict):
+            answers = question["answers"]
+            choice = answers[0] if random.random() < self.correct_ratio else random.choice(answers[1:])
+            await asyncio.sleep(self._think())
+            pending["sent_at"] = time.perf_counter()
+            self._answer_window[0] = min(self._answer_window[0], pending["sent_at"])
+            await ws.send(json.dumps({
+                "type": "submit_answer",
+                "data": {"question_id": question["id"], "answer_id": choice["id"]}
+            }))
+
+        async for raw in ws:
+            message = json.loads(raw)
+            kind = message["type"]
+
+            if kind == "question_start":
+                received = time.perf_counter()
+                sent_at = self._question_sent_at.get(message["data"]["question_number"])
+                if sent_at is not None:
+                    self.fanout_ms.append((received - sent_at) * 1000)
+                task = asyncio.create_task(answer(message["data"]["question"]))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            elif kind in ("answer_result", "answer_rejected"):
+                done = time.perf_counter()
+                sent_at = pending.pop("sent_at", None)
+                if sent_at is not None:
+                    self.answer_ms.append((done - sent_at) * 1000)
+                self._answer_window[1] = max(self._answer_window[1], done)
+                if kind == "answer_rejected":
+                    self._error(f"answer_{message['data']['status_code']}")
+                self._answered += 1
+                if self._answered >= self.expected_answers:
+                    self._all_answered.set()
+
+            elif kind == "game_finished":
+                return
+
+    async def host(self, ws):
+        """Host: start de game en gaat door zodra iedereen geantwoord heeft (of de tijd op is)."""
+        for number in range(1, self.questions + 1):
+            self._answered = 0
+            self._all_answered.clear()
+            self._question_sent_at[number] = time.perf_counter()
+            await ws.send(json.dumps({"type": "start_game" if number == 1 else "next_question"}))
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._all_answered.wait(), self.time_limit + 2)
+        await ws.send(json.dumps({"type": "next_question"}))  # Laatste: game_finished
+
+    async def run(self) -> dict:
+        async with httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=None)) as client:
+            game_code = await self.create_game(client)
+
+            names = [f"speler{i}" for i in range(self.players)]
+            started = time.perf_counter()
+            joined = await asyncio.gather(*(self.join(client, game_code, name) for name in names))
+            join_seconds = time.perf_counter() - started
+            names = [name for name, ok in zip(names, joined) if ok]
+            self.expected_answers = len(names)
+
+            host_ws = await self.connect(f"/ws/{game_code}/Host?role=host")
+            sockets = await asyncio.gather(
+                *(self.connect(f"/ws/{game_code}/{name}") for name in names), return_exceptions=True
+            )
+            players = []
+            for ws in sockets:
+                if isinstance(ws, Exception):
+                    self._error("connect")
+                else:
+                    players.append(ws)
+            self.expected_answers = len(players)
+
+            # Host berichten leeglezen zodat zijn queue niet volloopt
+            async def drain():
+                with contextlib.suppress(websockets.ConnectionClosed):
+                    async for _ in host_ws:
+                        pass
+
+            drainer = asyncio.create_task(drain())
+            game_started = time.perf_counter()
+            await asyncio.gather(self.host(host_ws), *(self.play(ws) for ws in players))
+            game_seconds = time.perf_counter() - game_started
+
+            drainer.cancel()
+            await asyncio.gather(host_ws.close(), *(ws.close() for ws in players), return_exceptions=True)
+
+        answer_window = self._answer_window[1] - self._answer_window[0]
+        return {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "url": self.url,
+            "players": self.players,
+            "connected": len(players),
+            "questions": self.questions,
+            "think_time_s": self.think_time,
+            "joins": percentiles(self.join_ms),
+            "connects": percentiles(self.connect_ms),
+            "answers": percentiles(self.answer_ms),
+            "fanout": percentiles(self.fanout_ms),
+            "throughput": {
+                "joins_per_sec": round(len(self.join_ms) / join_seconds, 1) if join_seconds else None,
+                "answers_per_sec": round(len(self.answer_ms) / answer_window, 1) if answer_window > 0 else None,
+            },
+            "game_seconds": round(game_seconds, 3),
+            "errors": self.errors,
+        }
+
+
+def print_summary(result: dict):
+    print(f"{result['connected']}/{result['players']} spelers, {result['questions']} vragen, "
+          f"{result['game_seconds']}s (commit {result['commit']})")
+    for key in ("joins", "connects", "answers", "fanout"):
+        stats = result[key]
+        print(f"  {key:<9} n={stats['count']:<6} p50={stats['p50']}ms p95={stats['p95']}ms "
+              f"p99={stats['p99']}ms max={stats['max']}ms")
+    print(f"  doorvoer  {result['throughput']['joins_per_sec']} joins/sec, "
+          f"{result['throughput']['answers_per_sec']} antwoorden/sec")
+    if result["errors"]:
+        print(f"  fouten    {result['errors']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load test met gesimuleerde spelers")
+    parser.add_argument("--url", default=None, help="Base url van een draaiende server (anders lokaal gestart)")
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--time-limit", type=int, default=10, help="Seconden per vraag")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Mediaan bedenktijd (seconden)")
+    parser.add_argument("--correct-ratio", type=float, default=0.7)
+    parser.add_argument("--concurrency", type=int, default=100, help="Gelijktijdige joins/connects")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", default=None, help="Schrijf resultaten naar dit bestand")
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        raise SystemExit("De load test vereist het 'httpx' package (pip install httpx)")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    def run(url: str) -> dict:
+        test = LoadTest(url, args.players, args.questions, args.time_limit,
+                        args.think_time, args.correct_ratio, args.concurrency)
+        return asyncio.run(test.run())
+
+    if args.url:
+        result = run(args.url)
+    else:
+        with local_server() as url:
+            result = run(url)
+
+    print_summary(result)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
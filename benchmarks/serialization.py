@@ -0,0 +1,162 @@
+"""Serialisatie benchmark: standaard json pad tegenover app.serialization.
+
+Per geval wordt het oude pad (pydantic model -> dict -> `json.dumps`, zoals
+FastAPI's JSONResponse en `send_json` dat doen) vergeleken met het nieuwe:
+orjson voor dicts en pydantic-core direct naar bytes voor modellen.
+
+- quiz_response: `QuizResponse` van een ORM quiz met honderden vragen (admin
+  `get_quiz`), inclusief validatie `from_attributes`
+- messages: WebSocket broadcasts (`question_end` met top 10, `snapshot`,
+  `answer_progress`) zoals de ConnectionManager ze één keer serialiseert
+- roster: de spelerslijst body van `GET /api/game/{code}/players`
+
+De eerste variant per geval is de basis voor `speedup`. `size` is het aantal
+vragen, het aantal spelers of (bij berichten) de grootte in bytes.
+
+Gebruik:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --questions 100 500 2000 --players 1000 --json ser.json
+"""
+from typing import Callable, Dict, List, Optional
+import argparse
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import schemas
+from app.serialization import FastJSONResponse, dumps, encode_message, model_response, serializer
+from benchmarks.fixtures import create_quiz, temp_database
+from benchmarks.hot_paths import _load_quiz, measure
+
+BENCHMARKS = ("quiz_response", "messages", "roster")
+
+
+def _json_text(message: dict) -> str:
+    """Het oude pad van encode_message (stdlib json)."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def _compare(name: str, size: int, variants: Dict[str, Callable[[], object]],
+             number: int, repeat: int) -> List[dict]:
+    results = []
+    baseline = None
+    for variant, fn in variants.items():
+        timing = measure(fn, number=number, repeat=repeat)
+        baseline = baseline or timing["min_ms"]
+        results.append({
+            "benchmark": name, "variant": variant, "size": size, **timing,
+            "speedup": round(baseline / timing["min_ms"], 2) if timing["min_ms"] else None,
+        })
+    return results
+
+
+def bench_quiz_response(sizes: List[int], repeat: int) -> List[dict]:
+    results = []
+    for questions in sizes:
+        with temp_database() as (_, db_engine):
+            quiz = _load_quiz(db_engine, create_quiz(db_engine, questions))
+
+        results += _compare("QuizResponse", questions, {
+            "model_dump + json.dumps (FastAPI)": lambda: JSONResponse(
+                schemas.QuizResponse.model_validate(quiz).model_dump(mode="json")
+            ),
+            # Routes zonder response_model
+            "jsonable_encoder + json.dumps": lambda: JSONResponse(
+                jsonable_encoder(schemas.QuizResponse.model_validate(quiz))
+            ),
+            f"model_dump + {serializer.name}": lambda: FastJSONResponse(
+                schemas.QuizResponse.model_validate(quiz).model_dump(mode="json")
+            ),
+            "model_response (direct bytes)": lambda: model_response(schemas.QuizResponse, quiz),
+        }, number=1, repeat=repeat)
+    return results
+
+
+def _messages(players: int) -> Dict[str, dict]:
+    top = [
+        schemas.LeaderboardEntry(player_name=f"speler{i}", total_score=10_000 - i * 250,
+                                 correct_answers=10 - i // 3, rank=i + 1)
+        for i in range(min(players, 10))
+    ]
+    question = {
+        "question": {
+            "id": 1, "question_text": "Wat is de hoofdstad van Nederland?", "time_limit": 20,
+            "answers": [{"id": a, "answer_text": f"Antwoord {a}", "order": a} for a in range(4)],
+        },
+        "question_number": 3, "total_questions": 10,
+    }
+    return {
+        "question_end": {"type": "question_end", "data": schemas.WSQuestionEnd(
+            correct_answer_id=2, leaderboard=top,
+            rank_changes=[schemas.WSRankChange(player_name=e.player_name, rank=e.rank, previous_rank=e.rank + 1)
+                          for e in top]
+        )},
+        "snapshot": {"type": "snapshot", "seq": 42, "data": schemas.WSSnapshot(
+            status="active", player_count=players, question=question, remaining_ms=12_500,
+            leaderboard=top, rank=schemas.WSPlayerRank(rank=1, total_score=10_000,
+                                                       correct_answers=10, player_count=players)
+        )},
+        "answer_progress": {"type": "answer_progress", "data": {"question_id": 1, "answered": 17, "total": players}},
+    }
+
+
+def bench_messages(players: int, repeat: int) -> List[dict]:
+    results = []
+    for name, message in _messages(players).items():
+        data = message["data"]
+        as_dict = {**message, "data": data.model_dump(mode="json")} if hasattr(data, "model_dump") else message
+
+        def old(message=message, data=data):
+            # Vroeger: .model_dump() bij het opbouwen, dan json.dumps in encode_message
+            dumped = data.model_dump(mode="json") if hasattr(data, "model_dump") else data
+            return _json_text({**message, "data": dumped})
+
+        results += _compare(f"WS {name}", len(_json_text(as_dict)), {
+            "model_dump + json.dumps": old,
+            f"encode_message ({serializer.name})": lambda message=message: encode_message(message),
+        }, number=1000, repeat=repeat)
+    return results
+
+
+def bench_roster(players: int, repeat: int) -> List[dict]:
+    roster = [
+        {"id": i, "player_name": f"speler{i}", "joined_at": "2026-01-01T12:00:00.000000", "is_connected": True}
+        for i in range(players)
+    ]
+    return _compare("roster body", players, {
+        "json.dumps": lambda: _json_text(roster).encode(),
+        serializer.name: lambda: dumps(roster),
+    }, number=10, repeat=repeat)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serialisatie: json tegenover app.serialization")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--questions", nargs="+", type=int, default=[100, 500],
+                        help="Aantallen vragen per quiz voor QuizResponse")
+    parser.add_argument("--players", type=int, default=1000, help="Spelers in roster en berichten")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", default=None, help="Schrijf resultaten naar dit bestand")
+    args = parser.parse_args(argv)
+
+    results = []
+    if "quiz_response" in args.only:
+        results += bench_quiz_response(args.questions, args.repeat)
+    if "messages" in args.only:
+        results += bench_messages(args.players, args.repeat)
+    if "roster" in args.only:
+        results += bench_roster(args.players, args.repeat)
+
+    print(f"Serializer: {serializer.name}")
+    for result in results:
+        print(f"{result['benchmark']:<20} {result['variant']:<36} n={result['size']:<6} "
+              f"min={result['min_ms']:.4f}ms  mediaan={result['median_ms']:.4f}ms  x{result['speedup']}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
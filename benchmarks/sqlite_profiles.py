@@ -0,0 +1,136 @@
+"""Vergelijk antwoorden/sec tussen de SQLite engine profielen.
+
+Meerdere threads schrijven tegelijk Score rijen in een tijdelijke database,
+zoals de answer endpoint dat onder load doet. Per profiel worden twee
+schrijfpatronen gemeten: één commit per antwoord en batches (zoals de
+ScoreWriteBuffer).
+
+Gebruik:
+    python -m benchmarks.sqlite_profiles
+    python -m benchmarks.sqlite_profiles --threads 16 --answers 2000 --json resultaat.json
+"""
+from typing import List, Optional
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.database import Base, SQLITE_PROFILES, create_db_engine
+
+
+def _setup(db_engine, players: int, questions: int) -> List[int]:
+    """Maak een quiz met `questions` vragen en `players` spelers; geef de player ids.
+
+    Eén score per (speler, vraag) is uniek, dus elk antwoord van een thread
+    hoort bij een eigen vraag.
+    """
+    Base.metadata.create_all(bind=db_engine)
+    db = sessionmaker(bind=db_engine)()
+    try:
+        quiz = models.Quiz(title="Benchmark")
+        quiz.questions = [
+            models.Question(question_text=f"Vraag {i}", time_limit=20, order=i)
+            for i in range(questions)
+        ]
+        quiz.questions[0].answers = [models.Answer(answer_text="a", is_correct=True, order=0)]
+        game = models.GameSession(quiz=quiz, game_code="BENCH1")
+        db.add(game)
+        db.flush()
+        db.add_all([
+            models.Player(game_session_id=game.id, player_name=f"speler{i}")
+            for i in range(players)
+        ])
+        db.commit()
+        return [p.id for p in game.players]
+    finally:
+        db.close()
+
+
+def run_profile(profile: str, threads: int, answers: int, batch_size: int) -> dict:
+    """Schrijf `answers` antwoorden per thread en meet de doorvoer."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        player_ids = _setup(db_engine, threads, answers)
+        game_id, answer_id = 1, 1
+        errors = []
+        # StaticPool deelt één connectie: threads moeten op elkaar wachten
+        shared = isinstance(db_engine.pool, StaticPool)
+        connection_lock = threading.Lock() if shared else contextlib.nullcontext()
+
+        def worker(player_id: int):
+            rows = [{
+                "game_session_id": game_id,
+                "player_id": player_id,
+                "question_id": question_id,
+                "answer_id": answer_id,
+                "is_correct": True,
+                "points": 500,
+                "time_taken": 1000  # Milliseconden (Integer kolom)
+            } for question_id in range(1, answers + 1)]
+            try:
+                for start in range(0, len(rows), batch_size):
+                    with connection_lock, db_engine.connect() as conn:
+                        conn.execute(insert(models.Score), rows[start:start + batch_size])
+                        conn.commit()
+            except OperationalError as e:
+                errors.append(str(e.orig))
+
+        workers = [threading.Thread(target=worker, args=(pid,)) for pid in player_ids]
+        started = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - started
+        # Geteld in de database: een thread kan halverwege falen na eerdere commits
+        with db_engine.connect() as conn:
+            written = conn.scalar(select(func.count()).select_from(models.Score))
+        db_engine.dispose()
+
+    return {
+        "profile": profile,
+        "batch_size": batch_size,
+        "threads": threads,
+        "answers": written,
+        "seconds": round(elapsed, 3),
+        "answers_per_sec": round(written / elapsed, 1) if elapsed else 0.0,
+        "errors": len(errors),
+        "shared_connection": shared,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Vergelijk SQLite engine profielen")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--answers", type=int, default=500, help="Antwoorden per thread")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--profiles", nargs="+", choices=list(SQLITE_PROFILES), default=list(SQLITE_PROFILES))
+    parser.add_argument("--json", dest="json_path", default=None, help="Schrijf resultaten naar dit bestand")
+    args = parser.parse_args(argv)
+
+    results = []
+    for profile in args.profiles:
+        for batch_size in (1, args.batch_size):
+            result = run_profile(profile, args.threads, args.answers, batch_size)
+            results.append(result)
+            print(
+                f"{profile:<11} batch={batch_size:<4} {result['answers_per_sec']:>10.1f} antwoorden/sec"
+                f"  ({result['answers']} in {result['seconds']}s, {result['errors']} fouten)"
+            )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
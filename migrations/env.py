@@ -0,0 +1,50 @@
+"""Alembic migratie omgeving.
+
+Gebruikt dezelfde DATABASE_URL en engine instellingen als de app. SQLite kan
+constraints niet via ALTER TABLE toevoegen, daarom draait alles in batch mode
+(tabel wordt gekopieerd); op PostgreSQL is dat een gewone ALTER TABLE.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.database import Base, DATABASE_URL, create_db_engine
+from app import models  # noqa: F401  registreert de tabellen op Base.metadata
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Genereer SQL zonder database verbinding (`alembic upgrade head --sql`)."""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connectable = create_db_engine(DATABASE_URL)
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,110 @@
+"""Initieel schema (zoals init_db het voorheen aanmaakte)
+
+Bestaande databases die met create_all zijn aangemaakt: `alembic stamp 0001`
+en daarna `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "quizzes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_quizzes_id", "quizzes", ["id"])
+
+    op.create_table(
+        "game_sessions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("quiz_id", sa.Integer(), nullable=False),
+        sa.Column("game_code", sa.String(length=6), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=True),
+        sa.Column("current_question", sa.Integer(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_game_sessions_id", "game_sessions", ["id"])
+    op.create_index("ix_game_sessions_game_code", "game_sessions", ["game_code"], unique=True)
+
+    op.create_table(
+        "questions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("quiz_id", sa.Integer(), nullable=False),
+        sa.Column("question_text", sa.Text(), nullable=False),
+        sa.Column("time_limit", sa.Integer(), nullable=True),
+        sa.Column("order", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_questions_id", "questions", ["id"])
+
+    op.create_table(
+        "answers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("answer_text", sa.String(length=500), nullable=False),
+        sa.Column("is_correct", sa.Boolean(), nullable=True),
+        sa.Column("order", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_answers_id", "answers", ["id"])
+
+    op.create_table(
+        "players",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("game_session_id", sa.Integer(), nullable=False),
+        sa.Column("player_name", sa.String(length=100), nullable=False),
+        sa.Column("joined_at", sa.DateTime(), nullable=True),
+        sa.Column("is_connected", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(["game_session_id"], ["game_sessions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_players_id", "players", ["id"])
+
+    op.create_table(
+        "scores",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("game_session_id", sa.Integer(), nullable=False),
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("answer_id", sa.Integer(), nullable=True),
+        sa.Column("is_correct", sa.Boolean(), nullable=True),
+        sa.Column("points", sa.Integer(), nullable=True),
+        sa.Column("time_taken", sa.Integer(), nullable=True),
+        sa.Column("answered_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["answer_id"], ["answers.id"]),
+        sa.ForeignKeyConstraint(["game_session_id"], ["game_sessions.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["player_id"], ["players.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_scores_id", "scores", ["id"])
+
+
+def downgrade():
+    op.drop_table("scores")
+    op.drop_table("players")
+    op.drop_table("answers")
+    op.drop_table("questions")
+    op.drop_table("game_sessions")
+    op.drop_table("quizzes")
@@ -0,0 +1,63 @@
+"""Composite indexes en unique constraints voor de hot queries
+
+- quizzes (created_at, id): keyset pagination in de admin lijst
+- questions (quiz_id, order): vragen van een quiz in volgorde
+- players (game_session_id, player_name): join en WebSocket connect, uniek
+- scores (game_session_id, player_id, question_id): "al beantwoord", uniek
+
+Dubbele scores (uit races vóór deze constraint) worden eerst opgeruimd; de
+oudste rij blijft staan. Dubbele spelersnamen binnen een game krijgen het
+speler id erachter ("naam #12"), zodat hun scores gekoppeld blijven; de
+oudste speler houdt de naam.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # if_not_exists: databases uit create_all kunnen de pagination index al hebben
+    op.create_index("ix_quizzes_created_at_id", "quizzes", ["created_at", "id"], if_not_exists=True)
+    op.create_index("ix_questions_quiz_id_order", "questions", ["quiz_id", "order"], if_not_exists=True)
+
+    op.execute(
+        "DELETE FROM scores WHERE id NOT IN ("
+        "SELECT MIN(id) FROM scores GROUP BY game_session_id, player_id, question_id)"
+    )
+
+    # Max 100 tekens: 88 van de naam, " #" en een id van hoogstens 10 cijfers
+    op.execute(
+        "UPDATE players SET player_name = "
+        "substr(player_name, 1, 88) || ' #' || CAST(id AS VARCHAR(10)) "
+        "WHERE id NOT IN (SELECT MIN(id) FROM players GROUP BY game_session_id, player_name)"
+    )
+
+    with op.batch_alter_table("players") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_players_game_session_id_player_name", ["game_session_id", "player_name"]
+        )
+
+    with op.batch_alter_table("scores") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_scores_game_session_id_player_id_question_id",
+            ["game_session_id", "player_id", "question_id"]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("scores") as batch_op:
+        batch_op.drop_constraint("uq_scores_game_session_id_player_id_question_id", type_="unique")
+
+    with op.batch_alter_table("players") as batch_op:
+        batch_op.drop_constraint("uq_players_game_session_id_player_name", type_="unique")
+
+    op.drop_index("ix_questions_quiz_id_order", table_name="questions")
+    op.drop_index("ix_quizzes_created_at_id", table_name="quizzes")
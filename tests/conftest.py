@@ -0,0 +1,48 @@
+"""Gedeelde fixtures: de app tegen een tijdelijke SQLite database.
+
+De environment moet gezet zijn voordat `app.database` de engines aanmaakt,
+daarom gebeurt dat hier op module niveau.
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="quiz-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["BROADCAST_BACKEND"] = "local"
+os.environ["AUTO_ADVANCE"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+# `pytester` voor de tests van de query budget plugin
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def quiz_payload():
+    def make(questions: int = 3, title: str = "Test quiz") -> dict:
+        return {
+            "title": title,
+            "questions": [
+                {
+                    "question_text": f"Vraag {q}",
+                    "time_limit": 20,
+                    "answers": [
+                        {"answer_text": f"Antwoord {q}.{a}", "is_correct": a == 0}
+                        for a in range(4)
+                    ]
+                }
+                for q in range(questions)
+            ]
+        }
+
+    return make
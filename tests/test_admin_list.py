@@ -0,0 +1,27 @@
+"""Tests voor de quiz lijst met keyset pagination (GET /api/admin/quiz)."""
+
+
+def test_walking_pages_returns_every_quiz_once(client, quiz_payload):
+    for i in range(7):
+        client.post("/api/admin/quiz", json=quiz_payload(i % 3 + 1, title=f"Lijst {i}"))
+    everything = client.get("/api/admin/quiz", params={"limit": 1000}).json()
+
+    seen = []
+    params = {"limit": 3}
+    while True:
+        page = client.get("/api/admin/quiz", params=params).json()
+        if not page:
+            break
+        assert len(page) <= 3
+        seen += page
+        params = {"limit": 3, "after_created_at": page[-1]["created_at"], "after_id": page[-1]["id"]}
+
+    assert [quiz["id"] for quiz in seen] == [quiz["id"] for quiz in everything]
+    assert len({quiz["id"] for quiz in seen}) == len(seen)
+    counts = {quiz["title"]: quiz["question_count"] for quiz in seen}
+    assert [counts[f"Lijst {i}"] for i in range(7)] == [i % 3 + 1 for i in range(7)]
+
+
+def test_half_a_cursor_is_rejected(client):
+    assert client.get("/api/admin/quiz", params={"after_id": 1}).status_code == 422
+    assert client.get("/api/admin/quiz", params={"after_created_at": "2024-01-01T00:00:00"}).status_code == 422
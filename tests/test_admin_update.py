@@ -0,0 +1,103 @@
+"""Tests voor het bijwerken van een quiz (PUT /api/admin/quiz/{quiz_id})."""
+
+
+def _create(client, payload):
+    response = client.post("/api/admin/quiz", json=payload)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _content(question):
+    return (question["question_text"], [(a["id"], a["answer_text"], a["is_correct"]) for a in question["answers"]])
+
+
+def test_removing_first_question_keeps_ids_of_the_rest(client, quiz_payload):
+    quiz = _create(client, quiz_payload(3))
+    first, *rest = quiz["questions"]
+
+    response = client.put(f"/api/admin/quiz/{quiz['id']}", json={**quiz, "questions": rest})
+
+    assert response.status_code == 200
+    questions = response.json()["questions"]
+    assert [q["id"] for q in questions] == [q["id"] for q in rest]
+    assert [_content(q) for q in questions] == [_content(q) for q in rest]
+    assert first["id"] not in {q["id"] for q in questions}
+
+
+def test_new_rows_without_id_are_inserted(client, quiz_payload):
+    quiz = _create(client, quiz_payload(1))
+    [question] = quiz["questions"]
+    answers = question["answers"][:3]
+    new_question = quiz_payload(1)["questions"][0]
+
+    response = client.put(f"/api/admin/quiz/{quiz['id']}", json={
+        **quiz,
+        "questions": [
+            new_question,
+            {**question, "answers": [*answers, {"answer_text": "Nieuw", "is_correct": False}]},
+        ]
+    })
+
+    assert response.status_code == 200
+    inserted, updated = response.json()["questions"]
+    assert inserted["id"] != question["id"]
+    assert updated["id"] == question["id"]
+    assert [a["id"] for a in updated["answers"][:3]] == [a["id"] for a in answers]
+    assert updated["answers"][3]["answer_text"] == "Nieuw"
+    assert updated["answers"][3]["id"] not in {a["id"] for a in question["answers"]}
+
+
+def test_id_from_another_quiz_is_rejected(client, quiz_payload):
+    quiz = _create(client, quiz_payload(1))
+    other = _create(client, quiz_payload(1))
+
+    response = client.put(f"/api/admin/quiz/{quiz['id']}", json={**quiz, "questions": other["questions"]})
+
+    assert response.status_code == 400
+    assert client.get(f"/api/admin/quiz/{quiz['id']}").json()["questions"] == quiz["questions"]
+
+
+def _receive(ws, message_type):
+    while True:
+        message = ws.receive_json()
+        if message["type"] == message_type:
+            return message
+
+
+def _play_first_question(client, quiz, answer_index):
+    code = client.post("/api/game/start", json={"quiz_id": quiz["id"]}).json()["game_code"]
+    client.post("/api/game/join", json={"game_code": code, "player_name": "speler"})
+    with client.websocket_connect(f"/ws/{code}/Host?role=host") as host, \
+            client.websocket_connect(f"/ws/{code}/speler") as player:
+        host.send_json({"type": "start_game"})
+        question = _receive(player, "question_start")["data"]["question"]
+        player.send_json({"type": "submit_answer", "data": {
+            "question_id": question["id"], "answer_id": question["answers"][answer_index]["id"]
+        }})
+        _receive(player, "answer_result")
+        # question_end volgt pas na het wegschrijven van de scores
+        host.send_json({"type": "end_question"})
+        _receive(player, "question_end")
+
+
+def test_removing_scored_question_or_answer_is_refused(client, quiz_payload):
+    quiz = _create(client, quiz_payload(2))
+    first, second = quiz["questions"]
+    _play_first_question(client, quiz, answer_index=1)
+    url = f"/api/admin/quiz/{quiz['id']}"
+
+    response = client.put(url, json={**quiz, "questions": [second]})
+    assert response.status_code == 409
+    assert f"Vraag {first['id']}" in response.json()["detail"]
+
+    answered = first["answers"][1]
+    without_answered = {**first, "answers": [a for a in first["answers"] if a["id"] != answered["id"]]}
+    response = client.put(url, json={**quiz, "questions": [without_answered, second]})
+    assert response.status_code == 409
+    assert f"Antwoord {answered['id']}" in response.json()["detail"]
+
+    # Antwoorden en vragen zonder scores mogen wel weg
+    unanswered = {**first, "answers": first["answers"][:2]}
+    response = client.put(url, json={**quiz, "questions": [unanswered]})
+    assert response.status_code == 200
+    assert [q["id"] for q in response.json()["questions"]] == [first["id"]]
@@ -0,0 +1,35 @@
+"""Tests voor de event log voor reconnect/resume (app/event_log.py)."""
+import json
+
+from app.event_log import EventLog
+
+
+def _seqs(texts):
+    return [json.loads(text)["seq"] for text in texts]
+
+
+def test_since_returns_missed_broadcasts_or_none_when_evicted():
+    log = EventLog(max_size=3)
+    for i in range(5):
+        log.append(json.dumps({"type": "event", "i": i}))
+
+    assert _seqs(log.since(2)) == [3, 4, 5]
+    assert log.since(5) == []
+    assert log.since(1) is None  # Seq 2 is al uit de buffer
+    assert log.since(6) is None
+
+
+def test_targeted_messages_keep_only_latest_version_per_target():
+    log = EventLog()
+    log.append('{"type":"question_start"}')
+    log.record_latest("host", "answer_progress", '{"type":"answer_progress","n":1}')
+    log.record_latest("host", "answer_progress", '{"type":"answer_progress","n":2}')
+    log.append('{"type":"question_end"}')
+    log.record_latest("each_player", "player_rank", '{"type":"player_rank","data":{}}')
+
+    host = [json.loads(text) for text in log.since(1, ("host",))]
+    assert [(m["type"], m["seq"]) for m in host] == [("answer_progress", 3), ("question_end", 4)]
+    assert host[0]["n"] == 2
+    assert _seqs(log.since(1)) == [4]
+    assert [seq for seq, _ in log.latest_since(4, "each_player")] == [5]
+    assert log.latest_since(5, "each_player") == []
@@ -0,0 +1,38 @@
+"""Tests voor het in-memory scoreboard (app/leaderboard.py)."""
+import random
+
+from app.leaderboard import Leaderboard
+
+
+def test_ranks_follow_score_then_correct_answers_then_player_id():
+    board = Leaderboard(total_questions=2)
+    for player_id, name in ((1, "a"), (2, "b"), (3, "c")):
+        board.add_player(player_id, name)
+
+    board.record(3, 500, True)
+    board.record(2, 500, False)
+    board.record(1, 0, True)
+
+    assert [entry["player_name"] for entry in board.top()] == ["c", "b", "a"]
+    assert [board.rank(player_id) for player_id in (1, 2, 3)] == [3, 2, 1]
+    assert board.top(1) == [{"player_name": "c", "total_score": 500, "correct_answers": 1, "rank": 1}]
+    assert board.rank(99) is None
+
+
+def test_incremental_updates_match_a_full_sort():
+    rng = random.Random(4)
+    board = Leaderboard()
+    totals = {player_id: [0, 0] for player_id in range(200)}
+    for player_id in totals:
+        board.add_player(player_id, f"speler {player_id}")
+
+    for _ in range(2000):
+        player_id = rng.randrange(200)
+        points, correct = rng.choice([(0, False), (rng.randint(500, 1000), True)])
+        board.record(player_id, points, correct)
+        totals[player_id][0] += points
+        totals[player_id][1] += int(correct)
+
+    expected = sorted(totals, key=lambda p: (-totals[p][0], -totals[p][1], p))
+    assert [board.rank(player_id) for player_id in expected] == list(range(1, 201))
+    assert [entry["total_score"] for entry in board.top(10)] == [totals[p][0] for p in expected[:10]]
@@ -0,0 +1,33 @@
+"""Tests voor de metrics counters en histogrammen (app/metrics.py)."""
+import sys
+import threading
+
+from app.metrics import MetricsRegistry
+
+
+def _hammer(target, threads: int = 8, per_thread: int = 20000):
+    # Vaak van thread wisselen zodat een onbeschermde `+=` updates zou verliezen
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        workers = [threading.Thread(target=lambda: [target() for _ in range(per_thread)]) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        sys.setswitchinterval(interval)
+    return threads * per_thread
+
+
+def test_counter_and_histogram_lose_no_updates_across_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Test", ("result",))
+    histogram = registry.histogram("test_seconds", "Test", ("route",))
+
+    expected = _hammer(lambda: (counter.labels("ok").inc(), histogram.labels("/").observe(3)))
+
+    assert counter.labels("ok").value == expected
+    assert histogram.labels("/").count == expected
+    assert sum(histogram.labels("/").counts) == expected
+    assert len(counter.children) == 1
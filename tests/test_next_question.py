@@ -0,0 +1,33 @@
+"""Tests voor het doorgaan naar de volgende vraag (app/routers/websocket.py)."""
+
+
+def _receive(ws, message_type):
+    while True:
+        message = ws.receive_json()
+        if message["type"] == message_type:
+            return message
+
+
+def test_concurrent_next_question_sends_each_question_once(client, quiz_payload):
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(3)).json()
+    code = client.post("/api/game/start", json={"quiz_id": quiz["id"]}).json()["game_code"]
+    client.post("/api/game/join", json={"game_code": code, "player_name": "speler"})
+
+    with client.websocket_connect(f"/ws/{code}/Host?role=host") as host, \
+            client.websocket_connect(f"/ws/{code}/Host2?role=host") as second_host, \
+            client.websocket_connect(f"/ws/{code}/speler") as player:
+        host.send_json({"type": "start_game"})
+        numbers = [_receive(player, "question_start")["data"]["question_number"]]
+
+        # Twee hosts klikken tegelijk op "volgende vraag"
+        host.send_json({"type": "next_question"})
+        second_host.send_json({"type": "next_question"})
+        numbers += [_receive(player, "question_start")["data"]["question_number"] for _ in range(2)]
+        assert numbers == [1, 2, 3]
+
+        host.send_json({"type": "next_question"})
+        assert _receive(player, "game_finished")["data"]["game_code"] == code
+
+    game = client.get(f"/api/game/{code}").json()
+    assert game["status"] == "finished"
+    assert game["current_question"] == 2
@@ -0,0 +1,132 @@
+"""Tests voor berichten en opdrachten tussen workers via de Unix broker (app/pubsub.py)."""
+import asyncio
+import json
+import os
+import tempfile
+
+from app.connections import ConnectionManager
+from app.pubsub import BrokerServer, UnixSocketBackend
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=None):
+        pass
+
+    def types(self):
+        return [message["type"] for message in self.sent]
+
+
+async def _two_workers(scenario):
+    path = os.path.join(tempfile.mkdtemp(prefix="quiz-broker-"), "broker.sock")
+    broker = BrokerServer(path)
+    await broker.start()
+    workers = [ConnectionManager(backend=UnixSocketBackend(path)) for _ in range(2)]
+    for worker in workers:
+        await worker.start()
+    try:
+        await scenario(*workers)
+    finally:
+        for worker in workers:
+            await worker.stop()
+        await broker.stop()
+
+
+async def _settle():
+    await asyncio.sleep(0.1)
+
+
+def test_send_to_hosts_reaches_host_on_other_worker():
+    async def scenario(a, b):
+        host, player = FakeWebSocket(), FakeWebSocket()
+        await b.connect(host, "123456")
+        b.register_host(host, "123456")
+        await b.connect(player, "123456")
+        b.register_player(player, "123456", 1)
+        await a.connect(FakeWebSocket(), "123456")
+        await _settle()
+
+        await a.send_to_hosts({"type": "answer_progress", "data": {"answered": 1}}, "123456")
+        await _settle()
+
+        assert host.types()[-1] == "answer_progress"
+        assert "answer_progress" not in player.types()
+
+    asyncio.run(_two_workers(scenario))
+
+
+def test_command_runs_on_other_worker_only():
+    async def scenario(a, b):
+        received = {"a": [], "b": []}
+
+        def handler_for(name):
+            async def handler(game_code, data):
+                received[name].append((game_code, data))
+            return handler
+
+        a.on_command("submit_answer", handler_for("a"))
+        b.on_command("submit_answer", handler_for("b"))
+        await a.connect(FakeWebSocket(), "123456")
+        await b.connect(FakeWebSocket(), "123456")
+        await _settle()
+
+        await a.send_command("123456", "submit_answer", {"player_id": 1, "question_id": 2, "answer_id": 3})
+        await _settle()
+
+        assert received == {"a": [], "b": [("123456", {"player_id": 1, "question_id": 2, "answer_id": 3})]}
+
+    asyncio.run(_two_workers(scenario))
+
+
+def test_request_is_acknowledged_by_owner_only():
+    async def scenario(a, b):
+        received = []
+
+        async def handler(game_code, data):
+            received.append(data)
+
+        a.on_command("next_question", handler, owns=lambda game_code: False)
+        b.on_command("next_question", handler, owns=lambda game_code: game_code == "123456")
+        await a.connect(FakeWebSocket(), "123456")
+        await b.connect(FakeWebSocket(), "123456")
+        await _settle()
+
+        assert await a.request("123456", "next_question", {"index": 1}) is True
+        await _settle()
+        assert received == [{"index": 1}]
+
+        # Niemand voert hem uit: na de timeout terug naar de aanroeper
+        b.command_ack_timeout = 0.2
+        assert await b.request("123456", "next_question", {}) is False
+        assert received == [{"index": 1}]
+
+    asyncio.run(_two_workers(scenario))
+
+
+def test_each_player_gets_own_part_from_one_publish():
+    async def scenario(a, b):
+        players = {}
+        for worker, player_id in ((a, 1), (b, 2), (b, 3)):
+            players[player_id] = FakeWebSocket()
+            await worker.connect(players[player_id], "123456")
+            worker.register_player(players[player_id], "123456", player_id)
+        await _settle()
+        published = a.backend.published
+
+        await a.send_to_each_player("player_rank", {1: {"rank": 2}, 2: {"rank": 1}}, "123456")
+        await _settle()
+
+        assert a.backend.published == published + 1
+        assert players[1].sent[-1] == {"type": "player_rank", "data": {"rank": 2}, "seq": 1}
+        assert players[2].sent[-1] == {"type": "player_rank", "data": {"rank": 1}, "seq": 1}
+        assert "player_rank" not in players[3].types()
+
+    asyncio.run(_two_workers(scenario))
@@ -0,0 +1,58 @@
+"""Tests voor de query budget pytest plugin (app/pytest_query_budget.py).
+
+De plugin draait in een aparte pytest run (pytester) met dezelfde conftest,
+zodat een falende test daar een verwachte uitkomst is.
+"""
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TESTS = '''
+from app.database import SessionLocal
+from app.models import Quiz
+
+
+def test_route_within_budget(client, quiz_payload):
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(3)).json()
+    assert client.get(f"/api/admin/quiz/{quiz['id']}").status_code == 200
+
+
+def test_lazy_loads_in_a_loop(client, quiz_payload, max_queries):
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(3)).json()
+    with SessionLocal() as db, max_queries(20):
+        for question in db.get(Quiz, quiz["id"]).questions:
+            assert len(question.answers) == 4  # Eén SELECT per vraag
+'''
+
+
+@pytest.fixture
+def run_with_plugin(pytester, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", ROOT)
+    with open(os.path.join(ROOT, "tests", "conftest.py"), encoding="utf-8") as f:
+        pytester.makeconftest(f.read())
+    pytester.makepyfile(test_budget=TESTS)
+
+    def run(*args):
+        # Vanuit de repo root: de app serveert app/static met een relatief pad
+        monkeypatch.chdir(ROOT)
+        return pytester.runpytest_subprocess(
+            "-p", "app.pytest_query_budget", "-p", "no:cacheprovider", "--rootdir", str(pytester.path),
+            str(pytester.path), *args
+        )
+
+    return run
+
+
+def test_route_within_budget_passes_and_n_plus_one_fails(run_with_plugin):
+    result = run_with_plugin()
+
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines([
+        "*test_lazy_loads_in_a_loop*",
+        "*3x dezelfde SELECT (mogelijk N+1): SELECT answers.*",
+        "*query budgets*",
+        "ok * GET /api/admin/quiz/{quiz_id} *",
+    ])
+
@@ -0,0 +1,69 @@
+"""Tests voor de quiz snapshot cache (app/quiz_cache.py)."""
+from app.database import SessionLocal
+from app.quiz_cache import QuizCache, quiz_cache
+
+
+def test_hit_reloads_quiz_changed_on_another_worker(client, quiz_payload):
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(2)).json()
+    # Eigen cache: de PUT hieronder invalideert alleen de cache van de app
+    cache = QuizCache()
+
+    with SessionLocal() as db:
+        first = cache.get(db, quiz["id"])
+        assert cache.get(db, quiz["id"]) is first
+
+    changed = {**quiz, "questions": [{**quiz["questions"][0], "question_text": "Gewijzigd"}]}
+    assert client.put(f"/api/admin/quiz/{quiz['id']}", json=changed).status_code == 200
+
+    with SessionLocal() as db:
+        second = cache.get(db, quiz["id"])
+    assert second is not first
+    assert [q.question_text for q in second.questions] == ["Gewijzigd"]
+    assert cache.stale == 1
+
+
+def test_hit_for_deleted_quiz_returns_none(client, quiz_payload):
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(1)).json()
+    cache = QuizCache()
+
+    with SessionLocal() as db:
+        assert cache.get(db, quiz["id"]) is not None
+    assert client.delete(f"/api/admin/quiz/{quiz['id']}").status_code == 204
+
+    with SessionLocal() as db:
+        assert cache.get(db, quiz["id"]) is None
+    assert len(cache._snapshots) == 0
+
+
+def _question(ws):
+    while True:
+        message = ws.receive_json()
+        if message["type"] == "question_start":
+            return message["data"]["question"]
+
+
+def test_running_game_plays_from_its_snapshot(client, quiz_payload):
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(2)).json()
+    codes = [client.post("/api/game/start", json={"quiz_id": quiz["id"]}).json()["game_code"] for _ in range(3)]
+
+    misses = quiz_cache.misses
+    with client.websocket_connect(f"/ws/{codes[0]}/Host?role=host") as host:
+        host.send_json({"type": "start_game"})
+        _question(host)
+
+        # Wijziging tijdens de game: de lopende game houdt zijn snapshot
+        changed = {**quiz, "questions": [quiz["questions"][0], {**quiz["questions"][1], "question_text": "Gewijzigd"}]}
+        assert client.put(f"/api/admin/quiz/{quiz['id']}", json=changed).status_code == 200
+        host.send_json({"type": "end_question"})
+        host.send_json({"type": "next_question"})
+        assert _question(host)["question_text"] == "Vraag 1"
+
+    # Volgende games: de gewijzigde quiz wordt één keer geladen, daarna uit de cache
+    for code in codes[1:]:
+        with client.websocket_connect(f"/ws/{code}/Host?role=host") as host:
+            host.send_json({"type": "start_game"})
+            _question(host)
+            host.send_json({"type": "end_question"})
+            host.send_json({"type": "next_question"})
+            assert _question(host)["question_text"] == "Gewijzigd"
+    assert quiz_cache.misses == misses + 2
@@ -0,0 +1,62 @@
+"""Tests voor de CSV en JSON Lines import (app/quiz_import.py)."""
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import Base
+from app.quiz_import import import_quiz, iter_csv_rows, parse_question
+
+HEADER = "question_text,time_limit,answer_1,answer_2,answer_3,answer_4,correct\n"
+
+
+def _csv_rows(*lines):
+    return list(iter_csv_rows([HEADER, *(line + "\n" for line in lines)]))
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def test_csv_correct_column_with_blank_middle_answer():
+    [(row, raw)] = _csv_rows("Q1,20,A,,C,D,3")
+    question = parse_question(raw)
+    assert row == 2
+    assert [(a.answer_text, a.is_correct) for a in question.answers] == [
+        ("A", False), ("C", True), ("D", False)
+    ]
+
+
+def test_csv_blank_correct_column_is_rejected():
+    [(row, raw)] = _csv_rows("Q1,20,A,,C,D,2")
+    assert row == 2
+    with pytest.raises(ValueError, match="answer_2 is leeg"):
+        parse_question(raw)
+
+
+def test_csv_import_reports_blank_correct_column(db):
+    lines = [HEADER, "Q1,20,A,,C,D,2\n", "Q2,20,A,,C,D,4\n"]
+    report = import_quiz(db, lines, "CSV quiz", file_format="csv")
+
+    assert report.imported == 1
+    assert report.errors == [{"row": 2, "error": "Correct antwoord answer_2 is leeg"}]
+    correct = db.scalars(select(models.Answer.answer_text).where(models.Answer.is_correct)).all()
+    assert correct == ["D"]
+
+
+def test_jsonl_invalid_line_is_reported(db):
+    lines = [
+        '{"question_text": "Q1", "answers": [{"answer_text": "A", "is_correct": true}, '
+        '{"answer_text": "B", "is_correct": false}]}\n',
+        "{niet json\n",
+    ]
+    report = import_quiz(db, lines, "JSONL quiz")
+
+    assert report.imported == 1
+    assert report.failed == 1
+    assert report.errors[0]["row"] == 2
@@ -0,0 +1,52 @@
+"""Tests voor de spelerslijst met ETag (GET /api/game/{code}/players)."""
+
+
+def _lobby(client, quiz_payload):
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(1)).json()
+    return client.post("/api/game/start", json={"quiz_id": quiz["id"]}).json()["game_code"]
+
+
+def _join(client, code, name):
+    client.post("/api/game/join", json={"game_code": code, "player_name": name})
+
+
+def _assert_revalidates(client, code, expected_names):
+    first = client.get(f"/api/game/{code}/players")
+    assert first.status_code == 200
+    assert [p["player_name"] for p in first.json()] == expected_names
+    etag = first.headers["ETag"]
+
+    unchanged = client.get(f"/api/game/{code}/players", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+    assert unchanged.content == b""
+    return etag
+
+
+def test_players_etag_from_database(client, quiz_payload):
+    code = _lobby(client, quiz_payload)
+    _join(client, code, "anna")
+    etag = _assert_revalidates(client, code, ["anna"])
+
+    _join(client, code, "bart")
+    changed = client.get(f"/api/game/{code}/players", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [p["player_name"] for p in changed.json()] == ["anna", "bart"]
+
+
+def test_players_etag_from_live_roster(client, quiz_payload):
+    code = _lobby(client, quiz_payload)
+    _join(client, code, "anna")
+
+    # Met een verbinding op deze worker komt de lijst uit de lokale roster
+    with client.websocket_connect(f"/ws/{code}/Host?role=host"):
+        etag = _assert_revalidates(client, code, ["anna"])
+        _join(client, code, "bart")
+        new_etag = _assert_revalidates(client, code, ["anna", "bart"])
+
+    assert new_etag != etag
+
+
+def test_players_of_unknown_game_is_404(client):
+    assert client.get("/api/game/onbekend/players").status_code == 404
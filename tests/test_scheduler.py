@@ -0,0 +1,78 @@
+"""Tests voor de timer wheel van de vraag timers (app/scheduler.py)."""
+import asyncio
+
+from app.scheduler import TimerWheel
+
+
+def _run(scenario):
+    async def main():
+        wheel = TimerWheel(tick_ms=5, wheel_size=8)
+        try:
+            await scenario(wheel)
+        finally:
+            await wheel.stop()
+
+    asyncio.run(main())
+
+
+def test_timer_fires_once_and_not_early():
+    async def scenario(wheel):
+        loop = asyncio.get_running_loop()
+        fired = []
+
+        async def callback():
+            fired.append(loop.time())
+
+        start = loop.time()
+        # Langer dan één omwenteling (8 ticks van 5 ms)
+        wheel.schedule("123456", 0.06, callback)
+        assert len(wheel) == 1
+        await asyncio.sleep(0.15)
+
+        assert len(fired) == 1
+        assert fired[0] - start >= 0.06
+        assert len(wheel) == 0
+        assert wheel.fired == 1
+
+    _run(scenario)
+
+
+def test_schedule_replaces_existing_timer():
+    async def scenario(wheel):
+        fired = []
+
+        async def first():
+            fired.append("eerste")
+
+        async def second():
+            fired.append("tweede")
+
+        wheel.schedule("123456", 0.02, first)
+        wheel.schedule("123456", 0.04, second)
+        assert len(wheel) == 1
+        assert wheel.remaining("123456") > 0.02
+        await asyncio.sleep(0.1)
+
+        assert fired == ["tweede"]
+
+    _run(scenario)
+
+
+def test_cancel_prevents_callback():
+    async def scenario(wheel):
+        fired = []
+
+        async def callback(key):
+            fired.append(key)
+
+        wheel.schedule("111111", 0.02, lambda: callback("111111"))
+        wheel.schedule("222222", 0.02, lambda: callback("222222"))
+        wheel.cancel("111111")
+        wheel.cancel("333333")  # Onbekende key: geen fout
+        assert wheel.remaining("111111") is None
+        await asyncio.sleep(0.08)
+
+        assert fired == ["222222"]
+        assert wheel.fired == 1
+
+    _run(scenario)
@@ -0,0 +1,77 @@
+"""Tests voor de write-behind buffer voor Score rijen (app/score_writer.py)."""
+from datetime import datetime
+
+import pytest
+
+from app import models
+from app.database import SessionLocal
+from app.score_writer import ScoreWriteBuffer
+
+
+@pytest.fixture
+def buffer():
+    # Groot interval: alleen flush() schrijft weg
+    writer = ScoreWriteBuffer(batch_size=100, flush_interval_ms=60_000, max_attempts=2)
+    yield writer
+    writer.close()
+
+
+def _rows(client, quiz_payload):
+    """Een score rij per vraag voor een nieuwe game met één speler."""
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(2)).json()
+    game = client.post("/api/game/start", json={"quiz_id": quiz["id"]}).json()
+    player = client.post("/api/game/join", json={"game_code": game["game_code"], "player_name": "speler"}).json()
+    return game, [
+        {
+            "game_session_id": game["id"],
+            "player_id": player["id"],
+            "question_id": question["id"],
+            "answer_id": question["answers"][0]["id"],
+            "is_correct": True,
+            "points": 500,
+            "time_taken": 1234,
+            "answered_at": datetime.utcnow()
+        }
+        for question in quiz["questions"]
+    ]
+
+
+def _stored(game_id):
+    db = SessionLocal()
+    try:
+        return db.query(models.Score).filter(models.Score.game_session_id == game_id).count()
+    finally:
+        db.close()
+
+
+def test_flush_writes_buffered_rows(client, quiz_payload, buffer):
+    game, rows = _rows(client, quiz_payload)
+    for row in rows:
+        buffer.enqueue(game["game_code"], row)
+
+    assert buffer.queue_depth(game["game_code"]) == 2
+    assert _stored(game["id"]) == 0
+
+    assert buffer.flush(game["game_code"]) == 2
+    assert buffer.queue_depth() == 0
+    assert _stored(game["id"]) == 2
+    assert buffer.stats()["rows_written"] == 2
+
+
+def test_failing_row_is_retried_then_dropped(client, quiz_payload, buffer):
+    game, (good, bad) = _rows(client, quiz_payload)
+    bad["player_id"] = None  # NOT NULL: faalt ook los
+    buffer.enqueue(game["game_code"], good)
+    buffer.enqueue(game["game_code"], bad)
+
+    # Batch faalt, rij voor rij: de goede rij staat erin, de foute gaat terug in de buffer
+    assert buffer.flush() == 1
+    assert _stored(game["id"]) == 1
+    assert buffer.queue_depth(game["game_code"]) == 1
+    assert buffer.stats()["failed_flushes"] == 1
+
+    # Tweede poging is de laatste: de rij wordt verworpen
+    assert buffer.flush() == 0
+    assert buffer.queue_depth() == 0
+    assert buffer.dropped_rows == 1
+    assert _stored(game["id"]) == 1
@@ -0,0 +1,133 @@
+"""Tests voor de begrensde verzendqueue per verbinding (app/connections.py)."""
+import asyncio
+
+import pytest
+
+from app import connections
+from app.connections import ClientConnection, ConnectionManager, QueueOverflow
+from app.pubsub import LocalBackend
+
+
+class StalledWebSocket:
+    """Socket waarvan de eerste send blijft hangen, zodat de queue volloopt."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+        self.release = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.release.wait()
+        self.sent.append(text)
+
+    async def close(self, code=None):
+        self.closed_with = code
+
+
+class RecordingWebSocket(StalledWebSocket):
+    def __init__(self):
+        super().__init__()
+        self.release.set()
+
+
+def _connection(policy, size=3):
+    manager = ConnectionManager(max_queue_size=size, overflow_policy=policy, backend=LocalBackend())
+    # Zonder writer task: de queue wordt niet geleegd
+    return ClientConnection(object(), "123456", manager)
+
+
+def _texts(connection):
+    return [text for text, _, _ in connection.queue]
+
+
+def test_drop_oldest_keeps_newest_messages():
+    connection = _connection("drop_oldest")
+    for i in range(5):
+        connection.enqueue(f"m{i}")
+
+    assert _texts(connection) == ["m2", "m3", "m4"]
+    assert connection.dropped == 2
+
+
+def test_coalesce_replaces_pending_state_message_in_place():
+    connection = _connection("coalesce")
+    connection.enqueue("progress 1", "answer_progress")
+    connection.enqueue("vraag")
+    connection.enqueue("progress 2", "answer_progress")
+
+    assert _texts(connection) == ["progress 2", "vraag"]
+    assert connection.coalesced == 1
+
+    # Zonder coalesce key valt bij een volle queue het oudste bericht weg
+    connection.enqueue("a")
+    connection.enqueue("b")
+    assert _texts(connection) == ["vraag", "a", "b"]
+    assert connection.dropped == 1
+
+
+def test_disconnect_policy_raises_on_full_queue():
+    connection = _connection("disconnect", size=2)
+    connection.enqueue("a")
+    connection.enqueue("b")
+
+    with pytest.raises(QueueOverflow):
+        connection.enqueue("c")
+    assert _texts(connection) == ["a", "b"]
+
+
+def test_unknown_policy_is_refused():
+    with pytest.raises(ValueError):
+        ConnectionManager(overflow_policy="negeren", backend=LocalBackend())
+
+
+def test_overflowing_client_is_dropped_by_manager():
+    async def scenario():
+        manager = ConnectionManager(max_queue_size=2, overflow_policy="disconnect", backend=LocalBackend())
+        await manager.start()
+        websocket = StalledWebSocket()
+        await manager.connect(websocket, "123456")
+        # Eerste bericht hangt in send_text, de volgende twee vullen de queue
+        for i in range(3):
+            await manager.broadcast({"type": "event", "i": i}, "123456")
+            await asyncio.sleep(0)
+        await manager.broadcast({"type": "event", "i": 3}, "123456")
+        await asyncio.sleep(0.01)
+
+        assert websocket.closed_with == 1013
+        assert manager.dropped_connections == 1
+        assert "123456" not in manager.games
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_is_serialized_once_and_not_held_up_by_slow_client(monkeypatch):
+    calls = []
+    encode = connections.encode_message
+
+    def counting_encode(message):
+        calls.append(message)
+        return encode(message)
+
+    monkeypatch.setattr(connections, "encode_message", counting_encode)
+
+    async def scenario():
+        manager = ConnectionManager(backend=LocalBackend())
+        await manager.start()
+        slow = StalledWebSocket()
+        fast = [RecordingWebSocket() for _ in range(3)]
+        for websocket in [slow] + fast:
+            await manager.connect(websocket, "123456")
+        await manager.broadcast({"type": "question_end", "data": {"correct_answer_id": 1}}, "123456")
+        await asyncio.sleep(0.01)
+
+        assert len(calls) == 1
+        assert slow.sent == []
+        texts = {websocket.sent[0] for websocket in fast}
+        assert len(texts) == 1 and '"question_end"' in texts.pop()
+        await manager.stop()
+
+    asyncio.run(scenario())
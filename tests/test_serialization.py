@@ -0,0 +1,59 @@
+"""Tests voor de JSON serialisatie (app/serialization.py) tegen de standaard library."""
+from datetime import datetime
+import json
+
+import pytest
+
+from app import schemas, serialization
+from app.serialization import (
+    FastJSONResponse, OrjsonSerializer, StdlibSerializer, encode_message, model_response, orjson
+)
+
+SERIALIZERS = [StdlibSerializer] + ([OrjsonSerializer] if orjson is not None else [])
+
+
+def _stdlib(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _score() -> schemas.ScoreResponse:
+    return schemas.ScoreResponse(
+        player_id=7, question_id=3, is_correct=True, points=950, time_taken=1234,
+        answered_at=datetime(2024, 5, 1, 12, 30, 15, 123456)
+    )
+
+
+def _leaderboard() -> schemas.Leaderboard:
+    return schemas.Leaderboard(total_questions=2, entries=[
+        schemas.LeaderboardEntry(player_name="Zoë 🚀", total_score=1900, correct_answers=2, rank=1),
+        schemas.LeaderboardEntry(player_name='"Bob"\n', total_score=0, correct_answers=0, rank=2),
+    ])
+
+
+@pytest.fixture(params=SERIALIZERS, ids=lambda cls: cls.name)
+def serializer(request, monkeypatch):
+    monkeypatch.setattr(serialization, "serializer", request.param())
+
+
+def test_serializer_is_abstract():
+    with pytest.raises(TypeError):
+        serialization.Serializer()
+
+
+@pytest.mark.parametrize("model", [_score(), _leaderboard()], ids=["score", "leaderboard"])
+def test_models_match_stdlib_bytes(serializer, model):
+    expected = _stdlib(model.model_dump(mode="json"))
+
+    assert FastJSONResponse(model).body == expected
+    assert model_response(type(model), model.model_dump()).body == expected
+    assert encode_message({"type": "update", "data": model}).encode() == _stdlib(
+        {"type": "update", "data": model.model_dump(mode="json")}
+    )
+
+
+def test_plain_messages_match_stdlib_bytes(serializer):
+    message = {"type": "question_end", "seq": 4, "data": {"naam": "Zoë", "scores": [1, 2.5, None, True]}}
+
+    assert encode_message(message).encode() == _stdlib(message)
+    assert FastJSONResponse(message).body == _stdlib(message)
+    assert serialization.loads(encode_message(message)) == message
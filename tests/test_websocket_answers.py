@@ -0,0 +1,146 @@
+"""Tests voor antwoorden via de WebSocket (app/routers/websocket.py)."""
+from app.connections import manager
+
+
+def _receive(ws, message_type):
+    while True:
+        message = ws.receive_json()
+        if message["type"] == message_type:
+            return message
+
+
+def _game(client, quiz_payload, players=("speler",)):
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(2)).json()
+    code = client.post("/api/game/start", json={"quiz_id": quiz["id"]}).json()["game_code"]
+    for name in players:
+        client.post("/api/game/join", json={"game_code": code, "player_name": name})
+    return quiz, code
+
+
+def test_forwarded_answer_without_owner_is_rejected(client, quiz_payload, monkeypatch):
+    _, code = _game(client, quiz_payload)
+    # Andere workers doen alsof ze bestaan, maar geen enkele heeft de live state
+    monkeypatch.setattr(manager.backend, "distributed", True)
+    monkeypatch.setattr(manager, "command_ack_timeout", 0.1)
+
+    with client.websocket_connect(f"/ws/{code}/speler") as player:
+        player.send_json({"type": "submit_answer", "data": {"question_id": 1, "answer_id": 1}})
+        rejected = _receive(player, "answer_rejected")
+
+    assert rejected["data"] == {"status_code": 400, "detail": "Game is niet actief"}
+
+
+def _first_question(host):
+    host.send_json({"type": "start_game"})
+    question = _receive(host, "question_start")["data"]["question"]
+    return question["id"], question["answers"][0]["id"]
+
+
+def test_duplicate_and_late_answers_are_rejected(client, quiz_payload):
+    _, code = _game(client, quiz_payload)
+
+    with client.websocket_connect(f"/ws/{code}/Host?role=host") as host, \
+            client.websocket_connect(f"/ws/{code}/speler") as player:
+        question_id, answer_id = _first_question(host)
+        answer = {"type": "submit_answer", "data": {"question_id": question_id, "answer_id": answer_id}}
+
+        player.send_json(answer)
+        result = _receive(player, "answer_result")["data"]
+        player.send_json(answer)
+        duplicate = _receive(player, "answer_rejected")["data"]
+
+        host.send_json({"type": "end_question"})
+        _receive(player, "question_end")
+        player.send_json(answer)
+        late = _receive(player, "answer_rejected")["data"]
+
+    assert result["is_correct"] is True and 0 < result["points"] <= 1000
+    assert duplicate == {"status_code": 400, "detail": "Vraag al beantwoord"}
+    assert late == {"status_code": 400, "detail": "Vraag is niet actief"}
+    # Alleen het eerste antwoord is gescoord
+    entries = client.get(f"/api/game/{code}/leaderboard").json()["entries"]
+    assert [(e["total_score"], e["correct_answers"]) for e in entries] == [(result["points"], 1)]
+
+
+def _until(ws, message_type):
+    """Alle berichten tot en met het eerste van `message_type`."""
+    messages = [ws.receive_json()]
+    while messages[-1]["type"] != message_type:
+        messages.append(ws.receive_json())
+    return messages
+
+
+def test_answer_result_goes_to_answering_player_only(client, quiz_payload):
+    _, code = _game(client, quiz_payload, players=("anna", "bart"))
+
+    with client.websocket_connect(f"/ws/{code}/Host?role=host") as host, \
+            client.websocket_connect(f"/ws/{code}/anna") as anna, \
+            client.websocket_connect(f"/ws/{code}/bart") as bart:
+        question_id, answer_id = _first_question(host)
+        wrong_id = answer_id + 1  # Alleen het eerste antwoord is correct
+        anna.send_json({"type": "submit_answer", "data": {"question_id": question_id, "answer_id": answer_id}})
+        bart.send_json({"type": "submit_answer", "data": {"question_id": question_id, "answer_id": wrong_id}})
+        anna_result = _receive(anna, "answer_result")["data"]
+        bart_result = _receive(bart, "answer_result")["data"]
+
+        host.send_json({"type": "end_question"})
+        host_messages = _until(host, "question_end")
+        anna_rest = _until(anna, "question_end")
+
+    assert anna_result["is_correct"] is True and anna_result["points"] > 0
+    assert (bart_result["is_correct"], bart_result["points"]) == (False, 0)
+    assert anna_result["player_id"] != bart_result["player_id"]
+    # Geen tweede (of andermans) answer_result, ook niet voor de host
+    assert "answer_result" not in [m["type"] for m in anna_rest + host_messages]
+
+
+def test_answer_progress_reaches_hosts_only(client, quiz_payload):
+    _, code = _game(client, quiz_payload, players=("anna", "bart"))
+
+    with client.websocket_connect(f"/ws/{code}/Host?role=host") as host, \
+            client.websocket_connect(f"/ws/{code}/anna") as anna, \
+            client.websocket_connect(f"/ws/{code}/bart") as bart:
+        question_id, answer_id = _first_question(host)
+        for player in (anna, bart):
+            player.send_json({"type": "submit_answer", "data": {"question_id": question_id, "answer_id": answer_id}})
+            _receive(player, "answer_result")
+
+        # Antwoorden binnen het interval worden samengevoegd; de laatste stand telt
+        progress = _receive(host, "answer_progress")["data"]
+        while progress["answered"] < 2:
+            progress = _receive(host, "answer_progress")["data"]
+
+        host.send_json({"type": "end_question"})
+        _receive(host, "question_end")
+        player_messages = _until(anna, "question_end") + _until(bart, "question_end")
+
+    assert progress == {"question_id": question_id, "answered": 2, "total": 2}
+    assert "answer_progress" not in [m["type"] for m in player_messages]
+
+
+def test_question_end_carries_leaderboard_and_rank_changes(client, quiz_payload):
+    _, code = _game(client, quiz_payload, players=("anna", "bart"))
+
+    with client.websocket_connect(f"/ws/{code}/Host?role=host") as host, \
+            client.websocket_connect(f"/ws/{code}/anna") as anna, \
+            client.websocket_connect(f"/ws/{code}/bart") as bart:
+        host.send_json({"type": "start_game"})
+        ends = []
+        for correct in ("bart", None):
+            question = _receive(host, "question_start")["data"]["question"]
+            answer_id = question["answers"][0]["id"]
+            for name, player in (("anna", anna), ("bart", bart)):
+                chosen = answer_id if name == correct else answer_id + 1
+                player.send_json({"type": "submit_answer", "data": {"question_id": question["id"], "answer_id": chosen}})
+                _receive(player, "answer_result")
+            host.send_json({"type": "end_question"})
+            ends.append(_receive(host, "question_end")["data"])
+            host.send_json({"type": "next_question"})
+
+    first, second = ends
+    assert [(e["player_name"], e["rank"]) for e in first["leaderboard"]] == [("bart", 1), ("anna", 2)]
+    assert first["leaderboard"][0]["correct_answers"] == 1
+    assert {c["player_name"]: c["rank"] for c in first["rank_changes"]} == {"bart": 1, "anna": 2}
+    # Niemand scoort: zelfde stand, dus geen rank deltas
+    assert second["leaderboard"] == first["leaderboard"]
+    assert second["rank_changes"] == []
@@ -0,0 +1,104 @@
+"""Tests voor het verbinden en verbreken van WebSockets (app/routers/websocket.py)."""
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.connections import CLOSE_KICKED, CLOSE_REPLACED
+
+
+def _receive(ws, message_type):
+    while True:
+        message = ws.receive_json()
+        if message["type"] == message_type:
+            return message
+
+
+def _lobby(client, quiz_payload, *players):
+    quiz = client.post("/api/admin/quiz", json=quiz_payload(1)).json()
+    code = client.post("/api/game/start", json={"quiz_id": quiz["id"]}).json()["game_code"]
+    for name in players:
+        client.post("/api/game/join", json={"game_code": code, "player_name": name})
+    return code
+
+
+def _connected(client, code):
+    return {p["player_name"]: p["is_connected"] for p in client.get(f"/api/game/{code}/players").json()}
+
+
+def test_unexpected_error_marks_player_disconnected(client, quiz_payload):
+    code = _lobby(client, quiz_payload, "speler")
+
+    with client.websocket_connect(f"/ws/{code}/Host?role=host") as host:
+        with client.websocket_connect(f"/ws/{code}/speler") as player:
+            _receive(host, "player_joined")
+            assert _connected(client, code) == {"speler": True}
+            player.send_text("geen json")  # Exception in de handler, geen WebSocketDisconnect
+
+            left = _receive(host, "player_left")
+
+    assert left["data"]["player_name"] == "speler"
+    assert left["data"]["removed"] is False
+    assert _connected(client, code) == {"speler": False}
+
+
+def test_resume_replays_missed_question_end_and_player_rank(client, quiz_payload):
+    code = _lobby(client, quiz_payload, "speler")
+
+    with client.websocket_connect(f"/ws/{code}/Host?role=host") as host:
+        with client.websocket_connect(f"/ws/{code}/speler") as player:
+            epoch = _receive(player, "session")["data"]["epoch"]
+            host.send_json({"type": "start_game"})
+            question = _receive(player, "question_start")
+            answer = question["data"]["question"]["answers"][0]["id"]
+            player.send_json({"type": "submit_answer", "data": {
+                "question_id": question["data"]["question"]["id"], "answer_id": answer
+            }})
+            _receive(player, "answer_result")
+
+        # Speler is even weg terwijl de host de vraag sluit
+        host.send_json({"type": "end_question"})
+        _receive(host, "question_end")
+
+        with client.websocket_connect(f"/ws/{code}/speler?last_seq={question['seq']}&epoch={epoch}") as player:
+            assert _receive(player, "session")["data"]["resumed"] is True
+            assert "correct_answer_id" in _receive(player, "question_end")["data"]
+            rank = _receive(player, "player_rank")
+
+    assert rank["data"]["rank"] == 1
+    assert rank["data"]["correct_answers"] == 1
+    assert rank["seq"] > question["seq"]
+
+
+def _closed_with(ws):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        while True:
+            ws.receive_json()
+    return closed.value.code
+
+
+def test_second_tab_replaces_first_connection(client, quiz_payload):
+    code = _lobby(client, quiz_payload, "speler", "ander")
+
+    with client.websocket_connect(f"/ws/{code}/Host?role=host") as host, \
+            client.websocket_connect(f"/ws/{code}/ander") as other:
+        with client.websocket_connect(f"/ws/{code}/speler") as first:
+            for ws in (host, other):
+                while _receive(ws, "player_joined")["data"]["player_name"] != "speler":
+                    pass
+            with client.websocket_connect(f"/ws/{code}/speler") as second:
+                assert _receive(first, "error")["message"] == "Je bent verbonden vanuit een ander tabblad"
+                assert _closed_with(first) == CLOSE_REPLACED
+                _receive(second, "session")
+
+                # De nieuwe verbinding krijgt de berichten voor deze speler
+                host.send_json({"type": "kick_player", "data": {"player_name": "speler"}})
+                assert _receive(second, "kicked")["message"] == "Je bent door de host uit het spel verwijderd"
+                assert _closed_with(second) == CLOSE_KICKED
+
+        # Andere spelers zien geen tweede join, wel het verwijderen
+        messages = [other.receive_json()]
+        while messages[-1]["type"] != "player_left":
+            messages.append(other.receive_json())
+        assert _connected(client, code) == {"ander": True}
+
+    assert "player_joined" not in [m["type"] for m in messages]
+    assert messages[-1]["data"]["removed"] is True